@@ -3,42 +3,33 @@ import asyncio
 import time
 import threading
 from fastapi import FastAPI, APIRouter, HTTPException, Depends, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse, ORJSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from sqlalchemy.sql import func
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from pydantic import BaseModel
 from datetime import datetime, timedelta
-import spacy
 
+from app.core.config import settings
 from app.db.deps import get_db
 from app.models.word import WordWithAssociations, DifficultyEnum
 from app.models.room import Room, GameStatus
 from app.models.player import Player, PlayerRole
 from app.models.user import User
 from app.core.security import get_current_user
+from app.core.room_state import room_states, RoomState
+from app.core.timers import round_timers
 from app.api.endpoints.ws import manager
-from app.api.endpoints.words import (
-    get_random_word,
-    get_next_word,
-    get_word_by_id_internal,
-)
+from app.core.nlp_executor import nlp_executor
+from app.core.guess_matcher import is_correct_guess
+from app.core.word_catalog import word_catalog, CatalogData, WordDeck
+from app.api.endpoints.words import get_word_by_id_internal
 
 router = APIRouter()
 
-try:
-    nlp = spacy.load("ru_core_news_sm")
-except OSError:
-    nlp = spacy.blank("ru")
-
-# Словарь для хранения таймеров комнат
-room_timers = {}
-timer_tasks = {}
-# Глобальный замок для доступа к room_timers
-timer_lock = threading.RLock()
-
 # Флаги для отслеживания работающих обновлений состояния игры
 active_periodic_updates = set()
 # Замок для доступа к списку обновлений
@@ -64,181 +55,304 @@ class ChatMessageRequest(BaseModel):
     message: str
 
 
-# Функция для отправки текущего состояния игры через WebSocket
-async def send_game_state_update(room_code: str, db: Session):
+# Данные текущего слова комнаты
+async def get_current_word_data(state: RoomState, db: Session):
     """
-    Отправляет актуальное состояние игры всем игрокам через WebSocket.
+    Возвращает данные текущего слова комнаты, кешируя их в состоянии.
+    При промахе слово загружается из базы данных в пуле потоков.
 
     Параметры:
-    - room_code: Код комнаты
+    - state: Состояние комнаты
     - db: Сессия базы данных
+
+    Возвращает:
+    - Словарь с данными слова или None, если слово не найдено.
     """
-    room = db.scalar(select(Room).where(Room.code == room_code))
-    if not room:
-        return
+    if not state.current_word_id:
+        return None
+
+    if (
+        state.current_word is None
+        or state.current_word.get("id") != state.current_word_id
+    ):
+        word_id = state.current_word_id
+        try:
+            word_data = await run_in_threadpool(get_word_by_id_internal, word_id, db)
+        except HTTPException:
+            return None
 
-    if room.status != GameStatus.PLAYING:
-        return
+        # Пока слово загружалось, ход мог смениться
+        if state.current_word_id != word_id:
+            return state.current_word
+        state.current_word = word_data
 
-    db.expire_all()
+    return state.current_word
 
-    current_player = None
-    explaining_player = db.scalar(
-        select(Player).where(
-            Player.room_id == room.id, Player.role == PlayerRole.EXPLAINING
-        )
+
+# Каталог слов для смены хода
+async def load_word_catalog(db: Session) -> CatalogData:
+    """
+    Возвращает каталог слов. После сброса каталога (изменился набор слов)
+    он загружается в пуле потоков, а не в цикле событий.
+
+    Параметры:
+    - db: Сессия базы данных
+
+    Возвращает:
+    - Данные каталога.
+    """
+    catalog = word_catalog.loaded()
+    if catalog is None:
+        catalog = await run_in_threadpool(word_catalog.load, db)
+    return catalog
+
+
+# Выбор следующего слова для комнаты
+def choose_next_word(state: RoomState, catalog: CatalogData):
+    """
+    Берет следующее слово из колоды комнаты и сохраняет его в состоянии.
+    Слова не повторяются, пока колода не закончится. Каталог загружается
+    заранее (load_word_catalog), поэтому смена хода не ждет базу данных.
+
+    Параметры:
+    - state: Состояние комнаты
+    - catalog: Данные каталога слов
+    """
+    if state.deck is None:
+        state.deck = WordDeck.new()
+
+    word_id = state.deck.draw(
+        catalog.ids_by_difficulty.get(state.difficulty, ()),
+        exclude=state.current_word_id,
     )
+    if word_id is None:
+        return
 
-    if explaining_player:
-        current_player = str(explaining_player.id)
+    state.current_word_id = word_id
+    state.current_word = catalog.by_id[word_id].to_dict()
+    state.dirty = True
 
-    players = []
-    for p in room.players:
-        user = db.scalar(select(User).where(User.id == p.user_id))
-        if user:
-            players.append(
-                {
-                    "id": str(p.id),
-                    "username": user.name,
-                    "score": p.score,
-                    "role": p.role,
-                }
-            )
 
-    # Вычисляем оставшееся время под защитой замка
-    time_left = None
+# Запуск таймера раунда
+def start_round_timer(state: RoomState) -> float:
+    """
+    Планирует окончание раунда в общем планировщике дедлайнов.
+    Предыдущий таймер комнаты при этом отменяется. Начало и дедлайн раунда
+    записываются в состояние комнаты, чтобы пережить перезапуск сервера.
+
+    Параметры:
+    - state: Состояние комнаты.
+
+    Возвращает:
+    - Время начала раунда (секунды Unix).
+    """
     current_time = time.time()
-    if room.status == GameStatus.PLAYING:
-        with timer_lock:
-            if room_code in room_timers:
-                timer_info = room_timers[room_code]
-                elapsed = current_time - timer_info["start_time"]
-                total_time = timer_info["duration"]
-                time_left = max(0, int(total_time - elapsed))
-                if time_left < 1:
-                    time_left = 0
-            else:
-                time_left = room.time_per_round
-                room_timers[room_code] = {
-                    "start_time": current_time,
-                    "duration": room.time_per_round,
-                    "end_time": current_time + room.time_per_round,
-                }
-
-                if room_code not in timer_tasks or timer_tasks[room_code] is None:
-                    timer_task = asyncio.create_task(
-                        start_round_timer(room_code, room.time_per_round, db)
-                    )
-                    timer_tasks[room_code] = timer_task
-    elif room.status == GameStatus.WAITING:
-        time_left = room.time_per_round
+    state.round_started_at = current_time
+    state.round_deadline = current_time + state.time_per_round
+    state.dirty = True
 
-    # Базовое состояние игры без секретного слова
-    base_state = {
+    round_timers.schedule(state.code, state.round_deadline, handle_round_timeout)
+    return current_time
+
+
+# Восстановление таймеров после перезапуска
+def recover_round_timers(db: Session) -> int:
+    """
+    Восстанавливает таймеры раундов всех идущих игр по данным из базы.
+    Раунды, время которых истекло, пока сервер был остановлен, завершаются
+    сразу: планировщик вызывает обработчик для просроченных дедлайнов
+    при первом же пробуждении.
+
+    Параметры:
+    - db: Сессия базы данных.
+
+    Возвращает:
+    - Количество восстановленных таймеров.
+    """
+    rows = db.execute(
+        select(Room.code, Room.round_deadline).where(
+            Room.status == GameStatus.PLAYING
+        )
+    ).all()
+
+    recovered = 0
+    for room_code, deadline in rows:
+        if deadline is not None:
+            round_timers.schedule(room_code, deadline, handle_round_timeout)
+        else:
+            # Дедлайн не сохранен (игра начата до появления столбцов):
+            # начинаем раунд заново
+            state = room_states.get(room_code, db)
+            start_round_timer(state)
+            room_states.flush(state, db)
+        recovered += 1
+
+    return recovered
+
+
+# Время текущего раунда
+def get_round_timing(room_code: str, duration: int):
+    """
+    Возвращает время начала раунда и оставшееся время в секундах.
+
+    Параметры:
+    - room_code: Код комнаты.
+    - duration: Продолжительность раунда в секундах.
+
+    Возвращает:
+    - Кортеж (timer_start, time_left) или (None, None), если таймер не запущен.
+    """
+    deadline = round_timers.deadline(room_code)
+    if deadline is None:
+        return None, None
+
+    time_left = max(0, int(deadline - time.time()))
+    return deadline - duration, time_left
+
+
+# Функция для отправки текущего состояния игры через WebSocket
+async def build_game_state(state: RoomState, db: Session) -> Dict[str, Any]:
+    """
+    Собирает состояние идущей игры без секретного слова.
+    Если таймер раунда не найден, запускает новый отсчет.
+
+    Параметры:
+    - state: Состояние комнаты
+    - db: Сессия базы данных
+
+    Возвращает:
+    - Словарь состояния игры для клиентов.
+    """
+    explaining_player = state.explainer
+    current_player = str(explaining_player.id) if explaining_player else None
+
+    players = [
+        {
+            "id": str(p.id),
+            "username": p.name,
+            "score": p.score,
+            "role": p.role,
+        }
+        for p in state.players
+    ]
+
+    # Вычисляем оставшееся время раунда
+    timer_start, time_left = get_round_timing(state.code, state.time_per_round)
+    if timer_start is None:
+        # Таймер идущей игры не найден - запускаем новый раунд отсчета
+        time_left = state.time_per_round
+        timer_start = start_round_timer(state)
+        await room_states.flush_async(state, db)
+
+    return {
         "currentWord": "",
         "players": players,
-        "round": room.current_round,
-        "status": room.status.upper(),
+        "round": state.current_round,
+        "status": state.status.upper(),
         "timeLeft": time_left,
         "currentPlayer": current_player,
-        "rounds_total": room.rounds_total,
-        "time_per_round": room.time_per_round,
+        "rounds_total": state.rounds_total,
+        "time_per_round": state.time_per_round,
+        "timer_start": timer_start,
     }
 
+
+async def build_explainer_state(
+    state: RoomState, base_state: Dict[str, Any], db: Session
+) -> Optional[Dict[str, Any]]:
+    """
+    Дополняет состояние игры секретным словом и ассоциациями для объясняющего.
+
+    Возвращает:
+    - Состояние игры объясняющего или None, если слово не найдено.
+    """
+    if not state.current_word_id:
+        return None
+
+    word_data = await get_current_word_data(state, db)
+    if not word_data or not word_data["word"]:
+        return None
+
+    personal_state = base_state.copy()
+    personal_state["currentWord"] = word_data["word"]
+    personal_state["associations"] = word_data["associations"]
+    return personal_state
+
+
+async def send_game_state_update(room_code: str, db: Session):
+    """
+    Отправляет актуальное состояние игры всем игрокам через WebSocket.
+
+    Параметры:
+    - room_code: Код комнаты
+    - db: Сессия базы данных
+    """
+    state = await room_states.get_async(room_code, db)
+    if not state:
+        return
+
+    if state.status != GameStatus.PLAYING:
+        return
+
+    # Базовое состояние игры без секретного слова
+    base_state = await build_game_state(state, db)
+
     # Отправляем сообщение всем игрокам
     await manager.broadcast(
         room_code, {"type": "game_state_update", "game_state": base_state}
     )
 
     # Отправляем отдельное сообщение объясняющему игроку с секретным словом
-    if explaining_player and room.current_word_id and room.status == GameStatus.PLAYING:
-        current_word = None
-        associations = []
-
-        if room.current_word_id:
-            try:
-                word_data = get_word_by_id_internal(room.current_word_id, db)
-                if word_data:
-                    current_word = word_data["word"]
-                    associations = word_data["associations"]
-            except HTTPException:
-                pass
-            except Exception as e:
-                pass
-
-        personal_state = base_state.copy()
-        personal_state["currentWord"] = current_word
-        personal_state["associations"] = associations
-
-        if current_word:
+    explaining_player = state.explainer
+    if explaining_player:
+        personal_state = await build_explainer_state(state, base_state, db)
+        if personal_state:
             await manager.send_personal_message(
                 str(explaining_player.user_id),
                 {"type": "game_state_update", "game_state": personal_state},
+                room_code=room_code,
             )
 
 
-# Запуск периодического обновления состояния игры
+# Запуск контрольной рассылки состояния игры
 async def start_periodic_game_state_updates(room_code: str, db: Session):
     """
-    Запускает периодическую отправку состояния игры через WebSocket.
+    Запускает редкую контрольную рассылку (heartbeat) состояния игры.
+
+    Состояние рассылается сразу при каждом игровом событии: догадке, смене
+    хода, входе или выходе игрока, истечении таймера. Этот цикл раз в
+    GAME_STATE_HEARTBEAT_INTERVAL секунд лишь синхронизирует клиентов,
+    пропустивших сообщение; обратный отсчет клиент считает сам по timer_start.
     """
-    from app.db.deps import get_db
+    with updates_lock:
+        active_periodic_updates.add(room_code)
 
     try:
-        # Проверяем, что комната существует и игра идет
-        db.expire_all()
-        room = db.scalar(select(Room).where(Room.code == room_code))
-        if not room or room.status != GameStatus.PLAYING:
+        while True:
+            await asyncio.sleep(settings.GAME_STATE_HEARTBEAT_INTERVAL)
+
             with updates_lock:
-                if room_code in active_periodic_updates:
-                    active_periodic_updates.remove(room_code)
-            return
+                if room_code not in active_periodic_updates:
+                    break
 
-        with updates_lock:
-            if room_code not in active_periodic_updates:
-                active_periodic_updates.add(room_code)
+            # Получаем новую сессию для каждой итерации
+            session_generator = get_db()
+            session = next(session_generator)
+            try:
+                state = await room_states.get_async(room_code, session)
+                if not state or state.status != GameStatus.PLAYING:
+                    break
 
-        try:
-            while True:
-                with updates_lock:
-                    if room_code not in active_periodic_updates:
-                        break
-
-                # Получаем новую сессию для каждой итерации
-                session_generator = get_db()
-                try:
-                    session = next(session_generator)
-
-                    # Проверяем статус комнаты
-                    room = session.scalar(select(Room).where(Room.code == room_code))
-                    if not room or room.status != GameStatus.PLAYING:
-                        break
-
-                    # Проверяем, есть ли игроки в комнате
-                    players_count = session.scalar(
-                        select(func.count(Player.id)).where(Player.room_id == room.id)
-                    )
-                    if not players_count or players_count < 1:
-                        break
-
-                    sleep_time = min(3, max(1, 2 + (players_count - 2) * 0.5))
-
-                    await send_game_state_update(room_code, session)
-
-                finally:
-                    session.close()
-                    next(session_generator, None)
-
-                # Пауза между обновлениями
-                await asyncio.sleep(sleep_time)
-        finally:
-            with updates_lock:
-                if room_code in active_periodic_updates:
-                    active_periodic_updates.remove(room_code)
-    except Exception as e:
+                await send_game_state_update(room_code, session)
+            finally:
+                session.close()
+                next(session_generator, None)
+    except Exception:
+        # Сбой контрольной рассылки не должен ронять фоновую задачу
+        pass
+    finally:
         with updates_lock:
-            if room_code in active_periodic_updates:
-                active_periodic_updates.remove(room_code)
+            active_periodic_updates.discard(room_code)
 
 
 # Получение состояния игры
@@ -257,15 +371,11 @@ async def get_game_state(
     Возвращает:
     - Состояние игры: текущее слово, игроки, текущий раунд и т.д.
     """
-    room = db.scalar(select(Room).where(Room.code == room_code))
-    if not room:
+    state = await room_states.get_async(room_code, db)
+    if not state:
         raise HTTPException(status_code=404, detail="Комната не найдена")
 
-    player = db.scalar(
-        select(Player).where(
-            Player.room_id == room.id, Player.user_id == current_user.id
-        )
-    )
+    player = state.get_player_by_user(current_user.id)
 
     if not player:
         raise HTTPException(
@@ -274,85 +384,67 @@ async def get_game_state(
 
     # Находим текущее слово, если оно есть
     current_word = ""
-    if room.status == GameStatus.PLAYING and room.current_word_id:
-        try:
-            word_data = get_word_by_id_internal(room.current_word_id, db)
-            if word_data and player.role == PlayerRole.EXPLAINING:
-                current_word = word_data["word"]
-        except HTTPException:
-            pass
+    if (
+        state.status == GameStatus.PLAYING
+        and state.current_word_id
+        and player.role == PlayerRole.EXPLAINING
+    ):
+        word_data = await get_current_word_data(state, db)
+        if word_data:
+            current_word = word_data["word"]
 
     current_player = None
-    explaining_player = db.scalar(
-        select(Player).where(
-            Player.room_id == room.id, Player.role == PlayerRole.EXPLAINING
-        )
-    )
+    explaining_player = state.explainer
 
     if explaining_player:
         current_player = str(explaining_player.id)
 
     # Формируем список игроков
-    players = []
-    for p in room.players:
-        user = db.scalar(select(User).where(User.id == p.user_id))
-        if user:
-            players.append(
-                {
-                    "id": str(p.id),
-                    "username": user.name,
-                    "score": p.score,
-                    "score_total": p.score_total,
-                }
-            )
+    players = [
+        {
+            "id": str(p.id),
+            "username": p.name,
+            "score": p.score,
+            "score_total": p.score_total,
+        }
+        for p in state.players
+    ]
 
-    # Получаем время с блокировкой
+    # Получаем оставшееся время раунда
     time_left = None
-    current_time = time.time()
-    if room.status == GameStatus.PLAYING:
-        with timer_lock:
-            if room_code in room_timers:
-                timer_info = room_timers[room_code]
-                elapsed = current_time - timer_info["start_time"]
-                total_time = timer_info["duration"]
-                time_left = max(0, int(total_time - elapsed))
-                if time_left < 1:
-                    time_left = 0
-            else:
-                time_left = room.time_per_round
-    elif room.status == GameStatus.WAITING:
-        time_left = room.time_per_round
+    timer_start = None
+    if state.status == GameStatus.PLAYING:
+        timer_start, time_left = get_round_timing(room_code, state.time_per_round)
+        if time_left is None:
+            time_left = state.time_per_round
+    elif state.status == GameStatus.WAITING:
+        time_left = state.time_per_round
 
     response = {
         "currentWord": current_word,
         "players": players,
-        "round": room.current_round,
-        "status": room.status.upper(),
+        "round": state.current_round,
+        "status": state.status.upper(),
         "timeLeft": time_left,
         "currentPlayer": current_player,
-        "rounds_total": room.rounds_total,
-        "time_per_round": room.time_per_round,
+        "rounds_total": state.rounds_total,
+        "time_per_round": state.time_per_round,
+        "timer_start": timer_start,
     }
 
     return response
 
 
-# Начало игры
-@router.post("/{room_code}/start")
-async def start_game(
-    room_code: str,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+# Проверка возможности начать игру
+def check_game_start(room_code: str, user_id: int, db: Session):
     """
-    Начинает игру в комнате.
+    Проверяет, что пользователь может начать игру в комнате.
+    Выполняется в пуле потоков.
 
     Параметры:
     - room_code: Код комнаты.
-
-    Возвращает:
-    - Сообщение об успешном начале игры или ошибку.
+    - user_id: ID пользователя, начинающего игру.
+    - db: Сессия базы данных.
     """
     room = db.scalar(select(Room).where(Room.code == room_code))
     if not room:
@@ -363,7 +455,7 @@ async def start_game(
         raise HTTPException(status_code=400, detail="В комнате нет игроков")
 
     first_player = room.players[0]
-    if first_player.user_id != current_user.id:
+    if first_player.user_id != user_id:
         raise HTTPException(
             status_code=403, detail="Только создатель комнаты может начать игру"
         )
@@ -377,54 +469,94 @@ async def start_game(
             status_code=400, detail="Для начала игры нужно минимум 2 игрока"
         )
 
-    # Очищаем все таймеры для этой комнаты перед началом новой игры
-    with timer_lock:
-        if room_code in room_timers:
-            del room_timers[room_code]
 
-        if room_code in timer_tasks:
-            try:
-                timer_tasks[room_code].cancel()
-            except Exception:
-                pass
-            del timer_tasks[room_code]
+# Подготовка новой игры
+def prepare_new_game(room_code: str, db: Session) -> int:
+    """
+    Сбрасывает очки, выбирает первое слово и назначает роли в базе данных.
+    Выполняется в пуле потоков.
+
+    Параметры:
+    - room_code: Код комнаты.
+    - db: Сессия базы данных.
+
+    Возвращает:
+    - Время раунда в секундах.
+    """
+    # Состояние прошлой игры записано отдельным запросом: перечитываем комнату
+    db.expire_all()
+    room = db.scalar(select(Room).where(Room.code == room_code))
+    if not room or not room.players:
+        raise HTTPException(status_code=404, detail="Комната не найдена")
 
     # Сбрасываем очки текущей игры
     for player in room.players:
         player.score = 0
 
-    # Выбираем случайное слово из базы
-    word_data = get_random_word(difficulty=room.difficulty, db=db)
+    # Берем первое слово из колоды комнаты: колода продолжается между играми,
+    # чтобы слова не повторялись и в следующей игре
+    word_ids = word_catalog.word_ids(db, room.difficulty)
+    if not word_ids:
+        raise HTTPException(status_code=404, detail="Нет слов подходящей сложности")
 
-    if not word_data or "id" not in word_data:
+    deck = WordDeck.restore(room.deck_seed, room.deck_position)
+    word_id = deck.draw(word_ids)
+
+    if word_id is None:
         raise HTTPException(status_code=500, detail="Не удалось выбрать слово для игры")
 
     # Обновляем состояние комнаты
     room.status = GameStatus.PLAYING
     room.current_round = 1
-    room.current_word_id = word_data["id"]
+    room.current_word_id = word_id
+    room.deck_seed = deck.seed
+    room.deck_position = deck.position
 
     # Назначаем первого игрока объясняющим
-    first_player.role = PlayerRole.EXPLAINING
+    room.players[0].role = PlayerRole.EXPLAINING
 
     # Остальные игроки получают роль угадывающих
     for player in room.players[1:]:
         player.role = PlayerRole.GUESSING
 
     db.commit()
+    return room.time_per_round
 
-    # Инициализация таймера для комнаты под защитой блокировки
-    with timer_lock:
-        current_time = time.time()
-        room_timers[room_code] = {
-            "start_time": current_time,
-            "duration": room.time_per_round,
-            "end_time": current_time + room.time_per_round,
-        }
-        timer_task = asyncio.create_task(
-            start_round_timer(room_code, room.time_per_round, db)
-        )
-        timer_tasks[room_code] = timer_task
+
+# Начало игры
+@router.post("/{room_code}/start")
+async def start_game(
+    room_code: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Начинает игру в комнате.
+    Запросы к базе данных выполняются в пуле потоков, а таймер и состояние
+    комнаты меняются в цикле событий.
+
+    Параметры:
+    - room_code: Код комнаты.
+
+    Возвращает:
+    - Сообщение об успешном начале игры или ошибку.
+    """
+    await run_in_threadpool(check_game_start, room_code, current_user.id, db)
+
+    # Отменяем таймер этой комнаты перед началом новой игры
+    round_timers.cancel(room_code)
+
+    # Новая игра настраивается через базу данных: сохраняем и сбрасываем
+    # состояние прошлой игры, оно загрузится заново при первом обращении
+    await room_states.evict_async(room_code, db)
+
+    time_per_round = await run_in_threadpool(prepare_new_game, room_code, db)
+
+    # Запускаем таймер первого раунда и сохраняем его дедлайн
+    state = await room_states.get_async(room_code, db)
+    timer_start = start_round_timer(state)
+    await room_states.flush_async(state, db)
 
     # Запускаем периодические обновления состояния игры через WebSocket
     with updates_lock:
@@ -444,8 +576,8 @@ async def start_game(
                 "type": "game_started",
                 "message": "Игра началась!",
                 "redirect_to": f"/game/{room_code}",
-                "time_per_round": room.time_per_round,
-                "timer_start": time.time(),
+                "time_per_round": time_per_round,
+                "timer_start": timer_start,
             },
         )
     except Exception as e:
@@ -459,235 +591,104 @@ async def start_game(
     return {"success": True, "message": "Игра успешно начата"}
 
 
-# Функция для отсчета времени раунда
-async def start_round_timer(room_code: str, duration: int, db: Session):
+# Обработка окончания времени раунда
+async def handle_round_timeout(room_code: str, db: Optional[Session] = None):
     """
-    Запускает таймер для раунда и обрабатывает его завершение.
+    Вызывается планировщиком, когда время раунда истекло:
+    передает ход следующему игроку или завершает игру.
 
     Параметры:
     - room_code: Код комнаты.
-    - duration: Продолжительность раунда в секундах.
-    - db: Сессия базы данных (используется только для первоначальной проверки).
+    - db: Сессия базы данных (если не передана, создается новая).
     """
-    from app.db.deps import get_db
+    # Если за это время раунд перезапустили, дедлайн уже неактуален
+    if room_code in round_timers:
+        return
+    # Сработавший дедлайн наступил не позже этого момента
+    fired_at = time.time()
+
+    session_generator = None
+    if db is None:
+        session_generator = get_db()
+        db = next(session_generator)
 
     try:
-        # Ждем необходимое время
-        await asyncio.sleep(duration)
-
-        # Проверяем, остался ли этот таймер активным
-        with timer_lock:
-            if (
-                room_code not in timer_tasks
-                or timer_tasks[room_code] != asyncio.current_task()
-            ):
-                return
-
-            # Очищаем информацию о таймере перед созданием нового
-            if room_code in room_timers:
-                del room_timers[room_code]
-            if room_code in timer_tasks:
-                del timer_tasks[room_code]
-
-        use_existing_db = False
-        session = None
-        try:
-            if db and db.is_active:
-                room = db.scalar(select(Room).where(Room.code == room_code))
-                if room:
-                    use_existing_db = True
-                    session = db
-        except Exception as e:
-            with timer_lock:
-                if room_code in room_timers:
-                    del room_timers[room_code]
-                if room_code in timer_tasks:
-                    del timer_tasks[room_code]
+        catalog = await load_word_catalog(db)
+        state = await room_states.get_async(room_code, db)
+        if not state or state.status != GameStatus.PLAYING:
             return
 
-        if not use_existing_db:
-            session_generator = get_db()
-            try:
-                session = next(session_generator)
-            except Exception as e:
-                with timer_lock:
-                    if room_code in room_timers:
-                        del room_timers[room_code]
-                    if room_code in timer_tasks:
-                        del timer_tasks[room_code]
-                return
-
-        try:
-            room = session.scalar(select(Room).where(Room.code == room_code))
-            if not room:
-                with timer_lock:
-                    if room_code in room_timers:
-                        del room_timers[room_code]
-                    if room_code in timer_tasks:
-                        del timer_tasks[room_code]
-                return
-
-            if room.status != GameStatus.PLAYING:
-                with timer_lock:
-                    if room_code in room_timers:
-                        del room_timers[room_code]
-                    if room_code in timer_tasks:
-                        del timer_tasks[room_code]
-                return
-
-            # Находим текущего объясняющего игрока
-            current_player = session.scalar(
-                select(Player).where(
-                    Player.room_id == room.id, Player.role == PlayerRole.EXPLAINING
-                )
-            )
+        # Пока состояние загружалось, догадка или завершение хода могли
+        # передать ход: у нового раунда свой таймер и более поздний дедлайн
+        if room_code in round_timers or (
+            state.round_deadline is not None and state.round_deadline > fired_at
+        ):
+            return
 
-            if not current_player:
-                with timer_lock:
-                    if room_code in room_timers:
-                        del room_timers[room_code]
-                    if room_code in timer_tasks:
-                        del timer_tasks[room_code]
-                return
-
-            # Меняем роль текущего игрока на угадывающего
-            current_player.role = PlayerRole.GUESSING
-
-            # Находим всех игроков в комнате и сортируем их по ID
-            players = session.scalars(
-                select(Player).where(Player.room_id == room.id).order_by(Player.id)
-            ).all()
-
-            if not players or len(players) < 2:
-                with timer_lock:
-                    if room_code in room_timers:
-                        del room_timers[room_code]
-                    if room_code in timer_tasks:
-                        del timer_tasks[room_code]
-                return
-
-            # Находим индекс текущего игрока
-            try:
-                current_index = players.index(current_player)
-            except ValueError:
-                current_index = 0
+        # Находим текущего объясняющего игрока
+        current_player = state.explainer
 
-            # Определяем следующего игрока
-            next_index = (current_index + 1) % len(players)
-            next_player = players[next_index]
+        if not current_player or len(state.players) < 2:
+            return
 
-            # Назначаем следующего игрока объясняющим
-            next_player.role = PlayerRole.EXPLAINING
+        # Передаем ход следующему игроку по порядку ID
+        current_player.role = PlayerRole.GUESSING
+        next_player = state.next_player(current_player)
+        next_player.role = PlayerRole.EXPLAINING
 
-            # Увеличиваем номер раунда
-            room.current_round += 1
+        # Увеличиваем номер раунда
+        state.current_round += 1
+        state.dirty = True
 
-            # Если достигли максимального числа раундов, завершаем игру
-            if room.current_round > room.rounds_total:
-                room.status = GameStatus.WAITING
-                room.current_round = 0
+        # Если достигли максимального числа раундов, завершаем игру
+        if state.current_round > state.rounds_total:
+            winner_id = state.finish_game()
+            await room_states.flush_async(state, db)
 
-                for player in players:
-                    if player.score_total is None:
-                        player.score_total = 0
-                    player.score_total += player.score
-                    player.score = 0
-                    player.role = PlayerRole.WAITING
+            # Отправляем сообщение о завершении игры
+            await manager.broadcast(
+                room_code,
+                {
+                    "type": "game_finished",
+                    "message": "Игра завершена!",
+                    "winner": winner_id,
+                },
+            )
 
-                winner_id = max(players, key=lambda p: p.score_total).id
-                session.commit()
+            # Останавливаем периодические обновления
+            with updates_lock:
+                if room_code in active_periodic_updates:
+                    active_periodic_updates.remove(room_code)
 
-                # Отправляем сообщение о завершении игры
-                await manager.broadcast(
-                    room_code,
-                    {
-                        "type": "game_finished",
-                        "message": "Игра завершена!",
-                        "winner": winner_id,
-                    },
-                )
+            return
 
-                # Останавливаем периодические обновления
-                with updates_lock:
-                    if room_code in active_periodic_updates:
-                        active_periodic_updates.remove(room_code)
+        # Выбираем новое слово для следующего раунда
+        choose_next_word(state, catalog)
 
-                return
+        # Запускаем таймер следующего раунда
+        timer_start = start_round_timer(state)
 
-            # Выбираем новое слово для следующего раунда
-            if room.current_word_id:
-                word_data = get_next_word(
-                    exclude_id=room.current_word_id,
-                    difficulty=room.difficulty,
-                    db=session,
-                )
-                if word_data and "id" in word_data:
-                    room.current_word_id = word_data["id"]
-
-            session.commit()
-
-            # Обновляем таймер комнаты под защитой блокировки
-            with timer_lock:
-                current_time = time.time()
-                room_timers[room_code] = {
-                    "start_time": current_time,
-                    "duration": room.time_per_round,
-                    "end_time": current_time + room.time_per_round,
-                }
-
-                # Отправляем всем сообщение о смене игрока и обновлении таймера
-                user = session.scalar(
-                    select(User).where(User.id == next_player.user_id)
-                )
-                user_name = user.name if user else "Неизвестный"
-                await manager.broadcast(
-                    room_code,
-                    {
-                        "type": "turn_changed",
-                        "message": f"Ход переходит к игроку {user_name}",
-                        "current_player": str(next_player.id),
-                        "new_timer": True,
-                        "timer_start": current_time,
-                        "time_per_round": room.time_per_round,
-                        "current_round": room.current_round,
-                    },
-                )
+        # Граница хода: записываем результаты и дедлайн в базу данных
+        await room_states.flush_async(state, db)
 
-                # Запускаем новый таймер для следующего раунда
-                if room_code in timer_tasks:
-                    try:
-                        if timer_tasks[room_code] != asyncio.current_task():
-                            timer_tasks[room_code].cancel()
-                    except Exception as e:
-                        pass
+        # Отправляем всем сообщение о смене игрока и обновлении таймера
+        await manager.broadcast(
+            room_code,
+            {
+                "type": "turn_changed",
+                "message": f"Ход переходит к игроку {next_player.name}",
+                "current_player": str(next_player.id),
+                "new_timer": True,
+                "timer_start": timer_start,
+                "time_per_round": state.time_per_round,
+                "current_round": state.current_round,
+            },
+        )
 
-                timer_task = asyncio.create_task(
-                    start_round_timer(room_code, room.time_per_round, session)
-                )
-                timer_tasks[room_code] = timer_task
-
-            await send_game_state_update(room_code, session)
-        finally:
-            if not use_existing_db and session:
-                try:
-                    session.close()
-                    next(session_generator, None)
-                except Exception as e:
-                    pass
-    except asyncio.CancelledError:
-        with timer_lock:
-            if room_code in room_timers:
-                del room_timers[room_code]
-            if room_code in timer_tasks:
-                if timer_tasks[room_code] == asyncio.current_task():
-                    del timer_tasks[room_code]
-    except Exception as e:
-        with timer_lock:
-            if room_code in room_timers:
-                del room_timers[room_code]
-            if room_code in timer_tasks:
-                if timer_tasks[room_code] == asyncio.current_task():
-                    del timer_tasks[room_code]
+        await send_game_state_update(room_code, db)
+    finally:
+        if session_generator is not None:
+            next(session_generator, None)
 
 
 # Завершение хода
@@ -707,21 +708,20 @@ async def end_turn(
     Возвращает:
     - Сообщение об успешном завершении хода или ошибку.
     """
+    # Каталог загружаем до получения состояния: дальше ход меняется без await
+    catalog = await load_word_catalog(db)
+
     # Находим комнату по коду
-    room = db.scalar(select(Room).where(Room.code == room_code))
-    if not room:
+    state = await room_states.get_async(room_code, db)
+    if not state:
         raise HTTPException(status_code=404, detail="Комната не найдена")
 
     # Проверяем, что игра идет
-    if room.status != GameStatus.PLAYING:
+    if state.status != GameStatus.PLAYING:
         raise HTTPException(status_code=400, detail="Игра не запущена")
 
     # Находим текущего объясняющего игрока
-    current_player = db.scalar(
-        select(Player).where(
-            Player.room_id == room.id, Player.role == PlayerRole.EXPLAINING
-        )
-    )
+    current_player = state.explainer
 
     if not current_player:
         raise HTTPException(status_code=400, detail="Не удалось найти текущего игрока")
@@ -733,41 +733,20 @@ async def end_turn(
             detail="Только текущий объясняющий игрок может завершить ход",
         )
 
-    # Меняем роль текущего игрока на угадывающего
+    # Передаем ход следующему игроку по порядку ID
     current_player.role = PlayerRole.GUESSING
-
-    # Находим всех игроков в комнате и сортируем их по ID
-    players = db.scalars(
-        select(Player).where(Player.room_id == room.id).order_by(Player.id)
-    ).all()
-
-    # Находим индекс текущего игрока
-    current_index = players.index(current_player)
-
-    # Определяем следующего игрока
-    next_index = (current_index + 1) % len(players)
-    next_player = players[next_index]
-
-    # Назначаем следующего игрока объясняющим
+    next_player = state.next_player(current_player)
     next_player.role = PlayerRole.EXPLAINING
 
     next_player_id = next_player.id
-    next_user = db.scalar(select(User).where(User.id == next_player.user_id))
-    next_player_name = next_user.name if next_user else "Неизвестный"
-    room.current_round += 1
+    next_player_name = next_player.name
+    state.current_round += 1
+    state.dirty = True
 
     # Если достигли максимального числа раундов, завершаем игру
-    if room.current_round > room.rounds_total:
-        room.status = GameStatus.WAITING
-        room.current_round = 0
-
-        for player in players:
-            player.score_total += player.score
-            player.score = 0
-            player.role = PlayerRole.WAITING
-
-        winner_id = max(players, key=lambda p: p.score_total).id
-        db.commit()
+    if state.current_round > state.rounds_total:
+        winner_id = state.finish_game()
+        room_states.schedule_flush(state, background_tasks, db)
 
         # Отправляем всем сообщение о завершении игры
         async def broadcast_game_finished():
@@ -780,16 +759,8 @@ async def end_turn(
                 },
             )
 
-        # Очищаем таймеры под защитой блокировки
-        with timer_lock:
-            if room_code in room_timers:
-                del room_timers[room_code]
-            if room_code in timer_tasks:
-                try:
-                    timer_tasks[room_code].cancel()
-                except Exception:
-                    pass
-                del timer_tasks[room_code]
+        # Останавливаем таймер раунда
+        round_timers.cancel(room_code)
 
         # Останавливаем периодические обновления
         with updates_lock:
@@ -801,36 +772,14 @@ async def end_turn(
         return {"success": True, "message": "Игра завершена!"}
 
     # Выбираем новое слово для следующего раунда
-    if room.current_word_id:
-        word_data = get_next_word(
-            exclude_id=room.current_word_id, difficulty=room.difficulty, db=db
-        )
-        if word_data and "id" in word_data:
-            room.current_word_id = word_data["id"]
+    choose_next_word(state, catalog)
 
-    db.commit()
-
-    # Обновляем таймер комнаты под защитой блокировки
-    current_time = time.time()
-    with timer_lock:
-        # Отменяем предыдущий таймер, если он существует
-        if room_code in timer_tasks:
-            try:
-                timer_tasks[room_code].cancel()
-            except Exception:
-                pass
-
-        # Создаем новый таймер
-        room_timers[room_code] = {
-            "start_time": current_time,
-            "duration": room.time_per_round,
-            "end_time": current_time + room.time_per_round,
-        }
+    # Перезапускаем таймер раунда
+    time_per_round = state.time_per_round
+    current_time = start_round_timer(state)
 
-        timer_task = asyncio.create_task(
-            start_round_timer(room_code, room.time_per_round, db)
-        )
-        timer_tasks[room_code] = timer_task
+    # Граница хода: записываем результаты и дедлайн в базу данных после ответа
+    room_states.schedule_flush(state, background_tasks, db)
 
     await send_game_state_update(room_code, db)
 
@@ -844,7 +793,7 @@ async def end_turn(
                 "current_player": str(player_id),
                 "new_timer": True,
                 "timer_start": current_time,
-                "time_per_round": room.time_per_round,
+                "time_per_round": time_per_round,
             },
         )
 
@@ -852,49 +801,67 @@ async def end_turn(
     return {"success": True, "message": "Ход успешно завершен"}
 
 
-# Выход из игры
-@router.post("/{room_code}/leave")
-async def leave_game(
-    room_code: str,
-    background_tasks: BackgroundTasks,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user),
-):
+# Поиск игрока пользователя в комнате
+def get_room_player_id(room_code: str, user_id: int, db: Session) -> int:
     """
-    Позволяет игроку выйти из игры.
+    Находит игрока пользователя в комнате. Выполняется в пуле потоков.
 
     Параметры:
     - room_code: Код комнаты.
+    - user_id: ID пользователя.
+    - db: Сессия базы данных.
 
     Возвращает:
-    - Сообщение об успешном выходе из игры или ошибку.
+    - ID игрока.
     """
-    # Находим комнату по коду
     room = db.scalar(select(Room).where(Room.code == room_code))
     if not room:
         raise HTTPException(status_code=404, detail="Комната не найдена")
 
-    # Находим игрока в комнате
     player = db.scalar(
-        select(Player).where(
-            Player.room_id == room.id, Player.user_id == current_user.id
-        )
+        select(Player).where(Player.room_id == room.id, Player.user_id == user_id)
     )
-
     if not player:
         raise HTTPException(
             status_code=404, detail="Вы не являетесь участником этой комнаты"
         )
 
-    player_id_leaving = player.id
-    username = current_user.name
+    return player.id
+
+
+# Удаление игрока из игры
+def remove_game_player(room_code: str, player_id: int, db: Session) -> Dict[str, Any]:
+    """
+    Удаляет игрока из комнаты и передает ход, если уходит объясняющий.
+    Комната с единственным оставшимся игроком закрывается отдельно
+    (close_last_player_room), после рассылки состояния. Выполняется
+    в пуле потоков.
+
+    Параметры:
+    - room_code: Код комнаты.
+    - player_id: ID уходящего игрока.
+    - db: Сессия базы данных.
+
+    Возвращает:
+    - Словарь: room_id, is_waiting_room, last_player (в комнате остался
+      один игрок) и send_state (нужно разослать состояние игры).
+    """
+    # Состояние комнаты записано отдельным запросом: перечитываем комнату
+    db.expire_all()
+    room = db.scalar(select(Room).where(Room.code == room_code))
+    player = db.get(Player, player_id)
+    if not room or not player:
+        raise HTTPException(
+            status_code=404, detail="Вы не являетесь участником этой комнаты"
+        )
+
     is_explainer_leaving = (
         player.role == PlayerRole.EXPLAINING and room.status == GameStatus.PLAYING
     )
     is_creator = (
         room.players
         and len(room.players) > 0
-        and room.players[0].id == player_id_leaving
+        and room.players[0].id == player_id
     )
     is_waiting_room = room.status == GameStatus.WAITING
     is_creator_leaving_waiting_room = is_creator and is_waiting_room
@@ -909,14 +876,14 @@ async def leave_game(
         ).all()
         current_index = -1
         for i, p in enumerate(players):
-            if p.id == player_id_leaving:
+            if p.id == player_id:
                 current_index = i
                 break
 
         if current_index != -1:
             for i in range(1, len(players)):
                 next_idx_candidate = (current_index + i) % len(players)
-                if players[next_idx_candidate].id != player_id_leaving:
+                if players[next_idx_candidate].id != player_id:
                     next_explainer_id = players[next_idx_candidate].id
                     break
 
@@ -924,12 +891,15 @@ async def leave_game(
     db.delete(player)
     db.commit()
 
-    room_deleted = False
-    state_update_sent_sync = False
-    remaining_players_count = db.scalars(
-        select(Player).where(Player.room_id == room_id)
-    ).all()
-    remaining_players_count = len(remaining_players_count)
+    result = {
+        "room_id": room_id,
+        "is_waiting_room": is_waiting_room,
+        "last_player": False,
+        "send_state": False,
+    }
+    remaining_players_count = len(
+        db.scalars(select(Player).where(Player.room_id == room_id)).all()
+    )
     room_after_leave = db.get(Room, room_id)
 
     if is_creator_leaving_waiting_room:
@@ -938,56 +908,104 @@ async def leave_game(
         ).all()
         for p in remaining_players_to_delete:
             db.delete(p)
-        room_to_delete = db.get(Room, room_id)
-        if room_to_delete:
-            db.delete(room_to_delete)
-        db.commit()
-        room_deleted = True
-    else:
         if room_after_leave:
-            if remaining_players_count == 0:
-                db.delete(room_after_leave)
-                db.commit()
-                room_deleted = True
-            elif remaining_players_count == 1:
-                if not is_waiting_room:
-                    room_check_before_delete = db.get(Room, room_id)
-                    if (
-                        room_check_before_delete
-                        and room_check_before_delete.status == GameStatus.PLAYING
-                    ):
-                        await send_game_state_update(room_code, db)
-                        state_update_sent_sync = True
-
-                last_player = db.scalar(select(Player).where(Player.room_id == room_id))
-                if last_player:
-                    if not is_waiting_room:
-                        if last_player.score_total is None:
-                            last_player.score_total = 0
-                        last_player.score_total += last_player.score
-                    db.delete(last_player)
-                db.delete(room_after_leave)
-                if room_code in room_timers:
-                    del room_timers[room_code]
-                if room_code in timer_tasks:
-                    try:
-                        timer_tasks[room_code].cancel()
-                    except Exception:
-                        pass
-                    del timer_tasks[room_code]
+            db.delete(room_after_leave)
+        db.commit()
+    elif room_after_leave:
+        if remaining_players_count == 0:
+            db.delete(room_after_leave)
+            db.commit()
+        elif remaining_players_count == 1:
+            result["last_player"] = True
+            result["send_state"] = (
+                not is_waiting_room and room_after_leave.status == GameStatus.PLAYING
+            )
+        elif (
+            is_explainer_leaving
+            and next_explainer_id is not None
+            and room_after_leave.status == GameStatus.PLAYING
+        ):
+            next_player_obj = db.get(Player, next_explainer_id)
+            if next_player_obj:
+                next_player_obj.role = PlayerRole.EXPLAINING
                 db.commit()
-                room_deleted = True
-            elif (
-                is_explainer_leaving
-                and next_explainer_id is not None
-                and room_after_leave.status == GameStatus.PLAYING
-            ):
-                next_player_obj = db.get(Player, next_explainer_id)
-                if next_player_obj:
-                    next_player_obj.role = PlayerRole.EXPLAINING
-                    db.commit()
-                    await send_game_state_update(room_code, db)
-                    state_update_sent_sync = True
+                result["send_state"] = True
+        elif room_after_leave.status == GameStatus.PLAYING:
+            # Состав игроков изменился - рассылаем новое состояние
+            result["send_state"] = True
+
+    return result
+
+
+# Закрытие комнаты с последним игроком
+def close_last_player_room(room_id: int, is_waiting_room: bool, db: Session):
+    """
+    Переносит очки последнего игрока в общий счет и удаляет его вместе
+    с комнатой. Выполняется в пуле потоков.
+
+    Параметры:
+    - room_id: ID комнаты.
+    - is_waiting_room: Комната ожидает начала игры (очки не переносятся).
+    - db: Сессия базы данных.
+    """
+    last_player = db.scalar(select(Player).where(Player.room_id == room_id))
+    if last_player:
+        if not is_waiting_room:
+            if last_player.score_total is None:
+                last_player.score_total = 0
+            last_player.score_total += last_player.score
+        db.delete(last_player)
+
+    room = db.get(Room, room_id)
+    if room:
+        db.delete(room)
+    db.commit()
+
+
+# Выход из игры
+@router.post("/{room_code}/leave")
+async def leave_game(
+    room_code: str,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user),
+):
+    """
+    Позволяет игроку выйти из игры.
+    Запросы к базе данных выполняются в пуле потоков, а таймер и состояние
+    комнаты меняются в цикле событий.
+
+    Параметры:
+    - room_code: Код комнаты.
+
+    Возвращает:
+    - Сообщение об успешном выходе из игры или ошибку.
+    """
+    player_id_leaving = await run_in_threadpool(
+        get_room_player_id, room_code, current_user.id, db
+    )
+    username = current_user.name
+
+    # Состав игроков меняется через базу данных: сохраняем и сбрасываем
+    # оперативное состояние комнаты
+    await room_states.evict_async(room_code, db)
+
+    result = await run_in_threadpool(
+        remove_game_player, room_code, player_id_leaving, db
+    )
+
+    # Пока игрок удалялся, состояние могли загрузить заново со старым составом
+    await room_states.evict_async(room_code, db)
+
+    if result["send_state"]:
+        await send_game_state_update(room_code, db)
+
+    if result["last_player"]:
+        round_timers.cancel(room_code)
+        await run_in_threadpool(
+            close_last_player_room, result["room_id"], result["is_waiting_room"], db
+        )
+        await room_states.evict_async(room_code, db)
 
     # Отправляем всем оставшимся игрокам сообщение о выходе игрока
     async def broadcast_player_left():
@@ -1027,57 +1045,65 @@ async def submit_guess(
     Возвращает:
     - Результат проверки догадки.
     """
-    room = db.scalar(select(Room).where(Room.code == room_code))
-    if not room:
-        raise HTTPException(status_code=404, detail="Комната не найдена")
+    # Каталог понадобится при правильной догадке; загружаем его заранее,
+    # чтобы смена хода не обращалась к базе данных в цикле событий
+    catalog = await load_word_catalog(db)
 
-    # Проверяем, что игра идет
-    if room.status != GameStatus.PLAYING:
-        raise HTTPException(status_code=400, detail="Игра не запущена")
+    while True:
+        state = await room_states.get_async(room_code, db)
+        if not state:
+            raise HTTPException(status_code=404, detail="Комната не найдена")
 
-    # Находим игрока в комнате
-    player = db.scalar(
-        select(Player).where(
-            Player.room_id == room.id, Player.user_id == current_user.id
-        )
-    )
+        # Проверяем, что игра идет
+        if state.status != GameStatus.PLAYING:
+            raise HTTPException(status_code=400, detail="Игра не запущена")
 
-    if not player:
-        raise HTTPException(
-            status_code=404, detail="Вы не являетесь участником этой комнаты"
-        )
+        # Находим игрока в комнате
+        player = state.get_player_by_user(current_user.id)
 
-    # Проверяем, что игрок не является объясняющим
-    if player.role != PlayerRole.GUESSING:
-        raise HTTPException(
-            status_code=400, detail="Только угадывающие игроки могут отправлять догадки"
-        )
+        if not player:
+            raise HTTPException(
+                status_code=404, detail="Вы не являетесь участником этой комнаты"
+            )
+
+        # Проверяем, что игрок не является объясняющим
+        if player.role != PlayerRole.GUESSING:
+            raise HTTPException(
+                status_code=400,
+                detail="Только угадывающие игроки могут отправлять догадки",
+            )
 
-    # Находим текущее слово
-    if not room.current_word_id:
-        raise HTTPException(status_code=400, detail="В игре нет активного слова")
+        # Находим текущее слово
+        if not state.current_word_id:
+            raise HTTPException(status_code=400, detail="В игре нет активного слова")
 
-    try:
-        word_data = get_word_by_id_internal(room.current_word_id, db)
-    except HTTPException:
-        raise HTTPException(status_code=500, detail="Не удалось найти текущее слово")
+        word_data = await get_current_word_data(state, db)
+        if not word_data:
+            raise HTTPException(
+                status_code=500, detail="Не удалось найти текущее слово"
+            )
+
+        # Пока слово загружалось, состояние комнаты могли сбросить (изменился
+        # состав игроков): повторяем проверки на заново загруженном состоянии,
+        # иначе очки попадут в объект, которого уже нет в хранилище
+        if room_states.is_current(state):
+            break
 
     # Проверяем догадку
     guess = guess_data.guess.lower().strip()
-    correct = word_data["word"].lower() == guess
+    correct = is_correct_guess(
+        word_data["word"],
+        guess,
+        typo_tolerance=state.difficulty in settings.GUESS_TYPO_DIFFICULTIES,
+        typo_min_length=settings.GUESS_TYPO_MIN_LENGTH,
+    )
 
     if correct:
-        time_left = 0
-        max_time = room.time_per_round
-        current_time = time.time()
-        
-        with timer_lock:
-            if room_code in room_timers:
-                timer_info = room_timers[room_code]
-                elapsed = current_time - timer_info["start_time"]
-                total_time = timer_info["duration"]
-                time_left = max(0, int(total_time - elapsed))
-        
+        max_time = state.time_per_round
+        _, time_left = get_round_timing(room_code, max_time)
+        if time_left is None:
+            time_left = 0
+
         base_points = 10
         time_bonus = int((time_left / max_time) * 15) if max_time > 0 else 0
         total_points = base_points + time_bonus
@@ -1085,11 +1111,7 @@ async def submit_guess(
         player.score += total_points
         player.correct_answers += 1
 
-        explaining_player = db.scalar(
-            select(Player).where(
-                Player.room_id == room.id, Player.role == PlayerRole.EXPLAINING
-            )
-        )
+        explaining_player = state.explainer
 
         if explaining_player:
             explaining_points = base_points // 2 + time_bonus // 2
@@ -1098,19 +1120,12 @@ async def submit_guess(
 
         player.role = PlayerRole.EXPLAINING
 
-        room.current_round += 1
-
-        if room.current_round > room.rounds_total:
-            room.status = GameStatus.WAITING
-            room.current_round = 0
-
-            for p in room.players:
-                p.score_total += p.score
-                p.score = 0
-                p.role = PlayerRole.WAITING
+        state.current_round += 1
+        state.dirty = True
 
-            winner_id = max(room.players, key=lambda p: p.score_total).id
-            db.commit()
+        if state.current_round > state.rounds_total:
+            winner_id = state.finish_game()
+            room_states.schedule_flush(state, background_tasks, db)
 
             # Отправляем всем сообщение о завершении игры
             async def broadcast_game_finished():
@@ -1123,16 +1138,8 @@ async def submit_guess(
                     },
                 )
 
-            # Очищаем таймеры под защитой блокировки
-            with timer_lock:
-                if room_code in room_timers:
-                    del room_timers[room_code]
-                if room_code in timer_tasks:
-                    try:
-                        timer_tasks[room_code].cancel()
-                    except Exception:
-                        pass
-                    del timer_tasks[room_code]
+            # Останавливаем таймер раунда
+            round_timers.cancel(room_code)
 
             # Останавливаем периодические обновления
             with updates_lock:
@@ -1152,38 +1159,14 @@ async def submit_guess(
         player_name_correct = current_user.name
 
         # Выбираем новое слово
-        if room.current_word_id:
-            word_data = get_next_word(
-                exclude_id=room.current_word_id,
-                difficulty=room.difficulty,
-                db=db,
-            )
-            if word_data and "id" in word_data:
-                room.current_word_id = word_data["id"]
+        choose_next_word(state, catalog)
 
-        db.commit()
+        # Перезапускаем таймер раунда
+        time_per_round = state.time_per_round
+        current_time = start_round_timer(state)
 
-        # Обновляем таймер комнаты под защитой блокировки
-        current_time = time.time()
-        with timer_lock:
-            # Отменяем предыдущий таймер, если он существует
-            if room_code in timer_tasks:
-                try:
-                    timer_tasks[room_code].cancel()
-                except Exception:
-                    pass
-
-            # Создаем новый таймер
-            room_timers[room_code] = {
-                "start_time": current_time,
-                "duration": room.time_per_round,
-                "end_time": current_time + room.time_per_round,
-            }
-
-            timer_task = asyncio.create_task(
-                start_round_timer(room_code, room.time_per_round, db)
-            )
-            timer_tasks[room_code] = timer_task
+        # Граница хода: записываем результаты и дедлайн в базу данных после ответа
+        room_states.schedule_flush(state, background_tasks, db)
 
         # Отправляем обновленное состояние игры
         await send_game_state_update(room_code, db)
@@ -1203,7 +1186,7 @@ async def submit_guess(
                     "message": f"Игрок {p_name} правильно угадал слово: {word} {points_message}",
                     "new_timer": True,
                     "timer_start": current_time,
-                    "time_per_round": room.time_per_round,
+                    "time_per_round": time_per_round,
                     "points": total_points,
                     "time_bonus": time_bonus,
                 },
@@ -1215,9 +1198,10 @@ async def submit_guess(
 
         return {"correct": True, "message": f"Поздравляем! Вы угадали слово. {points_message}"}
     else:
-        # Игрок не угадал слово
+        # Игрок не угадал слово: счетчик хранится в памяти и будет
+        # записан в базу данных на ближайшей границе хода
         player.wrong_answers += 1
-        db.commit()
+        state.dirty = True
 
         # Сохраняем необходимые данные до передачи в background task
         player_id = player.id
@@ -1259,81 +1243,25 @@ async def send_chat_message(
     Возвращает:
     - Подтверждение отправки сообщения
     """
-    room = db.scalar(select(Room).where(Room.code == room_code))
-    if not room:
+    state = await room_states.get_async(room_code, db)
+    if not state:
         raise HTTPException(status_code=404, detail="Комната не найдена")
 
     # Проверяем, что пользователь находится в комнате
-    player = db.scalar(
-        select(Player).where(
-            Player.room_id == room.id, Player.user_id == current_user.id
-        )
-    )
+    player = state.get_player_by_user(current_user.id)
 
     if not player:
         raise HTTPException(
             status_code=403, detail="Вы не являетесь участником этой комнаты"
         )
 
-    if player.role == PlayerRole.EXPLAINING and room.current_word_id:
-        message_lower = message_data.message.lower()
+    if player.role == PlayerRole.EXPLAINING and state.current_word_id:
         try:
-            word_data = get_word_by_id_internal(room.current_word_id, db)
+            word_data = await get_current_word_data(state, db)
             if word_data:
-                current_word = word_data["word"].lower()
-                associations = [assoc.lower() for assoc in word_data["associations"]]
-
-                message_doc = nlp(message_lower)
-
-                message_lemmas = {
-                    token.lemma_
-                    for token in message_doc
-                    if not token.is_stop and len(token.text) > 3
-                }
-                message_tokens = [token.text for token in message_doc]
-
-                current_word_doc = nlp(current_word)
-                current_word_lemma = (
-                    current_word_doc[0].lemma_
-                    if len(current_word_doc) > 0
-                    else current_word
-                )
-
-                if (
-                    current_word in message_lower
-                    or current_word_lemma in message_lemmas
-                ):
-                    raise HTTPException(
-                        status_code=400,
-                        detail="Запрещено использовать загаданное слово в сообщении",
-                    )
-
-                forbidden_words = []
-
-                association_lemmas = {}
-                for assoc in associations:
-                    assoc_doc = nlp(assoc)
-                    if len(assoc_doc) > 0:
-                        assoc_lemma = assoc_doc[0].lemma_
-                        association_lemmas[assoc_lemma] = assoc
-
-                for lemma in message_lemmas:
-                    if lemma in association_lemmas:
-                        forbidden_words.append(association_lemmas[lemma])
-
-                for token in message_tokens:
-                    if token in associations and token not in forbidden_words:
-                        forbidden_words.append(token)
-
-                for assoc in associations:
-                    if assoc in message_lower and assoc not in forbidden_words:
-                        forbidden_words.append(assoc)
-
-                if forbidden_words:
-                    raise HTTPException(
-                        status_code=400,
-                        detail=f"Запрещено использовать слова: {', '.join(set(forbidden_words))}",
-                    )
+                error = await nlp_executor.check(word_data, message_data.message)
+                if error:
+                    raise HTTPException(status_code=400, detail=error)
 
         except HTTPException as e:
             raise e
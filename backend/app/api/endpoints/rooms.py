@@ -5,11 +5,15 @@ from pydantic import BaseModel
 from typing import List
 from datetime import datetime
 from typing import Optional
+from anyio import from_thread
 import asyncio
 import time
 
 from app.db.deps import get_db
 from app.core.security import get_current_user
+from app.core.room_state import room_states
+from app.core.room_snapshot import load_room_snapshot, load_room_snapshots
+from app.core.timers import round_timers
 from app.models.room import Room, GameStatus
 from app.schemas.room import RoomCreate, RoomResponse
 from app.schemas.player import PlayerResponse
@@ -26,7 +30,7 @@ class ChatMessageRequest(BaseModel):
 
 
 @router.post("/create", response_model=RoomResponse)
-async def create_room(
+def create_room(
     room_data: RoomCreate,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user),
@@ -109,49 +113,15 @@ async def create_room(
 
 
 @router.get("/active", response_model=List[RoomResponse])
-async def get_active_rooms(db: Session = Depends(get_db)):
+def get_active_rooms(db: Session = Depends(get_db)):
     """
     Получает список активных комнат
     """
-    rooms = db.scalars(select(Room).where(Room.status != GameStatus.FINISHED)).all()
-
-    return [
-        RoomResponse(
-            id=room.id,
-            code=room.code,
-            status=room.status,
-            max_players=room.max_players,
-            rounds_total=room.rounds_total,
-            time_per_round=room.time_per_round,
-            current_round=room.current_round,
-            created_at=room.created_at,
-            player_count=len(room.players) if hasattr(room, "players") else 0,
-            current_word_id=(
-                room.current_word_id if hasattr(room, "current_word_id") else None
-            ),
-            is_full=room.is_full(),
-            players=(
-                [
-                    PlayerResponse(
-                        id=player.id,
-                        name=(
-                            player.user.name
-                            if hasattr(player, "user") and player.user
-                            else f"Player {player.id}"
-                        ),
-                    )
-                    for player in room.players
-                ]
-                if hasattr(room, "players") and room.players
-                else []
-            ),
-        )
-        for room in rooms
-    ]
+    return load_room_snapshots(db, Room.status != GameStatus.FINISHED)
 
 
 @router.get("/{room_code}", response_model=RoomResponse)
-async def get_room_by_code(room_code: str, db: Session = Depends(get_db)):
+def get_room_by_code(room_code: str, db: Session = Depends(get_db)):
     """
     Получение информации о комнате по коду.
 
@@ -161,48 +131,16 @@ async def get_room_by_code(room_code: str, db: Session = Depends(get_db)):
     Возвращает:
     - Информация о комнате и список игроков.
     """
-    room = db.scalar(select(Room).where(Room.code == room_code))
+    room = load_room_snapshot(db, room_code)
 
     if not room:
         raise HTTPException(status_code=404, detail="Комната не найдена")
 
-    players_list = []
-    if hasattr(room, "players") and room.players:
-        for player in room.players:
-            user = db.scalar(select(User).where(User.id == player.user_id))
-            if user:
-                players_list.append(
-                    PlayerResponse(
-                        id=player.id,
-                        name=user.name,
-                        role=player.role,
-                        score=player.score or 0,
-                        score_total=player.score_total or 0,
-                    )
-                )
-
-    return RoomResponse(
-        id=room.id,
-        code=room.code,
-        status=room.status,
-        max_players=room.max_players,
-        rounds_total=room.rounds_total,
-        time_per_round=room.time_per_round,
-        current_round=room.current_round,
-        created_at=room.created_at,
-        player_count=(
-            len(room.players) if hasattr(room, "players") and room.players else 0
-        ),
-        current_word_id=(
-            room.current_word_id if hasattr(room, "current_word_id") else None
-        ),
-        is_full=room.is_full(),
-        players=players_list,
-    )
+    return room
 
 
 @router.post("/join/{room_code}/{user_id}")
-async def join_room_by_code(
+def join_room_by_code(
     room_code: str,
     user_id: int,
     background_tasks: BackgroundTasks,
@@ -243,11 +181,16 @@ async def join_room_by_code(
     if existing_player:
         raise HTTPException(status_code=400, detail="Пользователь уже в комнате")
 
+    # Состав игроков меняется: сохраняем и сбрасываем состояние игры
+    room_states.evict_from_thread(room_code, db)
+
     # Создание нового игрока
     new_player = Player(user_id=user_id, room_id=room.id, role="waiting")
     db.add(new_player)
     db.commit()
     db.refresh(new_player)
+    # Пока игрок добавлялся, состояние могли загрузить со старым составом
+    room_states.evict_from_thread(room_code, db)
 
     player_data = {"id": new_player.id, "name": user.name}
 
@@ -264,7 +207,7 @@ async def join_room_by_code(
 
 
 @router.delete("/{room_code}")
-async def delete_room(
+def delete_room(
     room_code: str,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
@@ -297,17 +240,25 @@ async def delete_room(
 
     background_tasks.add_task(broadcast_room_closed)
 
+    # Таймеры и состояние комнат меняются только в цикле событий
+    from_thread.run_sync(round_timers.cancel, room_code)
+    room_states.evict_from_thread(room_code, db)
+
     for player in room.players:
         db.delete(player)
 
     db.delete(room)
     db.commit()
+    # Пока комната удалялась, ее состояние могли загрузить снова
+    # и перезапустить таймер раунда
+    from_thread.run_sync(round_timers.cancel, room_code)
+    room_states.evict_from_thread(room_code, db)
 
     return {"message": "Комната успешно удалена"}
 
 
 @router.post("/{room_code}/leave")
-async def leave_room(
+def leave_room(
     room_code: str,
     background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
@@ -332,9 +283,14 @@ async def leave_room(
             status_code=404, detail="Вы не являетесь участником этой комнаты"
         )
 
+    # Состав игроков меняется: сохраняем и сбрасываем состояние игры
+    room_states.evict_from_thread(room_code, db)
+
     # Удаляем игрока из комнаты
     db.delete(player)
     db.commit()
+    # Пока игрок удалялся, состояние могли загрузить со старым составом
+    room_states.evict_from_thread(room_code, db)
     db.refresh(room)
 
     # Отправляем сообщение о выходе игрока
@@ -358,19 +314,25 @@ async def leave_room(
         and current_user.id in manager.active_connections[room_code]
     ):
         ws = manager.active_connections[room_code][current_user.id]
-        await ws.close(code=1000, reason="User left")
-        manager.disconnect(room_code, user_id=current_user.id)
+        user_id = current_user.id
+
+        async def close_connection():
+            await ws.close(code=1000, reason="User left")
+            manager.disconnect(room_code, user_id=user_id)
+
+        background_tasks.add_task(close_connection)
 
     # Если это был последний игрок, удаляем комнату
     if len(room.players) == 0:
         db.delete(room)
         db.commit()
+        room_states.evict_from_thread(room_code, db)
 
     return {"success": True, "message": "Вы успешно покинули лобби"}
 
 
 @router.post("/{room_code}/chat")
-async def send_lobby_chat_message(
+def send_lobby_chat_message(
     room_code: str,
     message_data: ChatMessageRequest,
     background_tasks: BackgroundTasks,
@@ -4,8 +4,11 @@ from sqlalchemy.orm import Session
 from sqlalchemy import select
 from datetime import timedelta
 from app.db.deps import get_db
+from app.core.room_state import room_states
+from app.core.password_hasher import password_hasher
+from app.core.identity_cache import identity_cache
+from app.core.config import settings
 from app.core.security import (
-    get_password_hash,
     invalidate_token,
     create_access_token,
     get_current_user,
@@ -38,9 +41,12 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
             status_code=400, detail="Пользователь с таким email уже существует"
         )
 
-    # Создаем нового пользователя
-    user = User(name=user_data.name, email=user_data.email)
-    user.set_password(user_data.password)
+    # Создаем нового пользователя (хеш пароля вычисляется вне цикла событий)
+    user = User(
+        name=user_data.name,
+        email=user_data.email,
+        hashed_password=await password_hasher.hash(user_data.password),
+    )
 
     try:
         db.add(user)
@@ -55,9 +61,11 @@ async def register_user(user_data: UserCreate, db: Session = Depends(get_db)):
 
 
 @router.post("/logout", response_model=LogoutResponse)
-async def logout(token: str = Depends(oauth2_scheme)):
+def logout(token: str = Depends(oauth2_scheme)):
     """
-    Выход пользователя из системы
+    Выход пользователя из системы.
+    Обработчик синхронный: при хранилище отозванных токенов в PostgreSQL
+    запись выполняется в пуле потоков, а не в цикле событий.
 
     Args:
         token: JWT токен пользователя
@@ -90,13 +98,14 @@ def login_user(user_data: UserLogin, db: Session = Depends(get_db)):
         raise HTTPException(status_code=401, detail="Неверные данные")
 
     # Если пароль неверный
-    if not user.check_password(user_data.password):
+    if not password_hasher.verify_sync(user_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Неверные данные")
 
     # Генерация JWT токена
-    access_token = create_access_token(
-        data={"sub": user.email}
-    )
+    token_claims = {"sub": user.email}
+    if settings.JWT_INCLUDE_USER_ID:
+        token_claims["uid"] = user.id
+    access_token = create_access_token(data=token_claims)
 
     return {"access_token": access_token, "token_type": "bearer"}
 
@@ -127,6 +136,14 @@ async def update_profile(
 
     Позволяет изменить имя, email и пароль (при условии совпадения паролей).
     """
+    # Пользователь из кэша аутентификации может быть устаревшим,
+    # поэтому изменения применяются к актуальной записи из базы
+    current_user = db.get(User, current_user.id)
+    if current_user is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED, detail="Пользователь не найден"
+        )
+
     updated = False
 
     if user_update.name is not None:
@@ -154,9 +171,7 @@ async def update_profile(
             raise HTTPException(
                 status_code=400, detail="Текущий пароль обязателен для смены пароля"
             )
-        from app.core.security import verify_password
-
-        if not verify_password(
+        if not await password_hasher.verify(
             user_update.current_password, current_user.hashed_password
         ):
             raise HTTPException(status_code=400, detail="Неверный текущий пароль")
@@ -171,7 +186,9 @@ async def update_profile(
                 )
 
         # Устанавливаем новый пароль
-        current_user.set_password(user_update.new_password)
+        current_user.hashed_password = await password_hasher.hash(
+            user_update.new_password
+        )
         updated = True
     elif user_update.current_password is not None:
         raise HTTPException(
@@ -185,6 +202,10 @@ async def update_profile(
         db.add(current_user)
         db.commit()
         db.refresh(current_user)
+        # Токены пользователя должны увидеть новые данные профиля
+        identity_cache.invalidate_user(current_user.id)
+        if user_update.name is not None:
+            room_states.rename_user(current_user.id, current_user.name)
         return UserResponse.model_validate(current_user)
     except Exception as e:
         db.rollback()
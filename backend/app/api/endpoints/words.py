@@ -1,4 +1,3 @@
-import random
 from fastapi import APIRouter, HTTPException, Depends, Query
 from pydantic import BaseModel  # Импортируем BaseModel
 from sqlalchemy.orm import Session
@@ -6,6 +5,7 @@ from sqlalchemy.exc import ProgrammingError
 from sqlalchemy import select
 from app.db.deps import get_db
 from app.models.word import WordWithAssociations, DifficultyEnum
+from app.core.word_catalog import word_catalog
 from typing import Literal
 
 router = APIRouter()
@@ -15,28 +15,14 @@ router = APIRouter()
 @router.get("/random-word")
 def get_random_word(difficulty: DifficultyEnum, db: Session = Depends(get_db)):
     try:
-        words = db.scalars(
-            select(WordWithAssociations).where(
-                WordWithAssociations.is_active == True,
-                WordWithAssociations.difficulty == difficulty,
-            )
-        ).all()
+        word = word_catalog.random_word(db, difficulty)
     except ProgrammingError:
         raise HTTPException(status_code=404, detail="Нет слов подходящей сложности")
 
-    if not words:
+    if not word:
         raise HTTPException(status_code=404, detail="Нет слов подходящей сложности")
 
-    word = random.choice(words)
-
-    return {
-        "id": word.id,
-        "category": word.category,
-        "word": word.word,
-        "associations": word.associations,
-        "difficulty": difficulty,
-    }
-    # TODO: non-repeating words
+    return word.to_dict()
 
 
 # Обновление статистики слова
@@ -84,6 +70,7 @@ def add_word(
         db.add(new_word)
         db.commit()
         db.refresh(new_word)
+        word_catalog.invalidate()
     except ProgrammingError:
         raise HTTPException(
             status_code=500, detail="Ошибка базы данных: таблица 'words' не найдена."
@@ -103,30 +90,25 @@ def get_next_word(
     exclude_id: int, difficulty: DifficultyEnum, db: Session = Depends(get_db)
 ):
     try:
-        words = db.scalars(
-            select(WordWithAssociations).where(
-                WordWithAssociations.id != exclude_id,
-                WordWithAssociations.is_active == True,
-                WordWithAssociations.difficulty == difficulty,
-            )
-        ).all()
+        word = word_catalog.random_word(db, difficulty, exclude={exclude_id})
     except ProgrammingError:
         raise HTTPException(status_code=404, detail="Нет активных слов для выбора")
 
-    if not words:
+    if not word:
         raise HTTPException(status_code=404, detail="Нет активных слов для выбора")
 
-    word = random.choice(words)
-    return {
-        "id": word.id,
-        "category": word.category,
-        "word": word.word,
-        "associations": word.associations,
-        "difficulty": word.difficulty,
-    }
+    return word.to_dict()
 
 
 def get_word_by_id_internal(word_id: int, db: Session):
+    # Активные слова берем из каталога, неактивные - из базы данных
+    try:
+        entry = word_catalog.get(db, word_id)
+    except ProgrammingError:
+        raise HTTPException(status_code=404, detail="Слово не найдено")
+    if entry:
+        return entry.to_dict()
+
     try:
         word = db.scalar(
             select(WordWithAssociations).where(WordWithAssociations.id == word_id)
@@ -154,22 +136,16 @@ def get_word_by_id(word_id: int, db: Session = Depends(get_db)):
 @router.get("/{category}")
 def get_word_by_category(category: str, db: Session = Depends(get_db)):
     try:
-        words = db.scalars(
-            select(WordWithAssociations).where(
-                WordWithAssociations.category == category,
-                WordWithAssociations.is_active == True,
-            )
-        ).all()
+        word = word_catalog.random_word_in_category(db, category)
     except ProgrammingError:
         raise HTTPException(
             status_code=404, detail="Категория не найдена или нет активных слов"
         )
-    if not words:
+    if not word:
         raise HTTPException(
             status_code=404, detail="Категория не найдена или нет активных слов"
         )
 
-    word = random.choice(words)
     return {
         "word": word.word,
         "associations": word.associations,
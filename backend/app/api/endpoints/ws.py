@@ -1,30 +1,135 @@
-from fastapi import WebSocket, WebSocketDisconnect, APIRouter, Depends
+from fastapi import (
+    WebSocket,
+    WebSocketDisconnect,
+    APIRouter,
+    BackgroundTasks,
+    Depends,
+    HTTPException,
+)
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
+from pydantic import ValidationError
+import asyncio
 import json
 import logging
+from collections import deque
+from dataclasses import dataclass, field
 from datetime import datetime
+from typing import Any, Dict, Optional
+from app.core.config import settings
 from app.db.deps import get_db
-from app.models.room import Room
+from app.core.room_snapshot import load_room_snapshot
+from app.core.room_state import room_states
+from app.core.security import get_current_user, user_snapshot, user_from_snapshot
+from app.models.room import GameStatus
 from app.models.user import User
+from app.schemas.ws import COMMAND_TYPES, Command, CommandAck, command_adapter
 
 logger = logging.getLogger(__name__)
 
 # Создаем роутер для WebSocket
 router = APIRouter()
 
+# Подпротокол, с которым клиент передает JWT токен: ["bearer", <токен>]
+WS_AUTH_SUBPROTOCOL = "bearer"
+
+
+@dataclass
+class BroadcastReport:
+    """
+    Результат рассылки сообщения по комнате.
+
+    Каждый список содержит идентификаторы клиентов (user_id или WebSocket
+    анонимного клиента):
+    - queued: сообщение поставлено в очередь клиента
+    - dropped: некритичное сообщение отброшено из-за переполненной очереди
+    - evicted: клиент превысил лимит очереди и был отключен
+    """
+
+    queued: list = field(default_factory=list)
+    dropped: list = field(default_factory=list)
+    evicted: list = field(default_factory=list)
+
+
+class ConnectionOutbox:
+    """
+    Очередь исходящих сообщений одного WebSocket-подключения.
+
+    Сообщения отправляются по порядку отдельной задачей-писателем, которая
+    запускается при появлении сообщений и завершается, когда очередь пуста.
+    Обработчики запросов только ставят сообщения в очередь и не ждут клиента.
+    """
+
+    def __init__(self, websocket: WebSocket, room_code: str, client_id):
+        self.websocket = websocket
+        self.room_code = room_code
+        self.client_id = client_id
+        # Элементы очереди: [payload, coalesce_key]; payload=None - вытесненное сообщение
+        self.queue = deque()
+        self.pending = {}
+        self.size = 0
+        self.task = None
+        self.closed = False
+
+    def put(self, payload: str, message_type: str = None) -> str:
+        """
+        Ставит сообщение в очередь с учетом политик отбрасывания и склейки.
+
+        Возвращает:
+        - "queued", "dropped" или "overflow" (превышен лимит очереди)
+        """
+        coalesced = message_type in settings.WS_COALESCED_MESSAGE_TYPES
+        previous = self.pending.get(message_type) if coalesced else None
+
+        if previous is not None:
+            # Оставляем в очереди только последнюю версию сообщения
+            previous[0] = None
+            self.size -= 1
+        elif message_type in settings.WS_DROPPABLE_MESSAGE_TYPES:
+            if self.size >= settings.WS_QUEUE_SOFT_LIMIT:
+                return "dropped"
+        elif self.size >= settings.WS_QUEUE_HIGH_WATER:
+            return "overflow"
+
+        entry = [payload, message_type]
+        self.queue.append(entry)
+        self.size += 1
+        if coalesced:
+            self.pending[message_type] = entry
+        return "queued"
+
+    def cancel(self):
+        """Закрывает очередь и останавливает писателя"""
+        self.closed = True
+        self.queue.clear()
+        self.pending.clear()
+        self.size = 0
+        if self.task is not None and self.task is not asyncio.current_task():
+            self.task.cancel()
+
 
 # Менеджер подключений WebSocket
 class ConnectionManager:
     def __init__(self):
         # Словарь для хранения активных подключений
         self.active_connections = {}
+        # Очереди исходящих сообщений по WebSocket
+        self.outboxes = {}
+        # Индекс подключений пользователя: user_id -> {(room_code, websocket)}
+        self.user_connections = {}
 
-    async def connect(self, websocket: WebSocket, room_code: str, user_id: int = None):
+    async def connect(
+        self,
+        websocket: WebSocket,
+        room_code: str,
+        user_id: int = None,
+        subprotocol: Optional[str] = None,
+    ):
         # Принимаем подключение
         logger.info(
             f"Attempting to accept WebSocket connection for room {room_code}, user_id: {user_id}"
         )
-        await websocket.accept()
+        await websocket.accept(subprotocol=subprotocol)
         logger.info(f"Connection accepted for room {room_code}")
 
         # Добавляем подключение в словарь
@@ -32,19 +137,37 @@ class ConnectionManager:
             self.active_connections[room_code] = {}
 
         if user_id:
+            previous = self.active_connections[room_code].get(user_id)
+            if previous is not None:
+                self._unindex(user_id, room_code, previous)
             self.active_connections[room_code][user_id] = websocket
+            self.user_connections.setdefault(user_id, set()).add((room_code, websocket))
+            self.outboxes[websocket] = ConnectionOutbox(websocket, room_code, user_id)
             logger.info(f"User {user_id} connected to room {room_code}")
         else:
             self.active_connections[room_code][websocket] = websocket
+            self.outboxes[websocket] = ConnectionOutbox(websocket, room_code, websocket)
             logger.info(f"Anonymous client connected to room {room_code}")
 
     def disconnect(
         self, room_code: str, user_id: int = None, websocket: WebSocket = None
     ):
+        # Очередь отключаемого сокета больше не нужна
+        if websocket is not None:
+            self._discard_outbox(websocket)
+
         # Удаляем подключение из словаря
         if room_code in self.active_connections:
             if user_id is not None and user_id in self.active_connections[room_code]:
-                del self.active_connections[room_code][user_id]
+                # Не удаляем новое подключение пользователя, если он успел переподключиться
+                if (
+                    websocket is not None
+                    and self.active_connections[room_code][user_id] is not websocket
+                ):
+                    return
+                removed = self.active_connections[room_code].pop(user_id)
+                self._unindex(user_id, room_code, removed)
+                self._discard_outbox(removed)
                 logger.info(f"User {user_id} disconnected from room {room_code}")
             elif websocket and websocket in self.active_connections[room_code]:
                 del self.active_connections[room_code][websocket]
@@ -54,6 +177,18 @@ class ConnectionManager:
             if not self.active_connections[room_code]:
                 del self.active_connections[room_code]
 
+    def _unindex(self, user_id: int, room_code: str, websocket: WebSocket):
+        connections = self.user_connections.get(user_id)
+        if connections is not None:
+            connections.discard((room_code, websocket))
+            if not connections:
+                del self.user_connections[user_id]
+
+    def _discard_outbox(self, websocket: WebSocket):
+        outbox = self.outboxes.pop(websocket, None)
+        if outbox is not None:
+            outbox.cancel()
+
     def serialize_datetime(self, obj):
         if isinstance(obj, datetime):
             return obj.isoformat()
@@ -61,76 +196,342 @@ class ConnectionManager:
             f"Object of type {obj.__class__.__name__} is not JSON serializable"
         )
 
+    def serialize_message(self, message) -> str:
+        """Сериализует сообщение в JSON-строку (строки передаются как есть)"""
+        if isinstance(message, str):
+            return message
+        return json.dumps(message, default=self.serialize_datetime)
+
+    def _enqueue(self, websocket: WebSocket, payload: str, message_type: str) -> str:
+        """
+        Ставит готовую строку в очередь подключения и запускает писателя.
+
+        Возвращает исход постановки: "queued", "dropped" или "evicted".
+        """
+        outbox = self.outboxes.get(websocket)
+        if outbox is None or outbox.closed:
+            return "evicted"
+
+        outcome = outbox.put(payload, message_type)
+        if outcome == "overflow":
+            logger.warning(
+                f"Client {outbox.client_id} in room {outbox.room_code} exceeded "
+                f"outbound queue limit, disconnecting"
+            )
+            self._evict(outbox)
+            return "evicted"
+
+        if outcome == "queued" and outbox.task is None:
+            outbox.task = asyncio.create_task(self._write(outbox))
+        return outcome
+
+    async def _write(self, outbox: ConnectionOutbox):
+        """Задача-писатель: отправляет сообщения очереди по одному"""
+        try:
+            while outbox.queue:
+                entry = outbox.queue.popleft()
+                payload, message_type = entry
+                if payload is None:
+                    continue
+                outbox.size -= 1
+                if outbox.pending.get(message_type) is entry:
+                    del outbox.pending[message_type]
+
+                try:
+                    await asyncio.wait_for(
+                        outbox.websocket.send_text(payload),
+                        timeout=settings.WS_SEND_TIMEOUT,
+                    )
+                except Exception as e:
+                    logger.warning(
+                        f"Failed to send message to client {outbox.client_id} "
+                        f"in room {outbox.room_code}: {e!r}, disconnecting"
+                    )
+                    self._evict(outbox)
+                    return
+        finally:
+            outbox.task = None
+
+    def _evict(self, outbox: ConnectionOutbox):
+        """Отключает медленного или недоступного клиента"""
+        outbox.cancel()
+        if isinstance(outbox.client_id, int):
+            self.disconnect(outbox.room_code, outbox.client_id, outbox.websocket)
+        else:
+            self.disconnect(outbox.room_code, websocket=outbox.websocket)
+        asyncio.create_task(self._close_quietly(outbox.websocket))
+
+    async def _close_quietly(self, websocket: WebSocket):
+        try:
+            await asyncio.wait_for(
+                websocket.close(code=1013), timeout=settings.WS_SEND_TIMEOUT
+            )
+        except Exception:
+            pass
+
+    async def flush(self, room_code: str = None):
+        """
+        Ожидает, пока очереди подключений комнаты (или всех комнат) опустеют.
+
+        Параметры:
+        - room_code: Код комнаты; если не указан, ожидаются все подключения
+        """
+        tasks = [
+            outbox.task
+            for outbox in list(self.outboxes.values())
+            if outbox.task is not None
+            and (room_code is None or outbox.room_code == room_code)
+        ]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def send_to_websocket(self, websocket: WebSocket, message: dict) -> str:
+        """Ставит сообщение в очередь конкретного подключения"""
+        message_type = message.get("type") if isinstance(message, dict) else None
+        return self._enqueue(websocket, self.serialize_message(message), message_type)
+
     async def broadcast(
         self,
         room_code: str,
         message: dict,
         exclude_user_id: int = None,
         exclude_websocket: WebSocket = None,
-    ):
-        # Рассылка сообщений всем участникам комнаты, кроме указанного пользователя
-        if room_code in self.active_connections:
-            clients_count = len(self.active_connections[room_code])
-            logger.info(
-                f"Broadcasting message to {clients_count} clients in room {room_code}: {message.get('type', 'unknown')}"
-            )
+    ) -> BroadcastReport:
+        """
+        Рассылает сообщение всем участникам комнаты, кроме исключенных.
+
+        Сообщение сериализуется один раз и ставится в очереди подключений,
+        отправку выполняют задачи-писатели, поэтому вызывающий код не ждет
+        медленных клиентов.
+
+        Возвращает:
+        - BroadcastReport с результатом постановки в очереди
+        """
+        report = BroadcastReport()
+        if room_code not in self.active_connections:
+            return report
 
-            success_count = 0
+        recipients = [
+            (client_id, websocket)
             for client_id, websocket in list(
                 self.active_connections[room_code].items()
-            ):
-                if client_id != exclude_user_id and websocket != exclude_websocket:
-                    try:
-                        if isinstance(message, dict):
-                            json_str = json.dumps(
-                                message, default=self.serialize_datetime
-                            )
-                            await websocket.send_text(json_str)
-                            success_count += 1
-                        else:
-                            await websocket.send_text(message)
-                            success_count += 1
-                    except Exception as e:
-                        logger.error(
-                            f"Error sending message to client {client_id}: {e}"
-                        )
-
-            logger.info(
-                f"Successfully sent message to {success_count} out of {clients_count} clients"
             )
+            if client_id != exclude_user_id and websocket != exclude_websocket
+        ]
+        message_type = message.get("type") if isinstance(message, dict) else None
+        logger.info(
+            f"Broadcasting message to {len(recipients)} clients in room {room_code}: "
+            f"{message_type or 'raw'}"
+        )
+        if not recipients:
+            return report
+
+        payload = self.serialize_message(message)
+        for client_id, websocket in recipients:
+            outcome = self._enqueue(websocket, payload, message_type)
+            getattr(report, outcome).append(client_id)
+
+        if report.dropped or report.evicted:
+            logger.warning(
+                f"Broadcast in room {room_code}: {len(report.dropped)} dropped, "
+                f"{len(report.evicted)} evicted"
+            )
+        return report
 
-    async def send_personal_message(self, user_id: str, message: dict):
+    async def send_personal_message(
+        self, user_id: str, message: dict, room_code: str = None
+    ):
         """
         Отправляет личное сообщение конкретному пользователю
 
         Параметры:
         - user_id: ID пользователя, которому нужно отправить сообщение
         - message: Сообщение для отправки
+        - room_code: Код комнаты; если указан, сообщение получит только
+          подключение пользователя в этой комнате
         """
-        # Найти все соединения данного пользователя
-        user_id_int = int(user_id) if user_id.isdigit() else user_id
-
-        for room_code in self.active_connections:
-            for connection_id, websocket in self.active_connections[room_code].items():
-                if connection_id == user_id_int:
-                    try:
-                        json_str = json.dumps(message, default=self.serialize_datetime)
-                        await websocket.send_text(json_str)
-                        logger.info(f"Personal message sent to user {user_id}")
-                    except Exception as e:
-                        logger.error(
-                            f"Error sending personal message to user {user_id}: {e}"
-                        )
+        if isinstance(user_id, str) and user_id.isdigit():
+            user_id = int(user_id)
+
+        # Подключения пользователя берутся из индекса, без обхода всех комнат
+        if room_code is not None:
+            websocket = self.active_connections.get(room_code, {}).get(user_id)
+            targets = [websocket] if websocket is not None else []
+        else:
+            targets = [
+                websocket
+                for _, websocket in list(self.user_connections.get(user_id, ()))
+            ]
+        if not targets:
+            return
+
+        json_str = self.serialize_message(message)
+        message_type = message.get("type") if isinstance(message, dict) else None
+        for websocket in targets:
+            self._enqueue(websocket, json_str, message_type)
+        logger.info(f"Personal message queued for user {user_id}")
 
 
 # Инициализация менеджера подключений
 manager = ConnectionManager()
 
 
+async def build_initial_state(
+    room_code: str, user_id: int, db: Session
+) -> Optional[Dict[str, Any]]:
+    """
+    Собирает состояние комнаты для нового подключения.
+    Комната, ее игроки и их имена загружаются одним запросом; по ним же
+    проверяется, что пользователь состоит в комнате.
+
+    Параметры:
+    - room_code: Код комнаты
+    - user_id: ID подключающегося пользователя
+    - db: Сессия базы данных
+
+    Возвращает:
+    - Сообщение room_update (с состоянием игры, если она идет) или None,
+      если комната не найдена или пользователь в ней не состоит.
+    """
+    from app.api.endpoints.game import build_game_state, build_explainer_state
+
+    room_data = await run_in_threadpool(load_room_snapshot, db, room_code)
+    if not room_data or not any(p.user_id == user_id for p in room_data.players):
+        return None
+
+    # Состояние идущей игры берется из памяти, без повторной загрузки комнаты
+    game_state = None
+    state = await room_states.get_async(room_code, db)
+    if state and state.status == GameStatus.PLAYING:
+        game_state = await build_game_state(state, db)
+        explainer = state.explainer
+        if explainer and explainer.user_id == user_id:
+            game_state = (
+                await build_explainer_state(state, game_state, db) or game_state
+            )
+
+    return {
+        "type": "room_update",
+        "room": room_data.model_dump(),
+        "game_state": game_state,
+    }
+
+
+def get_websocket_token(websocket: WebSocket) -> Optional[str]:
+    """
+    Токен из заголовка Sec-WebSocket-Protocol.
+
+    Браузер не позволяет передать заголовок Authorization при открытии
+    WebSocket, а параметр запроса попадает в журналы сервера и прокси,
+    поэтому клиент передает токен вторым подпротоколом: ["bearer", <токен>].
+
+    Возвращает:
+    - Токен или None, если он не передан.
+    """
+    subprotocols = websocket.scope.get("subprotocols") or []
+    if len(subprotocols) == 2 and subprotocols[0] == WS_AUTH_SUBPROTOCOL:
+        return subprotocols[1] or None
+    return None
+
+
+async def execute_command(
+    command: Command,
+    room_code: str,
+    user: User,
+    db: Session,
+    background_tasks: BackgroundTasks,
+) -> CommandAck:
+    """
+    Выполняет команду WebSocket той же логикой, что и HTTP-эндпоинты игры,
+    с пользователем и комнатой подключения вместо повторной аутентификации.
+
+    Параметры:
+    - command: Команда клиента
+    - room_code: Код комнаты подключения
+    - user: Пользователь подключения
+    - db: Сессия базы данных
+    - background_tasks: Фоновые задачи эндпоинта (выполняются после подтверждения)
+
+    Возвращает:
+    - Подтверждение с ответом эндпоинта или с кодом и текстом ошибки.
+    """
+    from app.api.endpoints import game
+
+    try:
+        if command.type == "guess":
+            request = game.GuessRequest(guess=command.guess)
+            result = await game.submit_guess(
+                room_code, request, background_tasks, db, user
+            )
+        elif command.type == "chat":
+            request = game.ChatMessageRequest(message=command.message)
+            result = await game.send_chat_message(
+                room_code, request, background_tasks, db, user
+            )
+        elif command.type == "end_turn":
+            result = await game.end_turn(room_code, background_tasks, db, user)
+        else:
+            result = await game.leave_game(room_code, background_tasks, db, user)
+    except HTTPException as e:
+        db.rollback()
+        return CommandAck(
+            request_id=command.request_id,
+            ok=False,
+            status=e.status_code,
+            detail=e.detail,
+        )
+    except Exception as e:
+        db.rollback()
+        logger.exception(
+            f"Error executing command {command.type} in room {room_code}: {e}"
+        )
+        return CommandAck(
+            request_id=command.request_id,
+            ok=False,
+            status=500,
+            detail="Внутренняя ошибка сервера",
+        )
+
+    return CommandAck(request_id=command.request_id, ok=True, result=result)
+
+
+async def handle_command(
+    websocket: WebSocket, message: dict, room_code: str, user: User, db: Session
+):
+    """
+    Проверяет и выполняет команду клиента, отправляет подтверждение (ack),
+    затем выполняет фоновые задачи эндпоинта, как после HTTP-ответа.
+    """
+    try:
+        command = command_adapter.validate_python(message)
+    except ValidationError:
+        request_id = message.get("request_id")
+        ack = CommandAck(
+            request_id=request_id if isinstance(request_id, (str, int)) else None,
+            ok=False,
+            status=422,
+            detail="Неверный формат команды",
+        )
+        await manager.send_to_websocket(websocket, ack.model_dump())
+        return
+
+    background_tasks = BackgroundTasks()
+    try:
+        ack = await execute_command(command, room_code, user, db, background_tasks)
+        await manager.send_to_websocket(websocket, ack.model_dump())
+        await background_tasks()
+    finally:
+        # Соединение с базой не удерживается между командами
+        db.close()
+
+
 # WebSocket endpoint для подключения к комнате
 @router.websocket("/ws/{room_code}/{user_id}")
 async def websocket_endpoint(
-    websocket: WebSocket, room_code: str, user_id: int, db: Session = Depends(get_db)
+    websocket: WebSocket,
+    room_code: str,
+    user_id: int,
+    db: Session = Depends(get_db),
 ):
     """
     WebSocket-подключение для взаимодействия с игровой комнатой для авторизованного пользователя.
@@ -138,76 +539,54 @@ async def websocket_endpoint(
     Параметры:
     - room_code: Код комнаты, к которой подключается пользователь.
     - user_id: ID пользователя, который подключается.
+
+    JWT токен пользователя передается подпротоколами ["bearer", <токен>]
+    (заголовок Sec-WebSocket-Protocol), а не в URL; подключение принимается
+    с подпротоколом "bearer".
+
+    Сообщения guess, chat, end_turn и leave - команды игры: они выполняются
+    от имени пользователя подключения, на каждую отправляется подтверждение
+    (ack) с request_id команды.
     """
     logger.info(f"WebSocket request received for room {room_code}, user_id: {user_id}")
-    logger.info(f"Request headers: {websocket.headers}")
 
-    # Проверка существования комнаты
-    room = db.query(Room).filter(Room.code == room_code).first()
-    if not room:
-        logger.warning(f"Room {room_code} not found")
+    # Проверка токена: пользователь берется из кэша аутентификации или из базы
+    token = get_websocket_token(websocket)
+    try:
+        if not token:
+            raise HTTPException(status_code=401, detail="Токен не передан")
+        user = await run_in_threadpool(get_current_user, token, db)
+    except HTTPException as e:
+        logger.warning(
+            f"WebSocket authentication failed for room {room_code}: {e.detail}"
+        )
         await websocket.close(code=1008)
         return
 
-    # Проверка существования пользователя
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        logger.warning(f"User {user_id} not found")
+    if user.id != user_id:
+        logger.warning(f"Token of user {user.id} used to connect as user {user_id}")
         await websocket.close(code=1008)
         return
 
-    # Подключение пользователя к комнате
-    await manager.connect(websocket, room_code, user_id)
+    # Пользователь подключения не зависит от сессии базы данных
+    user = user_from_snapshot(user_snapshot(user))
 
-    try:
-        from app.schemas.room import RoomResponse
-        from app.schemas.player import PlayerResponse
-
-        room_data = RoomResponse(
-            id=room.id,
-            code=room.code,
-            status=room.status,
-            max_players=room.max_players,
-            rounds_total=room.rounds_total,
-            time_per_round=room.time_per_round,
-            current_round=room.current_round,
-            created_at=room.created_at,
-            player_count=(
-                len(room.players) if hasattr(room, "players") and room.players else 0
-            ),
-            current_word_id=(
-                room.current_word_id if hasattr(room, "current_word_id") else None
-            ),
-            is_full=room.is_full(),
-            players=(
-                [
-                    PlayerResponse(
-                        id=player.id,
-                        name=(
-                            player.user.name
-                            if hasattr(player, "user") and player.user
-                            else f"Player {player.id}"
-                        ),
-                    )
-                    for player in room.players
-                ]
-                if hasattr(room, "players") and room.players
-                else []
-            ),
-        )
-
-        room_dict = room_data.dict()
-        json_data = json.dumps(
-            {"type": "room_update", "room": room_dict},
-            default=manager.serialize_datetime,
-        )
+    # Проверка комнаты и участия пользователя; начальное состояние
+    initial_state = await build_initial_state(room_code, user_id, db)
+    if initial_state is None:
+        logger.warning(f"User {user_id} is not a player of room {room_code}")
+        await websocket.close(code=1008)
+        return
 
-        await websocket.send_text(json_data)
+    # Соединение с базой не удерживается, пока открыт WebSocket
+    db.close()
 
-        # Отправляем запрос на обновление состояния игры для этого игрока
-        from app.api.endpoints.game import send_game_state_update
+    # Подключение пользователя к комнате
+    await manager.connect(websocket, room_code, user_id, WS_AUTH_SUBPROTOCOL)
 
-        await send_game_state_update(room_code, db)
+    try:
+        # Начальное состояние отправляется одним сообщением только этому клиенту
+        await manager.send_to_websocket(websocket, initial_state)
 
         # Ожидание сообщений от клиента
         while True:
@@ -215,24 +594,29 @@ async def websocket_endpoint(
             logger.info(
                 f"Received message from user {user_id} in room {room_code}: {data}"
             )
-            message = json.loads(data)
+            try:
+                message = json.loads(data)
+            except json.JSONDecodeError:
+                message = None
+            if not isinstance(message, dict):
+                ack = CommandAck(
+                    ok=False, status=422, detail="Неверный формат сообщения"
+                )
+                await manager.send_to_websocket(websocket, ack.model_dump())
+                continue
 
             # Обработка сообщения
-            if message["type"] == "chat":
-                # Рассылка сообщениея всем участникам комнаты
-                await manager.broadcast(
-                    room_code,
-                    {"type": "chat", "user_id": user_id, "message": message["message"]},
-                    exclude_user_id=user_id,
-                )
-            elif message["type"] == "game_action":
+            if message.get("type") in COMMAND_TYPES:
+                # Игровая команда: догадка, сообщение в чат, конец хода, выход
+                await handle_command(websocket, message, room_code, user, db)
+            elif message.get("type") == "game_action":
                 # Рассылка игрового действие всем участникам комнаты
                 await manager.broadcast(
                     room_code,
                     {
                         "type": "game_action",
                         "user_id": user_id,
-                        "action": message["action"],
+                        "action": message.get("action"),
                     },
                     exclude_user_id=user_id,
                 )
@@ -240,11 +624,12 @@ async def websocket_endpoint(
     except WebSocketDisconnect:
         logger.info(f"User {user_id} disconnected from room {room_code}")
         # Обработка отключения пользователя
-        manager.disconnect(room_code, user_id)
+        manager.disconnect(room_code, user_id, websocket)
     except Exception as e:
         logger.exception(
             f"Error in websocket_endpoint for room {room_code}, user_id {user_id}: {str(e)}"
         )
+        manager.disconnect(room_code, user_id, websocket)
         try:
             await websocket.close(code=1011, reason=f"Internal error: {str(e)}")
         except:
@@ -0,0 +1,81 @@
+from collections import deque
+from typing import Dict, Iterable, List, Set, Tuple
+
+"""
+Модуль автомата Ахо-Корасик.
+Находит все вхождения набора строк в тексте за один линейный проход,
+вместо отдельного поиска подстроки для каждой строки набора.
+"""
+
+
+class AhoCorasick:
+    """
+    Автомат для поиска набора строк.
+    Строится один раз; поиск занимает O(длина текста + число совпадений).
+    """
+
+    __slots__ = ("_goto", "_fail", "_output")
+
+    def __init__(self, patterns: Iterable[str]):
+        # Переходы, суффиксные ссылки и найденные строки для каждого состояния
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[str, ...]] = [()]
+
+        for pattern in patterns:
+            if pattern:
+                self._add(pattern)
+        self._link()
+
+    def _add(self, pattern: str):
+        """Добавляет строку в бор"""
+        state = 0
+        for char in pattern:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(())
+            state = next_state
+
+        if pattern not in self._output[state]:
+            self._output[state] += (pattern,)
+
+    def _link(self):
+        """Строит суффиксные ссылки обходом бора в ширину"""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+
+                self._fail[next_state] = fail
+                self._output[next_state] += self._output[fail]
+
+    def find(self, text: str) -> Set[str]:
+        """
+        Ищет строки набора в тексте.
+
+        Параметры:
+        - text: Текст для поиска
+
+        Возвращает:
+        - Множество строк, встречающихся в тексте.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        found = set()
+        state = 0
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if output[state]:
+                found.update(output[state])
+        return found
@@ -0,0 +1,278 @@
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from spacy.language import Language
+from spacy.tokens import Token
+from app.core.aho_corasick import AhoCorasick
+from app.core.lemma_cache import LemmaCache, TokenInfo
+
+"""
+Модуль фильтра сообщений объясняющего.
+Леммы загаданного слова и его ассоциаций вычисляются один раз на слово
+и кэшируются в памяти, поэтому проверка сообщения стоит одного вызова
+конвейера spaCy для самого сообщения и нескольких поисков по множествам.
+"""
+
+# Минимальная длина токена сообщения, для которого сравниваются леммы
+MIN_LEMMA_TOKEN_LENGTH = 4
+
+WORD_FORBIDDEN_MESSAGE = "Запрещено использовать загаданное слово в сообщении"
+
+
+def token_lemma(token: Token) -> str:
+    """
+    Лемма токена.
+    Без морфологической модели (spacy.blank) лемма пустая, поэтому
+    используется сам текст токена.
+    """
+    return token.lemma_ or token.text
+
+
+@dataclass(frozen=True, slots=True)
+class WordLemmas:
+    """Предвычисленные формы загаданного слова и его ассоциаций"""
+
+    word: str
+    word_lemma: str
+    associations: Tuple[str, ...]
+    # Лемма первого токена ассоциации -> ассоциация
+    association_lemmas: Dict[str, str]
+    # Автомат для поиска слова и ассоциаций как подстрок сообщения
+    matcher: AhoCorasick
+
+
+def build_word_lemmas(
+    nlp: Language, word: str, associations: Iterable[str]
+) -> WordLemmas:
+    """
+    Вычисляет леммы слова и ассоциаций.
+
+    Параметры:
+    - nlp: Конвейер spaCy
+    - word: Загаданное слово
+    - associations: Запрещенные ассоциации
+
+    Возвращает:
+    - Формы слова в нижнем регистре с леммами.
+    """
+    word = word.lower()
+    associations = tuple(assoc.lower() for assoc in associations)
+
+    word_doc = nlp(word)
+    word_lemma = token_lemma(word_doc[0]) if len(word_doc) > 0 else word
+
+    association_lemmas = {}
+    for assoc, assoc_doc in zip(associations, nlp.pipe(associations)):
+        if len(assoc_doc) > 0:
+            association_lemmas[token_lemma(assoc_doc[0])] = assoc
+
+    return WordLemmas(
+        word=word,
+        word_lemma=word_lemma,
+        associations=associations,
+        association_lemmas=association_lemmas,
+        matcher=AhoCorasick((word,) + associations),
+    )
+
+
+def normalize_word_data(word_data: Dict[str, Any]) -> Tuple[str, Tuple[str, ...]]:
+    """Слово и ассоциации в нижнем регистре"""
+    return (
+        word_data["word"].lower(),
+        tuple(assoc.lower() for assoc in word_data["associations"]),
+    )
+
+
+def analyze_messages(
+    nlp: Language,
+    messages: Sequence[str],
+    cache: Optional[LemmaCache] = None,
+) -> List[List[TokenInfo]]:
+    """
+    Разбирает сообщения на токены с леммами и признаком стоп-слова.
+
+    С кэшем конвейер обрабатывает одним пакетом только сообщения, которых
+    нет в кэше, целиком: леммы совпадают с разбором без кэша.
+
+    Параметры:
+    - nlp: Конвейер spaCy
+    - messages: Тексты сообщений в нижнем регистре
+    - cache: Кэш лемм сообщений
+
+    Возвращает:
+    - Для каждого сообщения список (текст, лемма, стоп-слово).
+    """
+    if cache is None:
+        return [
+            [(token.text, token_lemma(token), token.is_stop) for token in doc]
+            for doc in nlp.pipe(messages)
+        ]
+
+    known: Dict[str, Tuple[TokenInfo, ...]] = {}
+    unseen = []
+    for message in messages:
+        if message in known:
+            continue
+        tokens = cache.get(message)
+        if tokens is None:
+            unseen.append(message)
+            # Заглушка до разбора, чтобы не искать сообщение в кэше повторно
+            tokens = ()
+        known[message] = tokens
+
+    for message, doc in zip(unseen, nlp.pipe(unseen)):
+        known[message] = tuple(
+            (token.text, token_lemma(token), token.is_stop) for token in doc
+        )
+        cache.put(message, known[message])
+
+    return [list(known[message]) for message in messages]
+
+
+def check_tokens(
+    lemmas: WordLemmas, message_lower: str, tokens: Sequence[TokenInfo]
+) -> Optional[str]:
+    """
+    Проверяет разобранное сообщение объясняющего на запрещенные слова.
+
+    Параметры:
+    - lemmas: Формы загаданного слова (build_word_lemmas)
+    - message_lower: Текст сообщения в нижнем регистре
+    - tokens: Токены сообщения (analyze_messages)
+
+    Возвращает:
+    - Текст ошибки, если сообщение нарушает правила, иначе None.
+    """
+    # Слово и ассоциации, входящие в сообщение как подстроки (один проход)
+    surface_matches = lemmas.matcher.find(message_lower)
+
+    # Словари вместо множеств сохраняют порядок слов сообщения
+    message_lemmas = dict.fromkeys(
+        lemma
+        for text, lemma, is_stop in tokens
+        if not is_stop and len(text) >= MIN_LEMMA_TOKEN_LENGTH
+    )
+
+    if lemmas.word in surface_matches or lemmas.word_lemma in message_lemmas:
+        return WORD_FORBIDDEN_MESSAGE
+
+    forbidden_words = {}
+
+    for lemma in message_lemmas:
+        assoc = lemmas.association_lemmas.get(lemma)
+        if assoc is not None:
+            forbidden_words[assoc] = None
+
+    for text, _, _ in tokens:
+        if text in surface_matches:
+            forbidden_words[text] = None
+
+    for assoc in lemmas.associations:
+        if assoc in surface_matches:
+            forbidden_words[assoc] = None
+
+    return _forbidden_words_message(forbidden_words)
+
+
+def check_message(
+    nlp: Language,
+    lemmas: WordLemmas,
+    message: str,
+    cache: Optional[LemmaCache] = None,
+) -> Optional[str]:
+    """
+    Проверяет сообщение объясняющего на запрещенные слова.
+
+    Параметры:
+    - nlp: Конвейер spaCy
+    - lemmas: Формы загаданного слова (build_word_lemmas)
+    - message: Текст сообщения
+    - cache: Кэш лемм токенов
+
+    Возвращает:
+    - Текст ошибки, если сообщение нарушает правила, иначе None.
+    """
+    message_lower = message.lower()
+    tokens = analyze_messages(nlp, [message_lower], cache)[0]
+    return check_tokens(lemmas, message_lower, tokens)
+
+
+def check_surface(word_data: Dict[str, Any], message: str) -> Optional[str]:
+    """
+    Упрощенная проверка без морфологического анализа: ищет слово
+    и ассоциации как подстроки сообщения.
+    Используется, когда анализ сообщения не уложился во время.
+    """
+    word, associations = normalize_word_data(word_data)
+    message_lower = message.lower()
+
+    if word in message_lower:
+        return WORD_FORBIDDEN_MESSAGE
+
+    forbidden_words = dict.fromkeys(
+        assoc for assoc in associations if assoc in message_lower
+    )
+    return _forbidden_words_message(forbidden_words)
+
+
+def _forbidden_words_message(forbidden_words: Iterable[str]) -> Optional[str]:
+    """Текст ошибки со списком запрещенных слов или None"""
+    forbidden_words = list(forbidden_words)
+    if forbidden_words:
+        return f"Запрещено использовать слова: {', '.join(forbidden_words)}"
+    return None
+
+
+class ChatFilterIndex:
+    """
+    Кэш предвычисленных лемм по ID слова.
+    Запись пересчитывается, если текст слова или ассоциации изменились.
+    """
+
+    def __init__(self):
+        self._entries: Dict[int, WordLemmas] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, word_data: Dict[str, Any]) -> Optional[WordLemmas]:
+        """
+        Леммы слова из кэша или None, если их еще нет
+        или слово изменилось с момента вычисления.
+        """
+        entry = self._entries.get(word_data["id"])
+        if entry is None:
+            return None
+
+        word, associations = normalize_word_data(word_data)
+        if entry.word != word or entry.associations != associations:
+            return None
+        return entry
+
+    def put(self, word_id: int, lemmas: WordLemmas):
+        """Сохраняет леммы слова"""
+        with self._lock:
+            self._entries[word_id] = lemmas
+
+    def get(self, nlp: Language, word_data: Dict[str, Any]) -> WordLemmas:
+        """
+        Возвращает леммы слова, вычисляя их при первом обращении.
+
+        Параметры:
+        - nlp: Конвейер spaCy
+        - word_data: Данные слова (id, word, associations)
+        """
+        entry = self.lookup(word_data)
+        if entry is None:
+            entry = build_word_lemmas(nlp, *normalize_word_data(word_data))
+            self.put(word_data["id"], entry)
+        return entry
+
+    def clear(self):
+        """Очищает кэш"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+chat_filters = ChatFilterIndex()
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 
 """
 Модуль конфигурации приложения.
@@ -23,6 +24,62 @@ class Settings(BaseSettings):
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 43200
+    # Добавлять ID пользователя в токен (поиск пользователя по первичному ключу)
+    JWT_INCLUDE_USER_ID: bool = True
+    # Время жизни записи кэша аутентифицированных пользователей (секунды,
+    # 0 - кэш отключен)
+    AUTH_CACHE_TTL: float = 60.0
+    # Максимальное число токенов в кэше аутентифицированных пользователей
+    AUTH_CACHE_SIZE: int = 10000
+    # Хранилище отозванных токенов: "memory" - в памяти процесса,
+    # "database" - в таблице PostgreSQL, общей для всех процессов сервера
+    TOKEN_REVOCATION_BACKEND: Literal["memory", "database"] = "memory"
+    # Интервал удаления истекших записей из таблицы отозванных токенов (секунды)
+    TOKEN_REVOCATION_PURGE_INTERVAL: float = 300.0
+    # Сколько секунд процесс помнит, что токен не отозван, прежде чем снова
+    # проверить таблицу отозванных токенов (для хранилища "database")
+    TOKEN_REVOCATION_CHECK_TTL: float = 2.0
+
+    # Максимальное время отправки одного WebSocket-сообщения клиенту (секунды)
+    WS_SEND_TIMEOUT: float = 5.0
+    # Размер очереди клиента, после которого некритичные сообщения отбрасываются
+    WS_QUEUE_SOFT_LIMIT: int = 32
+    # Размер очереди клиента, после которого медленный клиент отключается
+    WS_QUEUE_HIGH_WATER: int = 256
+    # Некритичные типы сообщений, которые можно отбрасывать
+    WS_DROPPABLE_MESSAGE_TYPES: set[str] = {"game_state_update", "wrong_guess"}
+    # Типы сообщений, для которых в очереди хранится только последняя версия
+    WS_COALESCED_MESSAGE_TYPES: set[str] = {"game_state_update"}
+    # Интервал контрольной рассылки состояния игры (секунды)
+    GAME_STATE_HEARTBEAT_INTERVAL: float = 15.0
+    # Максимальное время, которое загрузка состояния комнаты ждет записи
+    # снятых с нее изменений (секунды)
+    ROOM_STATE_PERSIST_WAIT: float = 5.0
+    # Профиль модели spaCy: "full" - все компоненты, "lemma" - только нужные
+    # для лемматизации, "blank" - токенизатор без морфологии
+    NLP_PROFILE: Literal["full", "lemma", "blank"] = "lemma"
+    # Число процессов для анализа сообщений чата (0 - анализ в пуле потоков)
+    NLP_WORKERS: int = 2
+    # Максимальное время анализа сообщения, после которого применяется
+    # упрощенная проверка без морфологии (секунды)
+    NLP_TIMEOUT: float = 1.0
+    # Максимальное число сообщений в одном пакете nlp.pipe
+    NLP_BATCH_SIZE: int = 32
+    # Время ожидания сообщений для пакета (секунды)
+    NLP_BATCH_WINDOW: float = 0.005
+    # Число сообщений в кэше лемм каждого процесса анализа
+    NLP_LEMMA_CACHE_SIZE: int = 50000
+    # Сложности комнат, в которых засчитываются догадки с одной опечаткой
+    GUESS_TYPO_DIFFICULTIES: set[str] = {"basic", "medium"}
+    # Минимальная длина слова, для которой допускается опечатка
+    GUESS_TYPO_MIN_LENGTH: int = 5
+    # Число потоков для хеширования и проверки паролей (bcrypt)
+    PASSWORD_HASH_WORKERS: int = 2
+    # Число операций с паролями, которые могут ждать свободного потока;
+    # остальные запросы сразу получают 503
+    PASSWORD_HASH_MAX_PENDING: int = 32
+    # Значение заголовка Retry-After при перегрузке пула паролей (секунды)
+    PASSWORD_HASH_RETRY_AFTER: int = 1
 
     @property
     def DATABASE_URL(self) -> str:
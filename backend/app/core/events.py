@@ -0,0 +1,63 @@
+import logging
+from contextlib import asynccontextmanager
+from fastapi import FastAPI
+from app.db.deps import get_db
+from app.core.room_state import room_states
+from app.core.timers import round_timers
+from app.core.word_catalog import word_catalog
+from app.core.nlp_executor import nlp_executor
+from app.core.password_hasher import password_hasher
+
+"""
+Модуль событий жизненного цикла приложения.
+При запуске загружает каталог слов, запускает процессы анализа чата
+и восстанавливает таймеры идущих игр, при остановке записывает
+несохраненное состояние комнат в базу данных.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+async def on_startup():
+    """
+    Загружает каталог слов, запускает процессы анализа чата
+    и восстанавливает таймеры раундов после перезапуска сервера
+    """
+    from app.api.endpoints.game import recover_round_timers
+
+    nlp_executor.start()
+
+    session_generator = get_db()
+    db = next(session_generator)
+    try:
+        word_catalog.load(db)
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Ошибка при загрузке каталога слов: {e}")
+
+    try:
+        recovered = recover_round_timers(db)
+        logger.info(f"Восстановлено таймеров раундов: {recovered}")
+    except Exception as e:
+        logger.error(f"Ошибка при восстановлении таймеров раундов: {e}")
+    finally:
+        next(session_generator, None)
+
+
+async def on_shutdown():
+    """
+    Останавливает таймеры, процессы анализа чата и пул хеширования паролей,
+    записывает состояние комнат
+    """
+    round_timers.clear()
+    nlp_executor.shutdown()
+    password_hasher.shutdown()
+    room_states.flush_all()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Жизненный цикл приложения FastAPI"""
+    await on_startup()
+    yield
+    await on_shutdown()
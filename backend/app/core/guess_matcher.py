@@ -0,0 +1,153 @@
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterator, Tuple
+
+"""
+Модуль проверки догадок.
+Для каждого слова один раз строится множество принимаемых нормальных форм:
+начальная форма, написание через «е» вместо «ё» и частые падежные формы.
+Проверка догадки - поиск нормализованной строки в этом множестве.
+Опечатки (расстояние Дамерау-Левенштейна не больше 1) находятся по индексу
+удалений одной буквы, который тоже строится один раз на слово.
+"""
+
+# Символы, которые отбрасываются по краям догадки
+_GUESS_STRIP_CHARS = " \t\n.,!?;:\"'«»()"
+
+_CONSONANTS = set("бвгджзйклмнпрстфхцчшщ")
+
+# Окончания существительных по последней букве начальной формы:
+# (сколько букв отбросить, окончания падежных форм обоих чисел)
+_INFLECTIONS = {
+    "а": (1, ("ы", "и", "е", "у", "ой", "ою", "ам", "ами", "ах")),
+    "я": (1, ("и", "е", "ю", "ей", "ею", "ям", "ями", "ях")),
+    "о": (1, ("а", "у", "е", "ом", "ам", "ами", "ах")),
+    "е": (1, ("я", "ю", "ем", "и", "ей", "ям", "ями", "ях")),
+    "ь": (1, ("я", "ю", "е", "ем", "и", "ей", "ью", "ям", "ями", "ях")),
+    "й": (1, ("я", "ю", "е", "ем", "и", "ев", "ям", "ями", "ях")),
+}
+_CONSONANT_INFLECTIONS = (
+    0,
+    ("а", "у", "е", "ом", "ы", "и", "ов", "ей", "ам", "ами", "ах"),
+)
+
+
+def normalize_guess(text: str) -> str:
+    """
+    Нормализует текст догадки или слова: нижний регистр, «ё» -> «е»,
+    без знаков препинания по краям и повторных пробелов.
+    """
+    text = " ".join(text.lower().split())
+    return text.strip(_GUESS_STRIP_CHARS).replace("ё", "е")
+
+
+@lru_cache(maxsize=4096)
+def accepted_forms(word: str) -> FrozenSet[str]:
+    """
+    Формы, которые засчитываются как правильный ответ для слова.
+    Слова в базе хранятся в начальной форме, поэтому она и есть лемма.
+
+    Параметры:
+    - word: Загаданное слово
+
+    Возвращает:
+    - Множество нормализованных форм слова.
+    """
+    base = normalize_guess(word)
+    forms = {base}
+
+    # Составные слова (через пробел или дефис) принимаются только целиком
+    if not base or " " in base or "-" in base:
+        return frozenset(forms)
+
+    last = base[-1]
+    if last in _INFLECTIONS:
+        drop, endings = _INFLECTIONS[last]
+    elif last in _CONSONANTS:
+        drop, endings = _CONSONANT_INFLECTIONS
+    else:
+        return frozenset(forms)
+
+    stem = base[: len(base) - drop]
+    if stem:
+        forms.update(stem + ending for ending in endings)
+    return frozenset(forms)
+
+
+def _deletions(text: str) -> Iterator[str]:
+    """Строки, полученные удалением одной буквы"""
+    for i in range(len(text)):
+        yield text[:i] + text[i + 1 :]
+
+
+@lru_cache(maxsize=4096)
+def typo_index(word: str) -> Dict[str, Tuple[str, ...]]:
+    """
+    Индекс удалений для поиска опечаток: каждая принимаемая форма слова
+    и все ее варианты без одной буквы -> формы, из которых они получены.
+    """
+    index: Dict[str, Tuple[str, ...]] = {}
+    for form in accepted_forms(word):
+        for variant in (form, *_deletions(form)):
+            if form not in index.get(variant, ()):
+                index[variant] = index.get(variant, ()) + (form,)
+    return index
+
+
+def _within_one_edit(a: str, b: str) -> bool:
+    """
+    Отличаются ли строки не больше чем на одну правку: вставку, удаление,
+    замену буквы или перестановку соседних букв. Работает за O(длина).
+    """
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if i == len(a):
+        return True
+
+    if len(a) < len(b):
+        return a[i:] == b[i + 1 :]
+    if a[i + 1 :] == b[i + 1 :]:
+        return True
+    return (
+        i + 1 < len(a)
+        and a[i] == b[i + 1]
+        and a[i + 1] == b[i]
+        and a[i + 2 :] == b[i + 2 :]
+    )
+
+
+def is_correct_guess(
+    word: str, guess: str, typo_tolerance: bool = False, typo_min_length: int = 5
+) -> bool:
+    """
+    Проверяет догадку.
+
+    Параметры:
+    - word: Загаданное слово
+    - guess: Текст догадки
+    - typo_tolerance: Засчитывать догадки с одной опечаткой
+    - typo_min_length: Минимальная длина слова, для которой допускается опечатка
+
+    Возвращает:
+    - True, если догадка совпадает с одной из принимаемых форм слова
+      (или отличается от нее на одну правку, если опечатки допускаются).
+    """
+    guess = normalize_guess(guess)
+    if guess in accepted_forms(word):
+        return True
+
+    if not typo_tolerance or len(normalize_guess(word)) < typo_min_length:
+        return False
+
+    # Кандидаты: формы, у которых есть общий вариант удаления с догадкой
+    index = typo_index(word)
+    for variant in (guess, *_deletions(guess)):
+        for form in index.get(variant, ()):
+            if _within_one_edit(guess, form):
+                return True
+    return False
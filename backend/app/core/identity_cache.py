@@ -0,0 +1,128 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Set, Tuple
+from app.core.config import settings
+
+"""
+Модуль кэша аутентифицированных пользователей.
+Каждый запрос игрока (догадка, сообщение чата) проходит через get_current_user;
+чтобы не декодировать JWT и не искать пользователя в базе каждый раз,
+данные пользователя запоминаются по токену на короткое время.
+Записи удаляются при выходе из системы и при изменении профиля.
+"""
+
+# Запись кэша: (момент устаревания по time.monotonic, ID пользователя, данные,
+# ID токена)
+_Entry = Tuple[float, int, Dict[str, Any], Optional[str]]
+
+
+class IdentityCache:
+    """
+    Ограниченный LRU-кэш с временем жизни: токен -> данные пользователя.
+    Запись живет не дольше ttl секунд и не дольше срока действия токена.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        # Токены каждого пользователя, чтобы сбросить их при изменении профиля
+        self._tokens_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Данные пользователя по токену или None, если записи нет или она устарела"""
+        entry = self.lookup(token)
+        return entry[0] if entry is not None else None
+
+    def lookup(self, token: str) -> Optional[Tuple[Dict[str, Any], Optional[str]]]:
+        """
+        Данные пользователя и ID токена (jti) по токену.
+
+        Возвращает:
+        - Пару (данные, ID токена) или None, если записи нет или она устарела.
+        """
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None or entry[0] <= time.monotonic():
+                if entry is not None:
+                    self._remove(token)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(token)
+            self.hits += 1
+            return entry[2], entry[3]
+
+    def put(
+        self,
+        token: str,
+        user_id: int,
+        data: Dict[str, Any],
+        token_expires_at: float,
+        token_id: Optional[str] = None,
+    ):
+        """
+        Запоминает данные пользователя.
+
+        Параметры:
+        - token: JWT токен
+        - user_id: ID пользователя
+        - data: Значения столбцов пользователя
+        - token_expires_at: Момент истечения токена (Unix time)
+        - token_id: ID токена (jti) для проверки отзыва при попадании в кэш
+        """
+        lifetime = min(self.ttl, token_expires_at - time.time())
+        if self.maxsize <= 0 or lifetime <= 0:
+            return
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = (
+                time.monotonic() + lifetime,
+                user_id,
+                data,
+                token_id,
+            )
+            self._tokens_by_user.setdefault(user_id, set()).add(token)
+            while len(self._entries) > self.maxsize:
+                self._remove(next(iter(self._entries)))
+
+    def _remove(self, token: str):
+        """Удаляет запись (вызывается под блокировкой)"""
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        tokens = self._tokens_by_user.get(entry[1])
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self._tokens_by_user[entry[1]]
+
+    def invalidate_token(self, token: str):
+        """Удаляет запись токена (выход из системы)"""
+        with self._lock:
+            self._remove(token)
+
+    def invalidate_user(self, user_id: int):
+        """Удаляет записи всех токенов пользователя (изменение профиля)"""
+        with self._lock:
+            for token in list(self._tokens_by_user.get(user_id, ())):
+                self._remove(token)
+
+    def clear(self):
+        """Очищает кэш и счетчики"""
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+identity_cache = IdentityCache(
+    maxsize=settings.AUTH_CACHE_SIZE, ttl=settings.AUTH_CACHE_TTL
+)
@@ -0,0 +1,66 @@
+import threading
+from collections import OrderedDict
+from typing import Optional, Sequence, Tuple
+
+"""
+Модуль кэша лемм сообщений.
+Объясняющие часто повторяют одни и те же подсказки, поэтому токены сообщения
+с леммами запоминаются по тексту всего сообщения, а конвейер spaCy
+обрабатывает только сообщения, которых еще нет в кэше. Кэш по отдельным
+токенам не подходит: лемма зависит от части речи, которую модель
+определяет по контексту предложения.
+"""
+
+# Токен сообщения: текст, лемма, признак стоп-слова
+TokenInfo = Tuple[str, str, bool]
+
+
+class LemmaCache:
+    """
+    Ограниченный LRU-кэш: текст сообщения -> токены с леммами.
+    Считает попадания и промахи для оценки доли попаданий.
+    """
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[str, Tuple[TokenInfo, ...]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, text: str) -> Optional[Tuple[TokenInfo, ...]]:
+        """Токены сообщения или None при промахе"""
+        with self._lock:
+            entry = self._entries.get(text)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(text)
+            self.hits += 1
+            return entry
+
+    def put(self, text: str, tokens: Sequence[TokenInfo]):
+        """Запоминает токены сообщения, вытесняя давно не использованные"""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._entries[text] = tuple(tokens)
+            self._entries.move_to_end(text)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля попаданий среди всех обращений"""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def clear(self):
+        """Очищает кэш и счетчики"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,82 @@
+import logging
+import threading
+from typing import Optional
+import spacy
+from spacy.language import Language
+from app.core.config import settings
+
+"""
+Модуль модели обработки русского языка (spaCy).
+Фильтру чата нужны только токены, стоп-слова и леммы, поэтому по умолчанию
+модель загружается без синтаксического анализатора и NER.
+Если модель ru_core_news_sm не установлена, используется пустой конвейер
+spacy.blank("ru"): токенизация и стоп-слова без морфологии.
+Модель загружается при первом обращении (или прогревается после старта
+приложения), поэтому импорт модуля не тратит время и память на загрузку.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Название модели spaCy для русского языка
+NLP_MODEL = "ru_core_news_sm"
+
+# Компоненты модели, которые не загружаются в каждом профиле.
+# Лемматизатору (pymorphy) нужны части речи от morphologizer
+# и attribute_ruler, а parser, senter и ner на леммы не влияют.
+NLP_PROFILES = {
+    "full": (),
+    "lemma": ("parser", "senter", "ner"),
+}
+
+
+def load_nlp(profile: str = settings.NLP_PROFILE) -> Language:
+    """
+    Загружает модель spaCy в указанном профиле.
+
+    Параметры:
+    - profile: "full" - все компоненты модели, "lemma" - только компоненты,
+      нужные для лемматизации, "blank" - токенизатор без модели
+
+    Возвращает:
+    - Конвейер spaCy; пустой русский конвейер, если модель не установлена.
+    """
+    if profile == "blank":
+        return spacy.blank("ru")
+    if profile not in NLP_PROFILES:
+        raise ValueError(f"Неизвестный профиль NLP: {profile}")
+
+    try:
+        return spacy.load(NLP_MODEL, exclude=NLP_PROFILES[profile])
+    except OSError:
+        logger.warning(
+            f"Модель {NLP_MODEL} не установлена, используется пустой конвейер"
+        )
+        return spacy.blank("ru")
+
+
+class NlpModel:
+    """Модель spaCy, загружаемая при первом обращении"""
+
+    def __init__(self, profile: str):
+        self.profile = profile
+        self._nlp: Optional[Language] = None
+        self._lock = threading.Lock()
+
+    @property
+    def ready(self) -> bool:
+        """Загружена ли модель"""
+        return self._nlp is not None
+
+    def get(self) -> Language:
+        """Возвращает модель, загружая ее при необходимости"""
+        nlp = self._nlp
+        if nlp is not None:
+            return nlp
+
+        with self._lock:
+            if self._nlp is None:
+                self._nlp = load_nlp(self.profile)
+            return self._nlp
+
+
+nlp_model = NlpModel(settings.NLP_PROFILE)
@@ -0,0 +1,282 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from typing import Any, Dict, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.core.config import settings
+from app.core.nlp import nlp_model
+from app.core.lemma_cache import LemmaCache
+from app.core.chat_filter import (
+    WordLemmas,
+    build_word_lemmas,
+    chat_filters,
+    analyze_messages,
+    check_message,
+    check_tokens,
+    check_surface,
+    normalize_word_data,
+)
+
+"""
+Модуль исполнителя анализа сообщений чата.
+Морфологический анализ выполняется в отдельных процессах с заранее
+загруженной моделью, сообщения отправляются в процессы пакетами (nlp.pipe).
+Если анализ не уложился во время, применяется упрощенная проверка
+без морфологии, поэтому чат не ждет занятые процессы.
+"""
+
+logger = logging.getLogger(__name__)
+
+# Кэш лемм токенов процесса: свой в каждом рабочем процессе
+lemma_cache = LemmaCache(settings.NLP_LEMMA_CACHE_SIZE)
+
+
+def _init_worker():
+    """Загружает модель при запуске рабочего процесса"""
+    nlp_model.get()
+
+
+def _build_lemmas(word: str, associations: Tuple[str, ...]) -> WordLemmas:
+    """Вычисляет леммы слова в рабочем процессе"""
+    return build_word_lemmas(nlp_model.get(), word, associations)
+
+
+def _check_batch(
+    items: List[Tuple[WordLemmas, str]],
+) -> Tuple[List[Optional[str]], Tuple[int, int, int]]:
+    """
+    Проверяет пакет сообщений в рабочем процессе.
+    Новые токены всего пакета разбираются одним вызовом nlp.pipe.
+
+    Возвращает:
+    - Результаты проверки и счетчики кэша лемм процесса (pid, попадания, промахи).
+    """
+    messages = [message.lower() for _, message in items]
+    tokens = analyze_messages(nlp_model.get(), messages, lemma_cache)
+    results = [
+        check_tokens(lemmas, message_lower, message_tokens)
+        for (lemmas, _), message_lower, message_tokens in zip(
+            items, messages, tokens
+        )
+    ]
+    return results, (os.getpid(), lemma_cache.hits, lemma_cache.misses)
+
+
+class NlpExecutor:
+    """
+    Исполнитель проверки сообщений объясняющего.
+
+    При workers = 0 проверка выполняется в пуле потоков текущего процесса,
+    иначе - в пуле процессов. Пул создается при первом обращении (или в start)
+    и пересоздается, если рабочий процесс аварийно завершился.
+    """
+
+    def __init__(
+        self,
+        workers: int,
+        timeout: float,
+        batch_size: int,
+        batch_window: float,
+    ):
+        self.workers = workers
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.batch_window = batch_window
+        self._pool: Optional[ProcessPoolExecutor] = None
+        # Задачи загрузки модели в процессы текущего пула
+        self._warmup: List[Future] = []
+        self._lock = threading.Lock()
+        # Сообщения, ожидающие отправки в рабочий процесс
+        self._batch: List[Tuple[WordLemmas, str, Future]] = []
+        self._flush_scheduled = False
+        # Счетчики проверок и проверок, завершенных упрощенным способом
+        self.checks = 0
+        self.fallbacks = 0
+        # Счетчики кэша лемм рабочих процессов: pid -> (попадания, промахи)
+        self._worker_cache_stats: Dict[int, Tuple[int, int]] = {}
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        """Пул процессов, создаваемый при первом обращении"""
+        with self._lock:
+            if self._pool is None:
+                # spawn вместо fork: процесс сервера многопоточный
+                self._pool = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_init_worker,
+                )
+                self._warmup = [
+                    self._pool.submit(_init_worker) for _ in range(self.workers)
+                ]
+            return self._pool
+
+    def _reset_pool(self):
+        """Отбрасывает пул с аварийно завершившимся процессом"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+            self._warmup = []
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def start(self):
+        """
+        Прогревает модель в фоне, не задерживая запуск приложения:
+        в рабочих процессах или, при workers = 0, в текущем процессе.
+        """
+        if self.workers <= 0:
+            threading.Thread(target=nlp_model.get, daemon=True).start()
+            return
+
+        self._get_pool()
+
+    @property
+    def ready(self) -> bool:
+        """Загружена ли модель, которой проверяются сообщения"""
+        if self.workers <= 0:
+            return nlp_model.ready
+        return bool(self._warmup) and all(
+            future.done() and future.exception() is None for future in self._warmup
+        )
+
+    def shutdown(self):
+        """Останавливает рабочие процессы"""
+        self._reset_pool()
+
+    async def check(self, word_data: Dict[str, Any], message: str) -> Optional[str]:
+        """
+        Проверяет сообщение объясняющего на запрещенные слова.
+
+        Параметры:
+        - word_data: Данные загаданного слова (id, word, associations)
+        - message: Текст сообщения
+
+        Возвращает:
+        - Текст ошибки, если сообщение нарушает правила, иначе None.
+        """
+        self.checks += 1
+        try:
+            return await asyncio.wait_for(
+                self._analyze(word_data, message), self.timeout
+            )
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Анализ сообщения не уложился в {self.timeout} с, "
+                "применяется упрощенная проверка"
+            )
+        except BrokenProcessPool:
+            logger.error("Рабочий процесс анализа сообщений завершился аварийно")
+            self._reset_pool()
+        except Exception as e:
+            logger.error(f"Ошибка при анализе сообщения: {e}")
+
+        self.fallbacks += 1
+        return check_surface(word_data, message)
+
+    async def _analyze(self, word_data: Dict[str, Any], message: str) -> Optional[str]:
+        """Полная проверка с морфологическим анализом"""
+        if self.workers <= 0:
+            return await run_in_threadpool(self._analyze_inline, word_data, message)
+
+        lemmas = chat_filters.lookup(word_data)
+        if lemmas is None:
+            future = self._get_pool().submit(
+                _build_lemmas, *normalize_word_data(word_data)
+            )
+            lemmas = await asyncio.wrap_future(future)
+            chat_filters.put(word_data["id"], lemmas)
+
+        return await asyncio.wrap_future(self._enqueue(lemmas, message))
+
+    def _analyze_inline(self, word_data: Dict[str, Any], message: str) -> Optional[str]:
+        """Проверка в текущем процессе"""
+        nlp = nlp_model.get()
+        return check_message(
+            nlp, chat_filters.get(nlp, word_data), message, lemma_cache
+        )
+
+    def _enqueue(self, lemmas: WordLemmas, message: str) -> Future:
+        """
+        Добавляет сообщение в пакет.
+        Пакет отправляется, когда наберется batch_size сообщений
+        или пройдет batch_window секунд с первого сообщения.
+        """
+        future = Future()
+        flush_now = schedule_flush = False
+        with self._lock:
+            self._batch.append((lemmas, message, future))
+            if len(self._batch) >= self.batch_size:
+                flush_now = True
+            elif not self._flush_scheduled:
+                self._flush_scheduled = schedule_flush = True
+
+        if flush_now:
+            self._flush()
+        elif schedule_flush:
+            asyncio.get_running_loop().call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self):
+        """Отправляет накопленный пакет в рабочий процесс"""
+        with self._lock:
+            batch, self._batch = self._batch, []
+            self._flush_scheduled = False
+
+        # Сообщения, которые перестали ждать (таймаут), не отправляются
+        batch = [item for item in batch if item[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+
+        try:
+            pool_future = self._get_pool().submit(
+                _check_batch, [(lemmas, message) for lemmas, message, _ in batch]
+            )
+        except Exception as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        pool_future.add_done_callback(partial(self._resolve_batch, batch))
+
+    def _resolve_batch(
+        self, batch: List[Tuple[WordLemmas, str, Future]], pool_future: Future
+    ):
+        """Передает результаты пакета ожидающим сообщениям"""
+        try:
+            results, (pid, hits, misses) = pool_future.result()
+        except BaseException as e:
+            for _, _, future in batch:
+                future.set_exception(e)
+            return
+
+        self._worker_cache_stats[pid] = (hits, misses)
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+    def stats(self) -> Dict[str, Any]:
+        """Счетчики проверок и доля попаданий в кэш лемм"""
+        if self.workers <= 0:
+            hits, misses = lemma_cache.hits, lemma_cache.misses
+        else:
+            hits = sum(h for h, _ in self._worker_cache_stats.values())
+            misses = sum(m for _, m in self._worker_cache_stats.values())
+        total = hits + misses
+        return {
+            "checks": self.checks,
+            "fallbacks": self.fallbacks,
+            "lemma_cache_hits": hits,
+            "lemma_cache_misses": misses,
+            "lemma_cache_hit_rate": round(hits / total, 4) if total else 0.0,
+        }
+
+
+nlp_executor = NlpExecutor(
+    workers=settings.NLP_WORKERS,
+    timeout=settings.NLP_TIMEOUT,
+    batch_size=settings.NLP_BATCH_SIZE,
+    batch_window=settings.NLP_BATCH_WINDOW,
+)
@@ -0,0 +1,127 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException, status
+from app.core.config import settings
+from app.core.security import get_password_hash, verify_password
+
+"""
+Модуль пула хеширования паролей.
+bcrypt намеренно медленный (сотни миллисекунд на пароль), поэтому хеширование
+и проверка паролей выполняются в отдельном ограниченном пуле потоков,
+а не в цикле событий. Если очередь пула переполнена, запрос сразу получает
+503, чтобы всплеск регистраций и входов не останавливал игры на сервере.
+"""
+
+OVERLOADED_MESSAGE = "Сервер перегружен, повторите попытку позже"
+
+
+class PasswordHasher:
+    """
+    Ограниченный пул для операций bcrypt.
+
+    Одновременно выполняется не больше workers операций, еще не больше
+    max_pending ждут в очереди. Пул создается при первом обращении.
+    """
+
+    def __init__(self, workers: int, max_pending: int, retry_after: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._pool: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        # Операции, принятые в пул и еще не завершенные
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        # Счетчики выполненных и отклоненных операций
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def queue_depth(self) -> int:
+        """Число операций, ожидающих свободного потока"""
+        return max(self.in_flight - self.workers, 0)
+
+    def _get_pool(self) -> ThreadPoolExecutor:
+        """Пул потоков, создаваемый при первом обращении"""
+        if self._pool is None:
+            self._pool = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+        return self._pool
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """
+        Отправляет операцию в пул с контролем допуска:
+        если очередь заполнена, сразу отвечает 503 с заголовком Retry-After.
+        """
+        with self._lock:
+            if self.in_flight >= self.workers + self.max_pending:
+                self.rejected += 1
+                raise HTTPException(
+                    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    detail=OVERLOADED_MESSAGE,
+                    headers={"Retry-After": str(self.retry_after)},
+                )
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            pool = self._get_pool()
+
+        try:
+            future = pool.submit(fn, *args)
+        except Exception:
+            with self._lock:
+                self.in_flight -= 1
+            raise
+        future.add_done_callback(self._done)
+        return future
+
+    def _done(self, future: Future):
+        """Освобождает место в очереди после завершения операции"""
+        with self._lock:
+            self.in_flight -= 1
+            if not future.cancelled():
+                self.completed += 1
+
+    async def hash(self, password: str) -> str:
+        """Хеширует пароль в пуле, не блокируя цикл событий"""
+        return await asyncio.wrap_future(self._submit(get_password_hash, password))
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Проверяет пароль в пуле, не блокируя цикл событий"""
+        return await asyncio.wrap_future(
+            self._submit(verify_password, plain_password, hashed_password)
+        )
+
+    def verify_sync(self, plain_password: str, hashed_password: str) -> bool:
+        """
+        Проверяет пароль в пуле из синхронного обработчика.
+        Обработчик ждет в своем потоке, но операция проходит тот же
+        контроль допуска, что и асинхронные.
+        """
+        return self._submit(verify_password, plain_password, hashed_password).result()
+
+    def shutdown(self):
+        """Останавливает потоки пула"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Глубина очереди и счетчики операций"""
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "peak_in_flight": self.peak_in_flight,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_pending=settings.PASSWORD_HASH_MAX_PENDING,
+    retry_after=settings.PASSWORD_HASH_RETRY_AFTER,
+)
@@ -0,0 +1,86 @@
+from typing import Dict, List, Optional
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.room import Room
+from app.models.player import Player
+from app.models.user import User
+from app.schemas.room import RoomResponse
+from app.schemas.player import PlayerResponse
+
+"""
+Модуль загрузки снимков комнат.
+Комнаты, их игроки и имена пользователей загружаются одним запросом
+и собираются в RoomResponse, общий для REST-эндпоинтов и WebSocket.
+"""
+
+
+def load_room_snapshots(db: Session, *conditions) -> List[RoomResponse]:
+    """
+    Загружает комнаты вместе с игроками и их именами одним запросом.
+
+    Параметры:
+    - db: Сессия базы данных
+    - conditions: Условия отбора комнат (например, Room.code == code)
+
+    Возвращает:
+    - Список снимков комнат в порядке ID; игроки упорядочены по ID.
+    """
+    rows = db.execute(
+        select(Room, Player, User.name)
+        .outerjoin(Player, Player.room_id == Room.id)
+        .outerjoin(User, User.id == Player.user_id)
+        .where(*conditions)
+        .order_by(Room.id, Player.id)
+    ).all()
+
+    rooms: Dict[int, Room] = {}
+    players: Dict[int, List[PlayerResponse]] = {}
+    for room, player, user_name in rows:
+        if room.id not in rooms:
+            rooms[room.id] = room
+            players[room.id] = []
+        if player is not None:
+            players[room.id].append(
+                PlayerResponse(
+                    id=player.id,
+                    name=user_name or f"Player {player.id}",
+                    user_id=player.user_id,
+                    room_id=player.room_id,
+                    role=player.role,
+                    score=player.score or 0,
+                    score_total=player.score_total or 0,
+                    joined_at=player.joined_at,
+                    correct_answers=player.correct_answers or 0,
+                    wrong_answers=player.wrong_answers or 0,
+                )
+            )
+
+    return [
+        RoomResponse(
+            id=room.id,
+            code=room.code,
+            status=room.status,
+            max_players=room.max_players,
+            rounds_total=room.rounds_total,
+            time_per_round=room.time_per_round,
+            difficulty=room.difficulty,
+            current_round=room.current_round,
+            created_at=room.created_at,
+            player_count=len(players[room_id]),
+            current_word_id=room.current_word_id,
+            is_full=len(players[room_id]) >= room.max_players,
+            players=players[room_id],
+        )
+        for room_id, room in rooms.items()
+    ]
+
+
+def load_room_snapshot(db: Session, room_code: str) -> Optional[RoomResponse]:
+    """
+    Загружает снимок одной комнаты по коду.
+
+    Возвращает:
+    - Снимок комнаты или None, если комната не найдена.
+    """
+    snapshots = load_room_snapshots(db, Room.code == room_code)
+    return snapshots[0] if snapshots else None
@@ -0,0 +1,484 @@
+import logging
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+from anyio import from_thread
+from fastapi import BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.orm import Session
+from app.models.room import Room, GameStatus
+from app.models.player import Player, PlayerRole
+from app.models.user import User
+from app.models.word import DifficultyEnum
+from app.core.config import settings
+from app.core.word_catalog import WordDeck
+
+"""
+Модуль оперативного состояния игровых комнат.
+Во время игры источником истины является состояние в памяти процесса,
+а в базу данных изменения записываются пакетами на границах хода и игры.
+"""
+
+logger = logging.getLogger(__name__)
+
+
+def _update_rows(db: Session, model: Any, rows: List[Dict[str, Any]]):
+    """
+    Обновляет строки по первичному ключу одним пакетом. В отличие от
+    массового UPDATE через ORM, не требует, чтобы строка существовала:
+    игрок мог выйти, пока снимок ждал записи.
+    """
+    table = model.__table__
+    statement = (
+        update(table)
+        .where(table.c.id == bindparam("_id"))
+        .values({name: bindparam(f"_{name}") for name in rows[0] if name != "id"})
+    )
+    db.execute(statement, [{f"_{k}": v for k, v in row.items()} for row in rows])
+
+
+@dataclass(slots=True)
+class PlayerState:
+    """Состояние игрока в текущей игре"""
+
+    id: int
+    user_id: int
+    name: str
+    role: PlayerRole
+    score: int = 0
+    score_total: int = 0
+    correct_answers: int = 0
+    wrong_answers: int = 0
+
+
+@dataclass(slots=True)
+class RoomState:
+    """
+    Состояние игровой комнаты.
+    Игроки упорядочены по ID, как и при передаче хода.
+    """
+
+    id: int
+    code: str
+    status: GameStatus
+    difficulty: DifficultyEnum
+    current_round: int
+    rounds_total: int
+    time_per_round: int
+    current_word_id: Optional[int] = None
+    # Начало и дедлайн текущего раунда (секунды Unix)
+    round_started_at: Optional[float] = None
+    round_deadline: Optional[float] = None
+    # Колода слов комнаты (создается при первом выборе слова)
+    deck: Optional[WordDeck] = None
+    players: List[PlayerState] = field(default_factory=list)
+    # Данные текущего слова (кешируются при первом обращении)
+    current_word: Optional[Dict[str, Any]] = None
+    # Есть ли изменения, еще не записанные в базу данных
+    dirty: bool = False
+
+    @property
+    def explainer(self) -> Optional[PlayerState]:
+        """Текущий объясняющий игрок"""
+        for player in self.players:
+            if player.role == PlayerRole.EXPLAINING:
+                return player
+        return None
+
+    def get_player(self, player_id: int) -> Optional[PlayerState]:
+        """Поиск игрока по ID"""
+        for player in self.players:
+            if player.id == player_id:
+                return player
+        return None
+
+    def get_player_by_user(self, user_id: int) -> Optional[PlayerState]:
+        """Поиск игрока по ID пользователя"""
+        for player in self.players:
+            if player.user_id == user_id:
+                return player
+        return None
+
+    def next_player(self, player: PlayerState) -> PlayerState:
+        """Игрок, к которому переходит ход после указанного"""
+        try:
+            current_index = self.players.index(player)
+        except ValueError:
+            current_index = 0
+        return self.players[(current_index + 1) % len(self.players)]
+
+    def finish_game(self) -> int:
+        """
+        Завершает игру: переносит очки в общий счет и сбрасывает роли.
+
+        Возвращает:
+        - ID игрока-победителя.
+        """
+        self.status = GameStatus.WAITING
+        self.current_round = 0
+        self.round_started_at = None
+        self.round_deadline = None
+
+        for player in self.players:
+            player.score_total += player.score
+            player.score = 0
+            player.role = PlayerRole.WAITING
+
+        self.dirty = True
+        return max(self.players, key=lambda p: p.score_total).id
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Снимок изменяемых полей для записи в базу данных"""
+        return {
+            "code": self.code,
+            "room": {
+                "id": self.id,
+                "status": self.status,
+                "current_round": self.current_round,
+                "current_word_id": self.current_word_id,
+                "round_started_at": self.round_started_at,
+                "round_deadline": self.round_deadline,
+                "deck_seed": self.deck.seed if self.deck else None,
+                "deck_position": self.deck.position if self.deck else 0,
+            },
+            "players": [
+                {
+                    "id": p.id,
+                    "role": p.role,
+                    "score": p.score,
+                    "score_total": p.score_total,
+                    "correct_answers": p.correct_answers,
+                    "wrong_answers": p.wrong_answers,
+                }
+                for p in self.players
+            ],
+        }
+
+
+class RoomStateStore:
+    """
+    Хранилище состояний комнат.
+    Загружает состояние из базы данных при первом обращении и записывает
+    изменения обратно (write-behind) по запросу игровой логики.
+    Пока снятые изменения комнаты не записаны, ее состояние не загружается
+    из базы данных заново: иначе оно прочитало бы устаревшие строки.
+    """
+
+    def __init__(self):
+        self._rooms: Dict[str, RoomState] = {}
+        self._lock = threading.RLock()
+        # Код комнаты -> число снимков, снятых, но еще не записанных
+        self._persisting: Dict[str, int] = {}
+        self._persisted = threading.Condition(self._lock)
+
+    def get(self, room_code: str, db: Session) -> Optional[RoomState]:
+        """
+        Возвращает состояние комнаты, загружая его из базы данных при промахе.
+
+        Параметры:
+        - room_code: Код комнаты
+        - db: Сессия базы данных
+
+        Возвращает:
+        - Состояние комнаты или None, если комната не найдена.
+        """
+        while True:
+            with self._lock:
+                state = self._rooms.get(room_code)
+                if state is not None:
+                    return state
+                self._wait_persisted(room_code)
+
+            state = self._load(room_code, db)
+            if state is None:
+                return None
+
+            with self._lock:
+                # Пока состояние загружалось, начали записывать снимок
+                # этой комнаты: загруженные строки могут быть устаревшими
+                if room_code in self._persisting:
+                    continue
+                return self._rooms.setdefault(room_code, state)
+
+    def _wait_persisted(self, room_code: str):
+        """
+        Ждет записи снимков комнаты (вызывается под блокировкой).
+        Снимок, запись которого не началась (например, фоновая задача
+        не выполнилась из-за ошибки обработчика), ждем не дольше
+        ROOM_STATE_PERSIST_WAIT секунд.
+        """
+        if not self._persisted.wait_for(
+            lambda: room_code not in self._persisting,
+            timeout=settings.ROOM_STATE_PERSIST_WAIT,
+        ):
+            logger.warning(
+                f"Снимок комнаты {room_code} не записан за "
+                f"{settings.ROOM_STATE_PERSIST_WAIT} с, состояние загружается"
+            )
+            self._persisting.pop(room_code, None)
+
+    async def get_async(self, room_code: str, db: Session) -> Optional[RoomState]:
+        """
+        Асинхронный вариант get для обработчиков в цикле событий:
+        загрузка из базы данных при промахе выполняется в пуле потоков.
+        """
+        with self._lock:
+            state = self._rooms.get(room_code)
+        if state is not None:
+            return state
+
+        state = await run_in_threadpool(self.get, room_code, db)
+        # Пока состояние загружалось, комнату могли сбросить
+        while state is not None and not self.is_current(state):
+            state = await run_in_threadpool(self.get, room_code, db)
+        return state
+
+    def is_current(self, state: RoomState) -> bool:
+        """
+        Является ли объект текущим состоянием своей комнаты.
+        Обработчик, который ждал (await) с полученным состоянием, проверяет это
+        перед изменением: комнату могли сбросить, и изменения объекта,
+        удаленного из хранилища, не увидят другие запросы.
+        """
+        with self._lock:
+            return self._rooms.get(state.code) is state
+
+    def _load(self, room_code: str, db: Session) -> Optional[RoomState]:
+        """Загружает комнату и ее игроков из базы данных"""
+        room = db.scalar(select(Room).where(Room.code == room_code))
+        if not room:
+            return None
+
+        rows = db.execute(
+            select(Player, User.name)
+            .join(User, User.id == Player.user_id)
+            .where(Player.room_id == room.id)
+            .order_by(Player.id)
+        ).all()
+
+        players = [
+            PlayerState(
+                id=player.id,
+                user_id=player.user_id,
+                name=name,
+                role=player.role,
+                score=player.score or 0,
+                score_total=player.score_total or 0,
+                correct_answers=player.correct_answers or 0,
+                wrong_answers=player.wrong_answers or 0,
+            )
+            for player, name in rows
+        ]
+
+        return RoomState(
+            id=room.id,
+            code=room.code,
+            status=room.status,
+            difficulty=room.difficulty,
+            current_round=room.current_round,
+            rounds_total=room.rounds_total,
+            time_per_round=room.time_per_round,
+            current_word_id=room.current_word_id,
+            round_started_at=room.round_started_at,
+            round_deadline=room.round_deadline,
+            deck=(
+                WordDeck.restore(room.deck_seed, room.deck_position)
+                if room.deck_seed is not None
+                else None
+            ),
+            players=players,
+        )
+
+    def _take_snapshot(self, state: RoomState) -> Optional[Dict[str, Any]]:
+        """
+        Снимает изменения состояния и помечает его чистым.
+        До записи снимка (persist) комната считается записываемой.
+        """
+        with self._lock:
+            if not state.dirty:
+                return None
+            state.dirty = False
+            self._persisting[state.code] = self._persisting.get(state.code, 0) + 1
+            snapshot = state.snapshot()
+            snapshot["pending"] = True
+            return snapshot
+
+    def _release(self, snapshot: Dict[str, Any]) -> bool:
+        """
+        Отмечает, что запись снимка завершена.
+
+        Возвращает:
+        - False, если снимок уже был отмечен (или не отслеживался).
+        """
+        with self._lock:
+            if not snapshot.pop("pending", False):
+                return False
+            room_code = snapshot["code"]
+            count = self._persisting.get(room_code, 0) - 1
+            if count > 0:
+                self._persisting[room_code] = count
+            else:
+                self._persisting.pop(room_code, None)
+            self._persisted.notify_all()
+            return True
+
+    async def _persist_async(
+        self,
+        state: RoomState,
+        snapshot: Dict[str, Any],
+        db: Optional[Session] = None,
+    ):
+        """Записывает снимок в пуле потоков"""
+        try:
+            await run_in_threadpool(self.persist, state, snapshot, db)
+        except BaseException:
+            # Отмена до начала записи: снимок не записан, повторим позже
+            if self._release(snapshot):
+                with self._lock:
+                    state.dirty = True
+            raise
+
+    def persist(
+        self,
+        state: RoomState,
+        snapshot: Dict[str, Any],
+        db: Optional[Session] = None,
+    ):
+        """
+        Записывает снимок состояния в базу данных одним пакетом.
+
+        Параметры:
+        - state: Состояние, с которого снят снимок
+        - snapshot: Снимок, полученный из RoomState.snapshot()
+        - db: Сессия базы данных (если не передана, создается новая)
+        """
+        from app.db.deps import get_db
+
+        try:
+            session_generator = None
+            if db is None:
+                session_generator = get_db()
+                db = next(session_generator)
+
+            try:
+                _update_rows(db, Room, [snapshot["room"]])
+                if snapshot["players"]:
+                    _update_rows(db, Player, snapshot["players"])
+                db.commit()
+            except Exception as e:
+                db.rollback()
+                logger.error(
+                    f"Ошибка при сохранении состояния комнаты {snapshot['code']}: {e}"
+                )
+                # Повторим запись на следующей границе хода
+                with self._lock:
+                    state.dirty = True
+            finally:
+                if session_generator is not None:
+                    next(session_generator, None)
+        finally:
+            self._release(snapshot)
+
+    def flush(self, state: RoomState, db: Optional[Session] = None):
+        """
+        Синхронно записывает несохраненные изменения состояния.
+        Записывается именно переданный объект, даже если комнату
+        уже сбросили из хранилища.
+        """
+        snapshot = self._take_snapshot(state)
+        if snapshot is not None:
+            self.persist(state, snapshot, db)
+
+    async def flush_async(self, state: RoomState, db: Optional[Session] = None):
+        """
+        Асинхронный вариант flush: снимок берется сразу,
+        а запись в базу данных выполняется в пуле потоков.
+        """
+        snapshot = self._take_snapshot(state)
+        if snapshot is not None:
+            await self._persist_async(state, snapshot, db)
+
+    def schedule_flush(
+        self,
+        state: RoomState,
+        background_tasks: BackgroundTasks,
+        db: Optional[Session] = None,
+    ):
+        """
+        Планирует запись несохраненных изменений после отправки ответа.
+        Снимок берется сразу, поэтому последующие изменения в него не попадут.
+        """
+        snapshot = self._take_snapshot(state)
+        if snapshot is not None:
+            background_tasks.add_task(self.persist, state, snapshot, db)
+
+    def _detach(
+        self, room_code: str
+    ) -> Optional[Tuple[RoomState, Dict[str, Any]]]:
+        """
+        Удаляет состояние комнаты из памяти и снимает его изменения.
+
+        Возвращает:
+        - Пару (состояние, снимок) или None, если записывать нечего.
+        """
+        with self._lock:
+            state = self._rooms.pop(room_code, None)
+        if state is None:
+            return None
+        snapshot = self._take_snapshot(state)
+        return (state, snapshot) if snapshot is not None else None
+
+    def evict(self, room_code: str, db: Optional[Session] = None):
+        """
+        Записывает изменения и удаляет состояние комнаты из памяти.
+        Вызывается перед изменением состава игроков через базу данных.
+        """
+        detached = self._detach(room_code)
+        if detached is not None:
+            self.persist(*detached, db)
+
+    async def evict_async(self, room_code: str, db: Optional[Session] = None):
+        """
+        Асинхронный вариант evict: состояние удаляется сразу,
+        а запись в базу данных выполняется в пуле потоков.
+        """
+        detached = self._detach(room_code)
+        if detached is not None:
+            await self._persist_async(*detached, db)
+
+    def evict_from_thread(self, room_code: str, db: Optional[Session] = None):
+        """
+        Вариант evict для синхронных обработчиков, которые FastAPI выполняет
+        в пуле потоков. Состояние удаляется и снимается в цикле событий,
+        где его меняют игровые обработчики, а запись выполняется
+        в текущем потоке.
+        """
+        detached = from_thread.run_sync(self._detach, room_code)
+        if detached is not None:
+            self.persist(*detached, db)
+
+    def flush_all(self, db: Optional[Session] = None):
+        """Синхронно записывает несохраненные изменения всех комнат"""
+        with self._lock:
+            states = list(self._rooms.values())
+        for state in states:
+            self.flush(state, db)
+
+    def rename_user(self, user_id: int, name: str):
+        """Обновляет имя пользователя во всех загруженных комнатах"""
+        with self._lock:
+            for state in self._rooms.values():
+                player = state.get_player_by_user(user_id)
+                if player is not None:
+                    player.name = name
+
+    def clear(self):
+        """Удаляет все состояния без записи в базу данных"""
+        with self._lock:
+            self._rooms.clear()
+            self._persisting.clear()
+            self._persisted.notify_all()
+
+
+room_states = RoomStateStore()
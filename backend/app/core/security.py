@@ -1,22 +1,24 @@
 import bcrypt
+import hashlib
+import uuid
 from datetime import datetime, timedelta
 from typing import Optional
 import jwt
 from pydantic import BaseModel
 from fastapi import HTTPException, Depends, status
 from sqlmodel import select
-from sqlalchemy.orm import Session
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session, make_transient_to_detached
 from fastapi.security import OAuth2PasswordBearer
 from app.core.config import settings
+from app.core.identity_cache import identity_cache
+from app.core.token_revocation import revoked_tokens
 from app.db.deps import get_db
 
 # Настройки JWT
 ALGORITHM = settings.ALGORITHM
 ACCESS_TOKEN_EXPIRE_MINUTES = settings.ACCESS_TOKEN_EXPIRE_MINUTES
 
-# Хранение недействительных токенов
-blacklisted_tokens = set()
-
 # Определение способа получения токена
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
@@ -32,6 +34,8 @@ class TokenData(BaseModel):
     """Данные токена"""
 
     email: Optional[str] = None
+    user_id: Optional[int] = None
+    token_id: Optional[str] = None
     exp: Optional[datetime] = None
 
 
@@ -80,6 +84,8 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
         expire = datetime.now() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
 
     to_encode.update({"exp": expire})
+    # ID токена, по которому токен отзывается при выходе из системы
+    to_encode.setdefault("jti", uuid.uuid4().hex)
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -98,24 +104,37 @@ def decode_access_token(token: str) -> dict:
     try:
         payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
         email: str = payload.get("sub")
+        user_id: Optional[int] = payload.get("uid")
         exp: datetime = datetime.fromtimestamp(payload.get("exp"))
+        # У токенов, выданных до появления jti, ID - хеш самого токена
+        token_id: str = payload.get("jti") or hashlib.sha256(token.encode()).hexdigest()
 
         if email is None:
             return None
 
-        return TokenData(email=email, exp=exp)
+        return TokenData(email=email, user_id=user_id, token_id=token_id, exp=exp)
     except jwt.InvalidTokenError:
         return None
 
 
 def invalidate_token(token: str) -> None:
-    """Добавление токена в черный список"""
-    blacklisted_tokens.add(token)
+    """
+    Отзыв токена до истечения срока его действия
+
+    Args:
+        token: JWT токен
+    """
+    identity_cache.invalidate_token(token)
+    token_data = decode_access_token(token)
+    # Недействительный токен и так не пройдет проверку
+    if token_data is None:
+        return
+    revoked_tokens.revoke(token_data.token_id, token_data.exp.timestamp())
 
 
-def is_token_valid(token: str) -> bool:
-    """Проверка валидности токена"""
-    return token not in blacklisted_tokens
+def is_token_revoked(token_data: TokenData, db: Optional[Session] = None) -> bool:
+    """Проверка, отозван ли токен"""
+    return revoked_tokens.is_revoked(token_data.token_id, db)
 
 
 def get_current_user(
@@ -133,17 +152,31 @@ def get_current_user(
         HTTPException: 401 если токен недействителен или пользователь не найден.
     """
 
-    # Проверка валидности токена
-    if not is_token_valid(token):
-        raise HTTPException(status_code=401, detail="Токен недействителен")
+    # Пользователь, недавно прошедший проверку с этим токеном
+    # (при выходе из системы запись токена удаляется из кэша)
+    cached = identity_cache.lookup(token)
+    if cached is not None:
+        data, token_id = cached
+        # Общее хранилище: токен мог быть отозван в другом процессе сервера
+        if revoked_tokens.shared and revoked_tokens.is_revoked(token_id, db):
+            identity_cache.invalidate_token(token)
+            raise HTTPException(status_code=401, detail="Токен недействителен")
+        return user_from_snapshot(data)
 
     # Декодирование данных из токена
     token_data = decode_access_token(token)
     if not token_data or not token_data.email:
         raise HTTPException(status_code=401, detail="Неверные учетные данные")
 
-    # Поиск пользователя в базе данных по email
-    user = get_user_from_db(token_data.email, db)
+    # Проверка, не отозван ли токен
+    if is_token_revoked(token_data, db):
+        raise HTTPException(status_code=401, detail="Токен недействителен")
+
+    # Поиск пользователя в базе данных: по ID из токена или по email
+    if token_data.user_id is not None:
+        user = get_user_by_id(token_data.user_id, token_data.email, db)
+    else:
+        user = get_user_from_db(token_data.email, db)
 
     if user is None:
         raise HTTPException(
@@ -152,6 +185,68 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
 
+    identity_cache.put(
+        token,
+        user.id,
+        user_snapshot(user),
+        token_data.exp.timestamp(),
+        token_id=token_data.token_id,
+    )
+    return user
+
+
+def user_snapshot(user) -> dict:
+    """
+    Значения столбцов пользователя для кэша.
+
+    Args:
+        user (User): Объект пользователя.
+    Returns:
+        dict: Имя столбца -> значение.
+    """
+    return {
+        attr.key: getattr(user, attr.key) for attr in inspect(user).mapper.column_attrs
+    }
+
+
+def user_from_snapshot(data: dict):
+    """
+    Восстанавливает пользователя из кэша без запроса к базе данных.
+    Объект создается заново для каждого запроса и помечается как
+    отсоединенный от сессии, поэтому его можно изменить и сохранить
+    через db.add, как загруженный из базы.
+
+    Args:
+        data (dict): Значения столбцов пользователя.
+    Returns:
+        User: Объект пользователя.
+    """
+    from app.models.user import User
+
+    user = User(**data)
+    make_transient_to_detached(user)
+    return user
+
+
+def get_user_by_id(user_id: int, email: str, db: Session):
+    """
+    Поиск пользователя по первичному ключу из токена.
+    Если email пользователя изменился, токен считается недействительным,
+    как и при поиске по email.
+
+    Args:
+        user_id (int): ID пользователя.
+        email (str): Электронная почта из токена.
+        db (Session): Сессия базы данных.
+
+    Returns:
+        User: Объект пользователя или None.
+    """
+    from app.models.user import User
+
+    user = db.get(User, user_id)
+    if user is None or user.email != email:
+        return None
     return user
 
 
@@ -0,0 +1,174 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+"""
+Модуль планировщика дедлайнов.
+Все дедлайны хранятся в одной куче, а срабатывания обслуживает одна
+задача-потребитель, вместо отдельной спящей задачи на каждую комнату.
+"""
+
+logger = logging.getLogger(__name__)
+
+TimerCallback = Callable[[str], Awaitable[None]]
+
+# Индексы полей записи в куче: [deadline, seq, key, callback]
+_DEADLINE, _SEQ, _KEY, _CALLBACK = range(4)
+
+# Минимальное число отмененных записей, после которого куча перестраивается
+_COMPACT_THRESHOLD = 64
+
+
+class DeadlineScheduler:
+    """
+    Планировщик дедлайнов на основе двоичной кучи.
+
+    На каждый ключ приходится не больше одного активного дедлайна.
+    Перепланирование и отмена работают за O(log n): старая запись
+    помечается отмененной и удаляется из кучи лениво. Время задается
+    в секундах Unix (time.time()), как и timer_start, передаваемый клиентам.
+    """
+
+    def __init__(self):
+        self._heap: List[list] = []
+        self._entries: Dict[str, list] = {}
+        self._counter = itertools.count()
+        self._cancelled = 0
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        # Ссылки на выполняющиеся обработчики, чтобы их не собрал GC
+        self._running = set()
+
+    def schedule(self, key: str, deadline: float, callback: TimerCallback):
+        """
+        Планирует вызов callback(key) в момент deadline.
+        Предыдущий дедлайн с тем же ключом отменяется.
+
+        Параметры:
+        - key: Ключ дедлайна (код комнаты)
+        - deadline: Время срабатывания (секунды Unix)
+        - callback: Асинхронная функция, вызываемая с ключом
+        """
+        self._discard(key)
+
+        entry = [deadline, next(self._counter), key, callback]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+        self._ensure_consumer()
+        # Будим потребителя, если новый дедлайн стал ближайшим
+        if self._heap[0] is entry:
+            self._wakeup.set()
+
+    def cancel(self, key: str) -> bool:
+        """
+        Отменяет дедлайн по ключу.
+
+        Возвращает:
+        - True, если дедлайн был запланирован.
+        """
+        return self._discard(key)
+
+    def deadline(self, key: str) -> Optional[float]:
+        """Время срабатывания дедлайна или None, если он не запланирован"""
+        entry = self._entries.get(key)
+        return entry[_DEADLINE] if entry is not None else None
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self):
+        """Отменяет все дедлайны и останавливает потребителя"""
+        self._heap.clear()
+        self._entries.clear()
+        self._cancelled = 0
+
+        self._stop_consumer()
+
+    def _stop_consumer(self):
+        """Останавливает задачу-потребителя, даже если она в другом цикле"""
+        task, self._task = self._task, None
+        self._wakeup = None
+        if task is not None and not task.done():
+            loop = task.get_loop()
+            if not loop.is_closed():
+                loop.call_soon_threadsafe(task.cancel)
+
+    def _discard(self, key: str) -> bool:
+        """Помечает запись отмененной; из кучи она удалится лениво"""
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return False
+
+        entry[_CALLBACK] = None
+        self._cancelled += 1
+        if (
+            self._cancelled > _COMPACT_THRESHOLD
+            and self._cancelled * 2 > len(self._heap)
+        ):
+            self._heap = [e for e in self._heap if e[_CALLBACK] is not None]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        return True
+
+    def _ensure_consumer(self):
+        """Запускает задачу-потребителя в текущем цикле событий"""
+        loop = asyncio.get_running_loop()
+        if (
+            self._task is not None
+            and not self._task.done()
+            and self._task.get_loop() is loop
+        ):
+            return
+
+        self._stop_consumer()
+        self._wakeup = asyncio.Event()
+        self._task = loop.create_task(self._run(self._wakeup))
+
+    async def _run(self, wakeup: asyncio.Event):
+        """Ожидает ближайший дедлайн и запускает обработчики сработавших"""
+        while True:
+            wakeup.clear()
+            timeout = None
+
+            while self._heap:
+                entry = self._heap[0]
+                if entry[_CALLBACK] is None:
+                    heapq.heappop(self._heap)
+                    self._cancelled -= 1
+                    continue
+
+                delay = entry[_DEADLINE] - time.time()
+                if delay > 0:
+                    timeout = delay
+                    break
+
+                heapq.heappop(self._heap)
+                del self._entries[entry[_KEY]]
+                self._fire(entry[_KEY], entry[_CALLBACK])
+
+            try:
+                await asyncio.wait_for(wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _fire(self, key: str, callback: TimerCallback):
+        """Запускает обработчик дедлайна отдельной короткой задачей"""
+        task = asyncio.create_task(callback(key))
+        self._running.add(task)
+        task.add_done_callback(self._on_done)
+
+    def _on_done(self, task: asyncio.Task):
+        self._running.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"Ошибка в обработчике дедлайна: {task.exception()}")
+
+
+# Дедлайны раундов всех комнат
+round_timers = DeadlineScheduler()
@@ -0,0 +1,216 @@
+import heapq
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.models.revoked_token import RevokedToken
+
+"""
+Модуль хранилища отозванных токенов.
+При выходе из системы ID токена (jti) запоминается до истечения срока
+действия токена; после этого токен и так не пройдет проверку, поэтому
+запись удаляется. Хранилище - в памяти процесса или в таблице PostgreSQL,
+общей для всех процессов сервера.
+"""
+
+
+class RevocationStore:
+    """Хранилище отозванных токенов"""
+
+    # Общее ли хранилище для всех процессов сервера: токен может быть отозван
+    # в другом процессе, поэтому его проверяют и при попадании в кэш
+    # аутентификации
+    shared = False
+
+    def revoke(self, jti: str, expires_at: float, db: Optional[Session] = None):
+        """
+        Отзывает токен.
+
+        Параметры:
+        - jti: ID токена
+        - expires_at: Срок действия токена (Unix time)
+        - db: Сессия базы данных (для хранилища в PostgreSQL)
+        """
+        raise NotImplementedError
+
+    def is_revoked(self, jti: str, db: Optional[Session] = None) -> bool:
+        """Отозван ли токен"""
+        raise NotImplementedError
+
+    def purge(self, db: Optional[Session] = None) -> int:
+        """Удаляет записи истекших токенов и возвращает их число"""
+        raise NotImplementedError
+
+    def clear(self, db: Optional[Session] = None):
+        """Удаляет все записи"""
+        raise NotImplementedError
+
+
+class MemoryRevocationStore(RevocationStore):
+    """
+    Хранилище в памяти процесса.
+    Сроки действия хранятся в куче, поэтому истекшие записи удаляются
+    с ее вершины при каждом отзыве, без обхода всех записей.
+    """
+
+    def __init__(self):
+        self._expires: Dict[str, float] = {}
+        self._heap: List[Tuple[float, str]] = []
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float, db: Optional[Session] = None):
+        with self._lock:
+            self._purge(time.time())
+            if expires_at <= time.time():
+                return
+            self._expires[jti] = expires_at
+            heapq.heappush(self._heap, (expires_at, jti))
+
+    def is_revoked(self, jti: str, db: Optional[Session] = None) -> bool:
+        expires_at = self._expires.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def purge(self, db: Optional[Session] = None) -> int:
+        with self._lock:
+            return self._purge(time.time())
+
+    def _purge(self, now: float) -> int:
+        """Удаляет истекшие записи (вызывается под блокировкой)"""
+        removed = 0
+        while self._heap and self._heap[0][0] <= now:
+            expires_at, jti = heapq.heappop(self._heap)
+            # В куче может остаться срок от повторного отзыва того же токена
+            if self._expires.get(jti) == expires_at:
+                del self._expires[jti]
+                removed += 1
+        return removed
+
+    def clear(self, db: Optional[Session] = None):
+        with self._lock:
+            self._expires.clear()
+            self._heap.clear()
+
+    def __len__(self) -> int:
+        return len(self._expires)
+
+
+class DatabaseRevocationStore(RevocationStore):
+    """
+    Хранилище в таблице revoked_tokens, общее для всех процессов сервера.
+    Истекшие записи удаляются одним запросом не чаще раза в purge_interval
+    секунд при отзыве очередного токена. Результат "не отозван" запоминается
+    в процессе на check_ttl секунд, чтобы проверка токена при каждом запросе
+    не обращалась к базе данных.
+    """
+
+    shared = True
+
+    def __init__(
+        self, purge_interval: float, check_ttl: float = 0.0, check_size: int = 10000
+    ):
+        self.purge_interval = purge_interval
+        self.check_ttl = check_ttl
+        self.check_size = check_size
+        self._last_purge = time.monotonic()
+        # ID токена -> момент (time.monotonic), до которого он считается
+        # не отозванным без запроса к базе данных
+        self._not_revoked: "OrderedDict[str, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def revoke(self, jti: str, expires_at: float, db: Optional[Session] = None):
+        if expires_at <= time.time():
+            return
+        statement = (
+            insert(RevokedToken)
+            .values(jti=jti, expires_at=expires_at)
+            .on_conflict_do_nothing(index_elements=["jti"])
+        )
+        self._execute(lambda db: db.execute(statement), db, commit=True)
+        with self._lock:
+            self._not_revoked.pop(jti, None)
+
+        if time.monotonic() - self._last_purge >= self.purge_interval:
+            self.purge(db)
+
+    def is_revoked(self, jti: str, db: Optional[Session] = None) -> bool:
+        with self._lock:
+            checked_until = self._not_revoked.get(jti)
+            if checked_until is not None and checked_until > time.monotonic():
+                return False
+
+        statement = select(RevokedToken.jti).where(
+            RevokedToken.jti == jti, RevokedToken.expires_at > time.time()
+        )
+        revoked = self._execute(lambda db: db.scalar(statement), db) is not None
+
+        if not revoked and self.check_ttl > 0 and self.check_size > 0:
+            with self._lock:
+                self._not_revoked[jti] = time.monotonic() + self.check_ttl
+                self._not_revoked.move_to_end(jti)
+                while len(self._not_revoked) > self.check_size:
+                    self._not_revoked.popitem(last=False)
+        return revoked
+
+    def purge(self, db: Optional[Session] = None) -> int:
+        self._last_purge = time.monotonic()
+        statement = delete(RevokedToken).where(RevokedToken.expires_at <= time.time())
+        result = self._execute(lambda db: db.execute(statement), db, commit=True)
+        return result.rowcount
+
+    def clear(self, db: Optional[Session] = None):
+        self._execute(lambda db: db.execute(delete(RevokedToken)), db, commit=True)
+        with self._lock:
+            self._not_revoked.clear()
+
+    def _execute(self, query, db: Optional[Session], commit: bool = False):
+        """
+        Выполняет запрос в переданной сессии или в новой.
+
+        Параметры:
+        - query: Функция, выполняющая запрос в сессии
+        - db: Сессия базы данных (если не передана, создается новая)
+        - commit: Зафиксировать транзакцию после запроса
+        """
+        from app.db.deps import get_db
+
+        session_generator = None
+        if db is None:
+            session_generator = get_db()
+            db = next(session_generator)
+
+        try:
+            result = query(db)
+            if commit:
+                db.commit()
+            return result
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            if session_generator is not None:
+                next(session_generator, None)
+
+
+def create_revocation_store(backend: str) -> RevocationStore:
+    """
+    Создает хранилище отозванных токенов.
+
+    Параметры:
+    - backend: "memory" - в памяти процесса, "database" - в PostgreSQL
+    """
+    if backend == "memory":
+        return MemoryRevocationStore()
+    if backend == "database":
+        return DatabaseRevocationStore(
+            purge_interval=settings.TOKEN_REVOCATION_PURGE_INTERVAL,
+            check_ttl=settings.TOKEN_REVOCATION_CHECK_TTL,
+            check_size=settings.AUTH_CACHE_SIZE,
+        )
+    raise ValueError(f"Неизвестное хранилище отозванных токенов: {backend}")
+
+
+revoked_tokens = create_revocation_store(settings.TOKEN_REVOCATION_BACKEND)
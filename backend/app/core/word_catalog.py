@@ -0,0 +1,274 @@
+import bisect
+import hashlib
+import random
+import threading
+from dataclasses import dataclass
+from typing import Any, Collection, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+from app.models.word import WordWithAssociations, DifficultyEnum
+
+"""
+Модуль каталога слов.
+Активные слова загружаются из таблицы words один раз и хранятся в памяти
+процесса, поэтому выбор слова при смене хода не обращается к базе данных.
+"""
+
+# Число попыток случайного выбора, после которого исключенные слова
+# отфильтровываются явно
+_MAX_PICK_ATTEMPTS = 8
+
+
+@dataclass(frozen=True, slots=True)
+class WordEntry:
+    """Слово каталога"""
+
+    id: int
+    word: str
+    category: str
+    associations: Tuple[str, ...]
+    difficulty: DifficultyEnum
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Данные слова в формате ответов API"""
+        return {
+            "id": self.id,
+            "category": self.category,
+            "word": self.word,
+            "associations": list(self.associations),
+            "difficulty": self.difficulty,
+        }
+
+
+@dataclass(frozen=True, slots=True)
+class CatalogData:
+    """Неизменяемый снимок каталога: слова и индексы по ним"""
+
+    by_id: Dict[int, WordEntry]
+    by_difficulty: Dict[DifficultyEnum, List[WordEntry]]
+    by_category: Dict[str, List[WordEntry]]
+    ids_by_difficulty: Dict[DifficultyEnum, Tuple[int, ...]]
+
+
+def _pick(
+    entries: List[WordEntry], exclude: Collection[int] = ()
+) -> Optional[WordEntry]:
+    """
+    Выбирает случайное слово, не входящее в exclude.
+    Исключений обычно мало, поэтому выбор в среднем занимает O(1).
+    """
+    if not entries:
+        return None
+
+    for _ in range(_MAX_PICK_ATTEMPTS):
+        entry = entries[random.randrange(len(entries))]
+        if entry.id not in exclude:
+            return entry
+
+    candidates = [entry for entry in entries if entry.id not in exclude]
+    return random.choice(candidates) if candidates else None
+
+
+class WordCatalog:
+    """
+    Каталог активных слов в памяти процесса.
+    Загружается при первом обращении и сбрасывается явно (invalidate)
+    при изменении набора слов.
+    """
+
+    def __init__(self):
+        self._data: Optional[CatalogData] = None
+        self._lock = threading.Lock()
+
+    def load(self, db: Session) -> CatalogData:
+        """
+        Возвращает данные каталога, загружая их из базы данных при необходимости.
+
+        Параметры:
+        - db: Сессия базы данных
+        """
+        data = self._data
+        if data is not None:
+            return data
+
+        with self._lock:
+            if self._data is None:
+                self._data = self._load(db)
+            return self._data
+
+    def _load(self, db: Session) -> CatalogData:
+        """Загружает активные слова одним запросом"""
+        rows = db.execute(
+            select(
+                WordWithAssociations.id,
+                WordWithAssociations.word,
+                WordWithAssociations.category,
+                WordWithAssociations.associations,
+                WordWithAssociations.difficulty,
+            )
+            .where(WordWithAssociations.is_active == True)
+            .order_by(WordWithAssociations.id)
+        ).all()
+
+        by_id = {}
+        by_difficulty = {}
+        by_category = {}
+        for word_id, word, category, associations, difficulty in rows:
+            entry = WordEntry(
+                id=word_id,
+                word=word,
+                category=category,
+                associations=tuple(associations or ()),
+                difficulty=difficulty,
+            )
+            by_id[word_id] = entry
+            by_difficulty.setdefault(difficulty, []).append(entry)
+            by_category.setdefault(category, []).append(entry)
+
+        return CatalogData(
+            by_id=by_id,
+            by_difficulty=by_difficulty,
+            by_category=by_category,
+            ids_by_difficulty={
+                difficulty: tuple(entry.id for entry in entries)
+                for difficulty, entries in by_difficulty.items()
+            },
+        )
+
+    def loaded(self) -> Optional[CatalogData]:
+        """Данные каталога, если он уже загружен, без обращения к базе данных"""
+        return self._data
+
+    def invalidate(self):
+        """Сбрасывает каталог; он будет загружен заново при следующем обращении"""
+        with self._lock:
+            self._data = None
+
+    def get(self, db: Session, word_id: int) -> Optional[WordEntry]:
+        """Активное слово по ID или None"""
+        return self.load(db).by_id.get(word_id)
+
+    def word_ids(self, db: Session, difficulty: DifficultyEnum) -> Tuple[int, ...]:
+        """
+        ID всех активных слов указанной сложности.
+        Кортеж остается тем же объектом, пока каталог не сброшен.
+        """
+        return self.load(db).ids_by_difficulty.get(difficulty, ())
+
+    def random_word(
+        self,
+        db: Session,
+        difficulty: DifficultyEnum,
+        exclude: Collection[int] = (),
+    ) -> Optional[WordEntry]:
+        """
+        Случайное активное слово указанной сложности.
+
+        Параметры:
+        - db: Сессия базы данных
+        - difficulty: Сложность слова
+        - exclude: ID слов, которые нельзя выбирать
+
+        Возвращает:
+        - Слово или None, если подходящих слов нет.
+        """
+        return _pick(self.load(db).by_difficulty.get(difficulty, []), exclude)
+
+    def random_word_in_category(
+        self, db: Session, category: str
+    ) -> Optional[WordEntry]:
+        """Случайное активное слово указанной категории"""
+        return _pick(self.load(db).by_category.get(category, []))
+
+
+def _deck_rank(seed: int, word_id: int) -> int:
+    """Псевдослучайный ключ слова в колоде с данным seed"""
+    digest = hashlib.blake2b(f"{seed}:{word_id}".encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+class WordDeck:
+    """
+    Перетасованная колода ID слов комнаты (shuffle bag).
+
+    Слова выдаются по порядку без повторов; колода перетасовывается заново,
+    только когда закончится. Порядок однозначно задается seed, поэтому для
+    сохранения колоды достаточно двух чисел: seed и позиции.
+
+    Слова упорядочены по ключу, зависящему только от seed и ID слова,
+    поэтому добавление и удаление слов в каталоге не меняют порядок
+    остальных: уже выданная часть колоды остается выданной.
+    """
+
+    __slots__ = ("seed", "position", "_ids", "_order")
+
+    def __init__(self, seed: int, position: int = 0):
+        self.seed = seed
+        self.position = position
+        # ID слов, по которым построен порядок, и сам порядок: (ключ, ID)
+        self._ids: Optional[Tuple[int, ...]] = None
+        self._order: List[Tuple[int, int]] = []
+
+    @classmethod
+    def new(cls) -> "WordDeck":
+        """Новая колода со случайным seed"""
+        return cls(seed=random.getrandbits(31))
+
+    @classmethod
+    def restore(cls, seed: Optional[int], position: int) -> "WordDeck":
+        """Колода из сохраненных seed и позиции (новая, если seed не сохранен)"""
+        if seed is None:
+            return cls.new()
+        return cls(seed=seed, position=position or 0)
+
+    def _shuffle(self, word_ids: Tuple[int, ...]):
+        """
+        Строит порядок колоды для текущего seed. Если набор слов изменился
+        посреди колоды, позиция переносится на последнее выданное слово:
+        новые слова после него еще будут выданы, а до него - пропускаются
+        до следующей колоды.
+        """
+        last_drawn = None
+        if self._ids is not None and 0 < self.position <= len(self._order):
+            last_drawn = self._order[self.position - 1]
+
+        self._ids = word_ids
+        self._order = sorted((_deck_rank(self.seed, i), i) for i in word_ids)
+        if last_drawn is not None:
+            self.position = bisect.bisect_right(self._order, last_drawn)
+
+    def draw(
+        self, word_ids: Tuple[int, ...], exclude: Optional[int] = None
+    ) -> Optional[int]:
+        """
+        Берет следующее слово из колоды.
+
+        Параметры:
+        - word_ids: ID слов колоды (WordCatalog.word_ids)
+        - exclude: ID слова, которое нельзя выдать (текущее слово комнаты)
+
+        Возвращает:
+        - ID слова или None, если подходящих слов нет.
+        """
+        if not word_ids:
+            return None
+
+        # Набор слов изменился (или колода только что восстановлена)
+        if self._ids is not word_ids:
+            self._shuffle(word_ids)
+
+        for _ in range(len(self._order) + 1):
+            if self.position >= len(self._order):
+                self.seed = random.getrandbits(31)
+                self.position = 0
+                self._shuffle(word_ids)
+
+            word_id = self._order[self.position][1]
+            self.position += 1
+            if word_id != exclude:
+                return word_id
+
+        return None
+
+
+word_catalog = WordCatalog()
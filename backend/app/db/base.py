@@ -4,6 +4,7 @@ from app.models.word import WordWithAssociations
 from app.models.room import Room
 from app.models.player import Player
 from app.models.user import User
+from app.models.revoked_token import RevokedToken
 
 
 # Создание таблиц
@@ -9,6 +9,19 @@ from app.db.session import engine
 import time
 from sqlalchemy.exc import OperationalError
 
+# Столбцы и таблицы, добавленные после создания схемы: create_all не изменяет
+# уже существующие таблицы, поэтому добавляем их отдельно
+SCHEMA_UPGRADES = [
+    "ALTER TABLE rooms ADD COLUMN IF NOT EXISTS round_started_at DOUBLE PRECISION",
+    "ALTER TABLE rooms ADD COLUMN IF NOT EXISTS round_deadline DOUBLE PRECISION",
+    "ALTER TABLE rooms ADD COLUMN IF NOT EXISTS deck_seed INTEGER",
+    "ALTER TABLE rooms ADD COLUMN IF NOT EXISTS deck_position INTEGER NOT NULL DEFAULT 0",
+    "CREATE TABLE IF NOT EXISTS revoked_tokens "
+    "(jti VARCHAR PRIMARY KEY, expires_at FLOAT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ix_revoked_tokens_expires_at "
+    "ON revoked_tokens (expires_at)",
+]
+
 
 def init_db():
     """
@@ -51,6 +64,8 @@ def init_db():
                     print("Tables created successfully")
                 else:
                     print("All required tables already exist")
+                    for statement in SCHEMA_UPGRADES:
+                        connection.execute(text(statement))
                 connection.commit()
             break
         except OperationalError as e:
@@ -1,6 +1,6 @@
 import json
 import logging
-from fastapi import FastAPI, Depends, Request, status
+from fastapi import FastAPI, Depends, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
@@ -8,6 +8,9 @@ from sqlalchemy import text
 from app.models.word import WordWithAssociations
 from app.db.deps import get_db
 from app.core.config import settings
+from app.core.events import lifespan
+from app.core.nlp_executor import nlp_executor
+from app.core.password_hasher import password_hasher
 from datetime import datetime
 from app.schemas.room import RoomResponse
 from app.schemas.player import PlayerResponse
@@ -38,7 +41,7 @@ from app.api.endpoints import users, rooms, words, ws, game
 from app.api.debug import router as debug_router
 
 # Инициализация FastAPI приложения
-app = FastAPI()
+app = FastAPI(lifespan=lifespan)
 
 
 # Middleware для логирования запросов
@@ -113,11 +116,15 @@ async def root():
 
 
 @app.get("/health")
-def health_check(db: Session = Depends(get_db)) -> dict:
+def health_check(response: Response, db: Session = Depends(get_db)) -> dict:
     """
-    Проверяет работоспособность API и подключение к базе данных.
+    Проверяет работоспособность API, подключение к базе данных
+    и готовность модели анализа чата.
+    Пока модель загружается, возвращает 503, чтобы балансировщик
+    не направлял запросы на этот экземпляр.
 
     Args:
+        response: Ответ (для установки кода статуса)
         db: Сессия базы данных
 
     Returns:
@@ -125,10 +132,22 @@ def health_check(db: Session = Depends(get_db)) -> dict:
     """
     try:
         result = db.execute(text("SELECT 1"))
+        if not nlp_executor.ready:
+            response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+            return {
+                "status": "starting",
+                "message": "NLP model is loading",
+                "database": "connected",
+                "nlp": "loading",
+                "timestamp": datetime.now().isoformat(),
+            }
         return {
             "status": "ok",
             "message": "Service is running",
             "database": "connected",
+            "nlp": "ready",
+            "nlp_stats": nlp_executor.stats(),
+            "password_hash_stats": password_hasher.stats(),
             "timestamp": datetime.now().isoformat(),
         }
     except Exception as e:
@@ -0,0 +1,15 @@
+from sqlmodel import SQLModel, Field
+
+
+class RevokedToken(SQLModel, table=True):
+    """
+    Модель отозванного токена.
+    Хранит ID токенов (jti), по которым пользователи вышли из системы,
+    до истечения срока их действия.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    jti: str = Field(primary_key=True)
+    # Срок действия токена (Unix time), после которого запись удаляется
+    expires_at: float = Field(index=True)
@@ -41,6 +41,14 @@ class Room(SQLModel, table=True):
         default=None, foreign_key="words.id", nullable=True
     )
 
+    # Таймер текущего раунда (секунды Unix), восстанавливается при перезапуске
+    round_started_at: Optional[float] = Field(default=None, nullable=True)
+    round_deadline: Optional[float] = Field(default=None, nullable=True)
+
+    # Колода слов комнаты: порядок задается seed, позиция - следующее слово
+    deck_seed: Optional[int] = Field(default=None, nullable=True)
+    deck_position: int = Field(default=0)
+
     def is_full(self) -> bool:
         """Проверка, заполнена ли комната"""
         return (
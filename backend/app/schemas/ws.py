@@ -0,0 +1,59 @@
+from pydantic import BaseModel, Field, TypeAdapter
+from typing import Annotated, Any, Literal, Optional, Union
+
+
+class CommandBase(BaseModel):
+    """Базовая схема команды WebSocket"""
+
+    # ID запроса клиента, который возвращается в подтверждении (ack)
+    request_id: Optional[Union[str, int]] = None
+
+
+class GuessCommand(CommandBase):
+    """Догадка угадывающего игрока"""
+
+    type: Literal["guess"]
+    guess: str
+
+
+class ChatCommand(CommandBase):
+    """Сообщение в чат игры"""
+
+    type: Literal["chat"]
+    message: str
+
+
+class EndTurnCommand(CommandBase):
+    """Завершение хода объясняющим игроком"""
+
+    type: Literal["end_turn"]
+
+
+class LeaveCommand(CommandBase):
+    """Выход из игры"""
+
+    type: Literal["leave"]
+
+
+# Команда определяется по полю type
+Command = Annotated[
+    Union[GuessCommand, ChatCommand, EndTurnCommand, LeaveCommand],
+    Field(discriminator="type"),
+]
+command_adapter = TypeAdapter(Command)
+
+# Типы сообщений, которые обрабатываются как команды
+COMMAND_TYPES = {"guess", "chat", "end_turn", "leave"}
+
+
+class CommandAck(BaseModel):
+    """Подтверждение выполнения команды"""
+
+    type: Literal["ack"] = "ack"
+    request_id: Optional[Union[str, int]] = None
+    ok: bool
+    # Ответ эндпоинта при успехе
+    result: Optional[Any] = None
+    # Код и текст ошибки (как в ответе HTTP-эндпоинта)
+    status: Optional[int] = None
+    detail: Optional[Any] = None
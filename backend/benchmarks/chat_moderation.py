@@ -0,0 +1,348 @@
+import argparse
+import importlib.util
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from app.core.nlp import NLP_MODEL, load_nlp
+from app.core.lemma_cache import LemmaCache
+from app.core.chat_filter import (
+    WORD_FORBIDDEN_MESSAGE,
+    build_word_lemmas,
+    check_message,
+)
+
+"""
+Бенчмарк и регрессионная проверка фильтра сообщений объясняющего.
+Для каждого слова из words.json проигрывается набор сообщений объясняющего;
+для каждой конфигурации (профиль spaCy, кэш лемм) выводятся задержка
+проверки p50/p99 и пропускная способность. Вердикты сверяются с эталонными
+файлами, чтобы оптимизации фильтра не меняли правила игры незаметно:
+отдельно для пустого конвейера и для модели ru_core_news_sm, с которой
+фильтр работает в production. Эталон модели записывается эталонной
+реализацией фильтра (baseline_check_message - проверка в том виде, в каком
+она была до оптимизаций), поэтому сверка показывает отличия от исходных
+правил, а не от предыдущего прогона оптимизированного фильтра.
+
+Запуск из каталога backend:
+    python -m benchmarks.chat_moderation
+    python -m benchmarks.chat_moderation --update-golden
+"""
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+WORDS_FILE = BACKEND_DIR / "words.json"
+GOLDEN_FILE = Path(__file__).resolve().parent / "chat_verdicts.json"
+MODEL_GOLDEN_FILE = Path(__file__).resolve().parent / "chat_verdicts_model.json"
+
+PROFILES = ("full", "lemma", "blank")
+
+# Профиль, в котором записаны эталонные вердикты: он не требует модели,
+# поэтому проверка воспроизводится в любом окружении
+GOLDEN_PROFILE = "blank"
+
+# Профиль эталона с моделью: исходный фильтр загружал модель целиком.
+# Профиль "lemma" (по умолчанию в production) сверяется с тем же эталоном
+MODEL_GOLDEN_PROFILE = "full"
+
+# Вердикт в эталонном файле: None - сообщение разрешено, "word" - названо
+# загаданное слово, список - названные ассоциации
+Verdict = Union[None, str, List[str]]
+
+
+def load_words() -> List[Tuple[str, str, List[str]]]:
+    """Слова words.json: (ключ, слово, ассоциации)"""
+    with open(WORDS_FILE, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    return [
+        (f"{category}/{difficulty}/{word}", word, associations)
+        for category, difficulties in data.items()
+        for difficulty, words in difficulties.items()
+        for word, associations in words.items()
+    ]
+
+
+def build_messages(
+    word: str, associations: List[str], other_associations: List[str]
+) -> List[str]:
+    """
+    Сообщения объясняющего для слова: разрешенные, с загаданным словом,
+    с ассоциациями целиком, в другом регистре и внутри других слов.
+    """
+    first, last = associations[0], associations[-1]
+    other = (other_associations * 2)[:2]
+    return [
+        "Это то, что бывает у всех дома и на улице",
+        f"Похоже на {other[0]}, но не {other[1]}",
+        f"Почти {word.upper()}, только меньше",
+        f"Подсказка: {first}, и еще кое-что",
+        f"{last.capitalize()} и рядом {associations[len(associations) // 2]}",
+        f"Много {first}ов вокруг",
+    ]
+
+
+def iter_corpus() -> Iterator[Tuple[str, str, List[str], List[str]]]:
+    """Корпус: (ключ слова, слово, ассоциации, сообщения)"""
+    words = load_words()
+    for index, (key, word, associations) in enumerate(words):
+        other_associations = words[(index + 1) % len(words)][2]
+        yield key, word, associations, build_messages(
+            word, associations, other_associations
+        )
+
+
+def encode_verdict(error: Optional[str]) -> Verdict:
+    """
+    Компактная запись результата проверки для эталонного файла. Ассоциации
+    сортируются: исходный фильтр перечислял их в порядке множества.
+    """
+    if error is None:
+        return None
+    if error == WORD_FORBIDDEN_MESSAGE:
+        return "word"
+    return sorted(error.split(": ", 1)[1].split(", "))
+
+
+def baseline_check_message(
+    nlp, word: str, associations: List[str], message: str
+) -> Optional[str]:
+    """
+    Эталонная проверка сообщения: фильтр чата до оптимизаций (лемматизация
+    слова, каждой ассоциации и сообщения при каждой проверке).
+
+    Без модели все леммы пустые и сравнение лемм вырождается, поэтому
+    эталон пустого конвейера записывается текущим фильтром.
+
+    Параметры:
+    - nlp: Конвейер spaCy
+    - word: Загаданное слово
+    - associations: Ассоциации загаданного слова
+    - message: Сообщение объясняющего
+
+    Возвращает:
+    - Текст ошибки или None, если сообщение разрешено.
+    """
+    message_lower = message.lower()
+    current_word = word.lower()
+    associations = [assoc.lower() for assoc in associations]
+
+    message_doc = nlp(message_lower)
+    message_lemmas = {
+        token.lemma_
+        for token in message_doc
+        if not token.is_stop and len(token.text) > 3
+    }
+    message_tokens = [token.text for token in message_doc]
+
+    current_word_doc = nlp(current_word)
+    current_word_lemma = (
+        current_word_doc[0].lemma_ if len(current_word_doc) > 0 else current_word
+    )
+    if current_word in message_lower or current_word_lemma in message_lemmas:
+        return WORD_FORBIDDEN_MESSAGE
+
+    forbidden_words = []
+    association_lemmas = {}
+    for assoc in associations:
+        assoc_doc = nlp(assoc)
+        if len(assoc_doc) > 0:
+            association_lemmas[assoc_doc[0].lemma_] = assoc
+
+    for lemma in message_lemmas:
+        if lemma in association_lemmas:
+            forbidden_words.append(association_lemmas[lemma])
+    for token in message_tokens:
+        if token in associations and token not in forbidden_words:
+            forbidden_words.append(token)
+    for assoc in associations:
+        if assoc in message_lower and assoc not in forbidden_words:
+            forbidden_words.append(assoc)
+
+    if forbidden_words:
+        return f"Запрещено использовать слова: {', '.join(set(forbidden_words))}"
+    return None
+
+
+def model_installed() -> bool:
+    """Установлена ли модель spaCy"""
+    return importlib.util.find_spec(NLP_MODEL) is not None
+
+
+def golden_file(blank: bool) -> Path:
+    """Эталонный файл для пустого конвейера или для модели"""
+    return GOLDEN_FILE if blank else MODEL_GOLDEN_FILE
+
+
+def load_golden(blank: bool = True) -> Optional[Dict[str, List[Verdict]]]:
+    """
+    Эталонные вердикты: ключ слова -> вердикты его сообщений.
+
+    Параметры:
+    - blank: Эталон пустого конвейера (True) или модели (False)
+
+    Возвращает:
+    - Вердикты или None, если эталон еще не записан.
+    """
+    path = golden_file(blank)
+    if not path.exists():
+        return None
+    with open(path, "r", encoding="utf-8") as file:
+        return json.load(file)["verdicts"]
+
+
+def run_config(profile: str, use_cache: bool) -> Dict[str, Any]:
+    """
+    Проигрывает корпус в одной конфигурации.
+
+    Возвращает:
+    - Задержки, пропускную способность и вердикты по словам.
+    """
+    nlp = load_nlp(profile)
+    cache = LemmaCache(maxsize=50000) if use_cache else None
+    corpus = list(iter_corpus())
+    lemmas = {
+        key: build_word_lemmas(nlp, word, associations)
+        for key, word, associations, _ in corpus
+    }
+
+    latencies = []
+    verdicts = {}
+    started = time.perf_counter()
+    for key, _, _, messages in corpus:
+        word_verdicts = []
+        for message in messages:
+            message_started = time.perf_counter()
+            error = check_message(nlp, lemmas[key], message, cache)
+            latencies.append(time.perf_counter() - message_started)
+            word_verdicts.append(encode_verdict(error))
+        verdicts[key] = word_verdicts
+    total_time = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "profile": profile,
+        "cache": use_cache,
+        # Без установленной модели любой профиль загружает пустой конвейер
+        "blank": not nlp.pipe_names,
+        "messages": len(latencies),
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "per_s": len(latencies) / total_time,
+        "hit_rate": cache.hit_rate if cache else None,
+        "verdicts": verdicts,
+    }
+
+
+def run_baseline(profile: str = MODEL_GOLDEN_PROFILE) -> Dict[str, Any]:
+    """
+    Проигрывает корпус эталонной проверкой (baseline_check_message).
+
+    Возвращает:
+    - Профиль, признак пустого конвейера и вердикты по словам.
+    """
+    nlp = load_nlp(profile)
+    verdicts = {
+        key: [
+            encode_verdict(baseline_check_message(nlp, word, associations, message))
+            for message in messages
+        ]
+        for key, word, associations, messages in iter_corpus()
+    }
+    return {"profile": profile, "blank": not nlp.pipe_names, "verdicts": verdicts}
+
+
+def compare_golden(
+    verdicts: Dict[str, List[Verdict]], golden: Dict[str, List[Verdict]]
+) -> List[str]:
+    """Ключи слов, вердикты которых отличаются от эталонных"""
+    keys = set(verdicts) | set(golden)
+    return sorted(key for key in keys if verdicts.get(key) != golden.get(key))
+
+
+def write_golden(result: Dict[str, Any]) -> Path:
+    """
+    Записывает эталонные вердикты прогона (одно слово на строку).
+
+    Возвращает:
+    - Путь к записанному файлу.
+    """
+    lines = [
+        f"  {json.dumps(key, ensure_ascii=False)}: "
+        f"{json.dumps(word_verdicts, ensure_ascii=False)}"
+        for key, word_verdicts in result["verdicts"].items()
+    ]
+    path = golden_file(result["blank"])
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(f'{{"profile": "{result["profile"]}", "verdicts": {{\n')
+        file.write(",\n".join(lines))
+        file.write("\n}}\n")
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк и регрессионная проверка фильтра чата"
+    )
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=PROFILES)
+    parser.add_argument(
+        "--update-golden",
+        action="store_true",
+        help=(
+            f"перезаписать эталонные вердикты (профиль {GOLDEN_PROFILE} и, если "
+            f"модель установлена, эталонную проверку в профиле "
+            f"{MODEL_GOLDEN_PROFILE})"
+        ),
+    )
+    args = parser.parse_args()
+
+    if args.update_golden:
+        results = [run_config(GOLDEN_PROFILE, use_cache=False)]
+        if model_installed():
+            results.append(run_baseline(MODEL_GOLDEN_PROFILE))
+        else:
+            print(f"Модель {NLP_MODEL} не установлена: эталон модели не записан")
+        for result in results:
+            path = write_golden(result)
+            print(f"Эталонные вердикты записаны в {path}")
+        return
+
+    goldens = {blank: load_golden(blank) for blank in (True, False)}
+    header = (
+        f"{'profile':<8} {'cache':<6} {'p50, ms':>8} {'p99, ms':>8} "
+        f"{'msg/s':>8} {'hit rate':>9}  golden"
+    )
+    print(header)
+    print("-" * len(header))
+
+    failed = False
+    for profile in args.profiles:
+        for use_cache in (False, True):
+            result = run_config(profile, use_cache)
+            golden = goldens[result["blank"]]
+            if result["blank"] and profile != "blank":
+                # Модель не установлена: профиль загрузил пустой конвейер
+                # и его вердикты ничего не говорят о работе с моделью
+                status = "n/a (no model)"
+            elif golden is not None:
+                mismatches = compare_golden(result["verdicts"], golden)
+                failed = failed or bool(mismatches)
+                status = f"{len(mismatches)} mismatches" if mismatches else "ok"
+            else:
+                # Эталон модели еще не записан (--update-golden)
+                status = "no golden"
+            hit_rate = (
+                f"{result['hit_rate']:.1%}" if result["hit_rate"] is not None else "-"
+            )
+            print(
+                f"{profile:<8} {'on' if use_cache else 'off':<6} "
+                f"{result['p50_ms']:>8.3f} {result['p99_ms']:>8.3f} "
+                f"{result['per_s']:>8.0f} {hit_rate:>9}  {status}"
+            )
+
+    if failed:
+        raise SystemExit("Вердикты фильтра отличаются от эталонных")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import argparse
+import json
+import resource
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+from app.core.nlp import load_nlp
+
+"""
+Бенчмарк профилей модели spaCy для фильтра чата.
+Каждый профиль измеряется в отдельном процессе: время загрузки модели,
+прирост пиковой памяти (RSS), задержка анализа одного сообщения
+и пропускная способность nlp.pipe.
+
+Запуск из каталога backend:
+    python -m benchmarks.nlp_profiles --messages 2000
+"""
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+WORDS_FILE = BACKEND_DIR / "words.json"
+
+PROFILES = ("full", "lemma", "blank")
+
+# Шаблоны сообщений объясняющего; подставляются ассоциации слов
+TEMPLATES = (
+    "Это связано с тем, что {0} и {1}",
+    "Представь, где бывает {0}, а рядом {1} и {2}",
+    "Когда говорят про {0}, вспоминают {1}",
+    "Не {0}, но очень похоже на {1} и {2}",
+)
+
+
+def build_corpus(limit: int) -> List[str]:
+    """Сообщения объясняющего, собранные из ассоциаций слов words.json"""
+    with open(WORDS_FILE, "r", encoding="utf-8") as file:
+        data = json.load(file)
+
+    messages = []
+    while len(messages) < limit:
+        for difficulties in data.values():
+            for words in difficulties.values():
+                for associations in words.values():
+                    template = TEMPLATES[len(messages) % len(TEMPLATES)]
+                    padded = (list(associations) * 3)[:3]
+                    messages.append(template.format(*padded))
+                    if len(messages) >= limit:
+                        return messages
+    return messages
+
+
+def _peak_rss_mb() -> float:
+    """Пиковый RSS процесса в мегабайтах"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss на Linux в килобайтах, на macOS в байтах
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(profile: str, limit: int) -> Dict[str, Any]:
+    """Измеряет профиль в текущем процессе"""
+    messages = build_corpus(limit)
+    base_rss = _peak_rss_mb()
+
+    started = time.perf_counter()
+    nlp = load_nlp(profile)
+    load_time = time.perf_counter() - started
+
+    latencies = []
+    for message in messages:
+        started = time.perf_counter()
+        nlp(message.lower())
+        latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    for _ in nlp.pipe(message.lower() for message in messages):
+        pass
+    pipe_time = time.perf_counter() - started
+
+    percentiles = statistics.quantiles(latencies, n=100)
+    return {
+        "profile": profile,
+        "model": f"{nlp.lang}_{nlp.meta['name']}",
+        "pipeline": ",".join(nlp.pipe_names) or "-",
+        "load_s": load_time,
+        "rss_mb": _peak_rss_mb() - base_rss,
+        "p50_ms": percentiles[49] * 1000,
+        "p99_ms": percentiles[98] * 1000,
+        "pipe_per_s": len(messages) / pipe_time,
+    }
+
+
+def run_profile(profile: str, limit: int) -> Dict[str, Any]:
+    """Запускает измерение профиля в отдельном процессе"""
+    result = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.nlp_profiles",
+            "--worker",
+            profile,
+            "--messages",
+            str(limit),
+        ],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def print_report(results: List[Dict[str, Any]]):
+    """Печатает таблицу результатов"""
+    header = (
+        f"{'profile':<8} {'load, s':>8} {'RSS, MB':>8} {'p50, ms':>8} "
+        f"{'p99, ms':>8} {'pipe msg/s':>11}  model (pipeline)"
+    )
+    print(header)
+    print("-" * len(header))
+    for row in results:
+        print(
+            f"{row['profile']:<8} {row['load_s']:>8.2f} {row['rss_mb']:>8.1f} "
+            f"{row['p50_ms']:>8.3f} {row['p99_ms']:>8.3f} "
+            f"{row['pipe_per_s']:>11.0f}  {row['model']} ({row['pipeline']})"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Бенчмарк профилей модели spaCy для фильтра чата"
+    )
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--profiles", nargs="+", choices=PROFILES, default=PROFILES)
+    parser.add_argument("--worker", choices=PROFILES, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(measure(args.worker, args.messages)))
+        return
+
+    print_report([run_profile(profile, args.messages) for profile in args.profiles])
+
+
+if __name__ == "__main__":
+    main()
@@ -10,8 +10,12 @@ from app.models.room import Room, GameStatus
 from app.models.player import Player, PlayerRole
 from app.models.word import WordWithAssociations, DifficultyEnum
 from app.core.security import get_password_hash, create_access_token
-from app.api.endpoints.game import send_game_state_update, start_round_timer
+from app.api.endpoints.game import send_game_state_update, handle_round_timeout
 from app.api.endpoints import game as game_module
+from app.core.room_state import room_states, RoomState
+from app.core.timers import round_timers
+from app.core.word_catalog import word_catalog
+import threading
 import time
 import asyncio
 
@@ -117,9 +121,16 @@ def test_submit_guess_incorrect(
 
     assert data["correct"] is False
 
+    # Счетчик ошибок хранится в памяти до ближайшей границы хода
+    state = room_states.get(room.code, test_db)
+    assert state.get_player(player2.id).wrong_answers == 1
+
+    test_db.expire_all()
+    assert test_db.get(Player, player2.id).wrong_answers == 0
+
+    room_states.flush(state, test_db)
     test_db.expire_all()
-    player2 = test_db.get(Player, player2.id)
-    assert player2.wrong_answers >= 1
+    assert test_db.get(Player, player2.id).wrong_answers == 1
 
 
 @pytest.fixture
@@ -259,7 +270,7 @@ def test_get_game_state_playing_explainer(client, setup_users_rooms):
     db = setup_users_rooms["db"]
     room = setup_users_rooms["room"]
     players = setup_users_rooms["players"]
-    word = setup_users_rooms["word"]
+    word_text = setup_users_rooms["word"].word
     token_explainer = setup_users_rooms["tokens"][0]
     headers = {"Authorization": f"Bearer {token_explainer}"}
 
@@ -274,7 +285,7 @@ def test_get_game_state_playing_explainer(client, setup_users_rooms):
     data = response.json()
 
     assert data["status"] == GameStatus.PLAYING.upper()
-    assert data["currentWord"] == word.word
+    assert data["currentWord"] == word_text
     assert data["round"] == 1
     assert data["timeLeft"] is not None
     assert data["currentPlayer"] == str(players[0].id)
@@ -311,6 +322,25 @@ def test_start_game_already_playing(client, setup_users_rooms):
     assert "Игра уже началась" in response.json()["detail"]
 
 
+def test_start_game_rejected_keeps_state(client, setup_users_rooms):
+    """Тест: отклоненный старт не сбрасывает состояние идущей игры."""
+    db = setup_users_rooms["db"]
+    room = setup_users_rooms["room"]
+    room.status = GameStatus.PLAYING
+    db.commit()
+    state = room_states.get(room.code, db)
+    state.current_round = 2
+    state.dirty = True
+
+    for token, status_code in zip(setup_users_rooms["tokens"], (400, 403)):
+        headers = {"Authorization": f"Bearer {token}"}
+        response = client.post(f"/api/game/{room.code}/start", headers=headers)
+        assert response.status_code == status_code
+
+    assert room_states.get(room.code, db) is state
+    assert state.dirty is True
+
+
 def test_start_game_not_enough_players(client, setup_users_rooms):
     """Тест старта игры с одним игроком."""
     db = setup_users_rooms["db"]
@@ -380,9 +410,7 @@ async def test_send_game_state_update_playing(
     start_time = 1000.0
     current_time = 1015.5
     mock_time.return_value = current_time
-    from app.api.endpoints.game import room_timers
-
-    room_timers[room.code] = {"start_time": start_time, "duration": room.time_per_round}
+    round_timers.schedule(room.code, start_time + room.time_per_round, AsyncMock())
     expected_time_left = max(0, int(room.time_per_round - (current_time - start_time)))
 
     await send_game_state_update(room.code, db)
@@ -397,6 +425,7 @@ async def test_send_game_state_update_playing(
     assert game_state["round"] == 2
     assert game_state["currentWord"] == ""
     assert game_state["timeLeft"] == expected_time_left
+    assert game_state["timer_start"] == start_time
     assert game_state["currentPlayer"] == str(players[0].id)
     assert len(game_state["players"]) == 2
     player_state_1 = next(
@@ -426,35 +455,53 @@ async def test_send_game_state_update_playing(
     assert personal_game_state["currentPlayer"] == game_state["currentPlayer"]
     assert len(personal_game_state["players"]) == len(game_state["players"])
 
-    if room.code in room_timers:
-        del room_timers[room.code]
+    round_timers.cancel(room.code)
 
 
 @pytest.mark.asyncio
 @patch("app.api.endpoints.game.asyncio.sleep", new_callable=AsyncMock)
+@patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
+async def test_periodic_game_state_updates_heartbeat(
+    mock_send_state, mock_sleep, setup_users_rooms
+):
+    """Тест контрольной рассылки: редкий интервал и остановка после окончания игры."""
+    from app.core.config import settings
+
+    db = setup_users_rooms["db"]
+    room = setup_users_rooms["room"]
+    room.status = GameStatus.PLAYING
+    db.commit()
+
+    async def finish_game_on_second_update(room_code, session):
+        if mock_send_state.call_count == 2:
+            room_states.get(room_code, session).finish_game()
+
+    mock_send_state.side_effect = finish_game_on_second_update
+
+    await game_module.start_periodic_game_state_updates(room.code, db)
+
+    assert mock_send_state.call_count == 2
+    assert all(c.args[0] == room.code for c in mock_send_state.call_args_list)
+    mock_sleep.assert_called_with(settings.GAME_STATE_HEARTBEAT_INTERVAL)
+    assert mock_sleep.call_count == 3
+    assert room.code not in game_module.active_periodic_updates
+
+
+@pytest.mark.asyncio
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.get_next_word")
 @patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.asyncio.create_task")
-@patch("app.api.endpoints.game.asyncio.current_task")
 @patch("app.api.endpoints.game.time.time")
-async def test_start_round_timer_next_round(
+async def test_round_timeout_next_round(
     mock_time,
-    mock_current_task,
-    mock_create_task,
     mock_send_state,
-    mock_get_next_word,
     mock_broadcast,
-    mock_sleep,
     setup_users_rooms,
 ):
-    """Тест перехода к следующему раунду по таймеру."""
+    """Тест перехода к следующему раунду по истечении времени."""
     db = setup_users_rooms["db"]
     room = setup_users_rooms["room"]
     players = setup_users_rooms["players"]
     word = setup_users_rooms["word"]
-    user1 = setup_users_rooms["users"][0]
-    user2 = setup_users_rooms["users"][1]
 
     room.status = GameStatus.PLAYING
     room.current_round = 1
@@ -463,47 +510,34 @@ async def test_start_round_timer_next_round(
     db.commit()
 
     duration = room.time_per_round
-    start_time = 1000.0
-    end_time = start_time + duration
+    end_time = 1000.0 + duration
     mock_time.return_value = end_time
-    game_module.room_timers[room.code] = {
-        "start_time": start_time,
-        "duration": duration,
-    }
-    mock_timer_task = MagicMock()
-    game_module.timer_tasks[room.code] = mock_timer_task
-    mock_current_task.return_value = mock_timer_task
 
-    mock_next_word_data = {"id": word.id + 1, "word": "NextWord", "associations": []}
+    next_word_data = {"id": word.id + 1, "word": "NextWord", "associations": []}
 
     next_word_db = WordWithAssociations(
-        id=mock_next_word_data["id"],
-        word=mock_next_word_data["word"],
+        id=next_word_data["id"],
+        word=next_word_data["word"],
         category="TestCat2",
         difficulty=DifficultyEnum.basic,
     )
     db.add(next_word_db)
     db.commit()
 
-    mock_get_next_word.return_value = mock_next_word_data
-    mock_next_timer_task = MagicMock()
-    mock_create_task.return_value = mock_next_timer_task
-
-    await start_round_timer(room.code, duration, db)
 
-    mock_sleep.assert_called_once_with(duration)
+    await handle_round_timeout(room.code, db)
 
     db.refresh(room)
     db.refresh(players[0])
     db.refresh(players[1])
     assert room.current_round == 2
-    assert room.current_word_id == mock_next_word_data["id"]
+    assert room.current_word_id == next_word_data["id"]
     assert players[0].role == PlayerRole.GUESSING
     assert players[1].role == PlayerRole.EXPLAINING
 
-    assert room.code in game_module.room_timers
-    assert game_module.room_timers[room.code]["start_time"] == end_time
-    mock_create_task.assert_called_once()
+    assert round_timers.deadline(room.code) == end_time + duration
+    assert room.round_started_at == end_time
+    assert room.round_deadline == end_time + duration
 
     mock_broadcast.assert_called_once()
     broadcast_call_args = mock_broadcast.call_args[0]
@@ -512,28 +546,18 @@ async def test_start_round_timer_next_round(
     assert broadcast_data["type"] == "turn_changed"
     assert broadcast_data["current_player"] == str(players[1].id)
     assert broadcast_data["message"].startswith("Ход переходит к игроку")
+    assert broadcast_data["timer_start"] == end_time
 
     mock_send_state.assert_called_once_with(room.code, db)
 
-    if room.code in game_module.room_timers:
-        del game_module.room_timers[room.code]
-    if room.code in game_module.timer_tasks:
-        del game_module.timer_tasks[room.code]
+    round_timers.cancel(room.code)
 
 
 @pytest.mark.asyncio
-@patch("app.api.endpoints.game.asyncio.sleep", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.asyncio.current_task")
-@patch("app.api.endpoints.game.time.time")
-async def test_start_round_timer_game_finish(
-    mock_time,
-    mock_current_task,
-    mock_send_state,
-    mock_broadcast,
-    mock_sleep,
-    setup_users_rooms
+async def test_round_timeout_game_finish(
+    mock_send_state, mock_broadcast, setup_users_rooms
 ):
     """Тест завершения игры по таймеру в последнем раунде."""
     db = setup_users_rooms["db"]
@@ -550,21 +574,7 @@ async def test_start_round_timer_game_finish(
     players[1].score_total = 5
     db.commit()
 
-    duration = room.time_per_round
-    start_time = 1000.0
-    end_time = start_time + duration
-    mock_time.return_value = end_time
-    game_module.room_timers[room.code] = {
-        "start_time": start_time,
-        "duration": duration,
-    }
-    mock_timer_task = MagicMock()
-    game_module.timer_tasks[room.code] = mock_timer_task
-    mock_current_task.return_value = mock_timer_task
-
-    await start_round_timer(room.code, duration, db)
-
-    mock_sleep.assert_called_once_with(duration)
+    await handle_round_timeout(room.code, db)
 
     db.refresh(room)
     db.refresh(players[0])
@@ -578,13 +588,7 @@ async def test_start_round_timer_game_finish(
     assert players[0].score_total == 25
     assert players[1].score_total == 25
 
-    if room.code in game_module.room_timers:
-        del game_module.room_timers[room.code]
-    if room.code in game_module.timer_tasks:
-        del game_module.timer_tasks[room.code]
-        
-    assert room.code not in game_module.room_timers
-    assert room.code not in game_module.timer_tasks
+    assert room.code not in round_timers
 
     mock_broadcast.assert_called_once()
     broadcast_call_args = mock_broadcast.call_args[0]
@@ -600,203 +604,245 @@ async def test_start_round_timer_game_finish(
 
 
 @pytest.mark.asyncio
-@patch("app.api.endpoints.game.asyncio.sleep", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.asyncio.create_task", new_callable=AsyncMock)
-async def test_start_round_timer_cancelled_room_deleted(
-    mock_create_task, mock_send_state, mock_broadcast, mock_sleep, setup_users_rooms
+async def test_round_timeout_room_deleted(
+    mock_send_state, mock_broadcast, setup_users_rooms
 ):
-    """Тест отмены таймера, если комната удалена во время ожидания."""
+    """Тест срабатывания таймера, если комната уже удалена."""
     db = setup_users_rooms["db"]
     room = setup_users_rooms["room"]
     room_code = room.code
-    players = setup_users_rooms["players"]
 
-    room.status = GameStatus.PLAYING
-    room.current_round = 1
-    players[0].role = PlayerRole.EXPLAINING
-    players[1].role = PlayerRole.GUESSING
+    for p in setup_users_rooms["players"]:
+        db.delete(p)
+    db.delete(room)
     db.commit()
 
-    duration = room.time_per_round
-    start_time = time.time()
-    game_module.room_timers[room_code] = {
-        "start_time": start_time,
-        "duration": duration,
-    }
-    game_module.timer_tasks[room_code] = MagicMock()
+    await handle_round_timeout(room_code, db)
 
-    async def sleep_side_effect(delay):
-        await original_asyncio_sleep(0.01)
-        room_to_delete = db.scalar(select(Room).where(Room.code == room_code))
-        if room_to_delete:
-            players_to_delete = db.scalars(select(Player).where(Player.room_id == room_to_delete.id)).all()
-            for p in players_to_delete:
-                db.delete(p)
-            db.delete(room_to_delete)
-            db.commit()
+    mock_broadcast.assert_not_called()
+    mock_send_state.assert_not_called()
+    assert room_code not in round_timers
 
-    mock_sleep.side_effect = sleep_side_effect
 
-    await start_round_timer(room_code, duration, db)
+@pytest.mark.asyncio
+@patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
+@patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
+async def test_round_timeout_game_not_playing(
+    mock_send_state, mock_broadcast, setup_users_rooms
+):
+    """Тест срабатывания таймера, если игра уже не идет."""
+    db = setup_users_rooms["db"]
+    room = setup_users_rooms["room"]
 
-    mock_sleep.assert_called_once_with(duration)
+    await handle_round_timeout(room.code, db)
+
+    db.refresh(room)
+    assert room.status == GameStatus.WAITING
 
     mock_broadcast.assert_not_called()
     mock_send_state.assert_not_called()
-    mock_create_task.assert_not_called()
-
-    if room_code in game_module.room_timers:
-        del game_module.room_timers[room_code]
-    if room_code in game_module.timer_tasks:
-        del game_module.timer_tasks[room_code]
-        
-    assert room_code not in game_module.room_timers
-    assert room_code not in game_module.timer_tasks
+    assert room.code not in round_timers
 
 
 @pytest.mark.asyncio
-@patch("app.api.endpoints.game.asyncio.sleep", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.asyncio.create_task", new_callable=AsyncMock)
-async def test_start_round_timer_cancelled_status_changed(
-    mock_create_task, mock_send_state, mock_broadcast, mock_sleep, setup_users_rooms
+async def test_round_timeout_current_player_not_found(
+    mock_send_state, mock_broadcast, setup_users_rooms
 ):
-    """Тест отмены таймера, если статус комнаты изменился во время ожидания."""
+    """Тест срабатывания таймера, когда объясняющий игрок не найден."""
     db = setup_users_rooms["db"]
     room = setup_users_rooms["room"]
     players = setup_users_rooms["players"]
 
     room.status = GameStatus.PLAYING
     room.current_round = 1
-    players[0].role = PlayerRole.EXPLAINING
+    players[0].role = PlayerRole.GUESSING
     players[1].role = PlayerRole.GUESSING
     db.commit()
 
-    duration = room.time_per_round
-    start_time = time.time()
-    game_module.room_timers[room.code] = {
-        "start_time": start_time,
-        "duration": duration,
-    }
-    game_module.timer_tasks[room.code] = MagicMock()
+    await handle_round_timeout(room.code, db)
 
-    async def sleep_side_effect(delay):
-        await original_asyncio_sleep(0.01)
-        room_to_update = db.scalar(select(Room).where(Room.code == room.code))
-        if room_to_update:
-            room_to_update.status = GameStatus.WAITING
-            db.commit()
+    db.refresh(room)
+    assert room.current_round == 1
 
-    mock_sleep.side_effect = sleep_side_effect
+    mock_broadcast.assert_not_called()
+    mock_send_state.assert_not_called()
+    assert room.code not in round_timers
 
-    await start_round_timer(room.code, duration, db)
 
-    mock_sleep.assert_called_once_with(duration)
+@pytest.mark.asyncio
+@patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
+@patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
+async def test_round_timeout_stale_after_restart(
+    mock_send_state, mock_broadcast, setup_users_rooms
+):
+    """Тест: устаревшее срабатывание игнорируется, если раунд уже перезапущен."""
+    db = setup_users_rooms["db"]
+    room = setup_users_rooms["room"]
+    players = setup_users_rooms["players"]
 
-    db.refresh(room)
-    assert room.status == GameStatus.WAITING
+    room.status = GameStatus.PLAYING
+    room.current_round = 1
+    players[0].role = PlayerRole.EXPLAINING
+    players[1].role = PlayerRole.GUESSING
+    db.commit()
+
+    deadline = time.time() + 60
+    round_timers.schedule(room.code, deadline, AsyncMock())
 
+    await handle_round_timeout(room.code, db)
+
+    db.refresh(room)
+    assert room.current_round == 1
+    assert round_timers.deadline(room.code) == deadline
     mock_broadcast.assert_not_called()
-    mock_send_state.assert_not_called()
-    mock_create_task.assert_not_called()
 
-    if room.code in game_module.room_timers:
-        del game_module.room_timers[room.code]
-    if room.code in game_module.timer_tasks:
-        del game_module.timer_tasks[room.code]
-        
-    assert room.code not in game_module.room_timers
-    assert room.code not in game_module.timer_tasks
+    round_timers.cancel(room.code)
 
 
 @pytest.mark.asyncio
-@patch("app.api.endpoints.game.asyncio.sleep", new_callable=AsyncMock)
+@pytest.mark.parametrize("timer_running", [True, False])
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.asyncio.create_task", new_callable=AsyncMock)
-async def test_start_round_timer_current_player_not_found(
-    mock_create_task, mock_send_state, mock_broadcast, mock_sleep, setup_users_rooms
+async def test_round_timeout_turn_passed_during_load(
+    mock_send_state, mock_broadcast, timer_running, setup_users_rooms
 ):
-    """Тест случая, когда текущий объясняющий игрок не найден после sleep."""
-    real_db = setup_users_rooms["db"]
+    """Тест: ход, переданный пока состояние загружалось, не передается повторно."""
+    db = setup_users_rooms["db"]
     room = setup_users_rooms["room"]
     players = setup_users_rooms["players"]
+    player1_id, player2_id = players[0].id, players[1].id
 
     room.status = GameStatus.PLAYING
     room.current_round = 1
     players[0].role = PlayerRole.EXPLAINING
     players[1].role = PlayerRole.GUESSING
-    real_db.commit()
-
-    duration = room.time_per_round
-    start_time = time.time()
-    game_module.room_timers[room.code] = {
-        "start_time": start_time,
-        "duration": duration,
-    }
-    game_module.timer_tasks[room.code] = MagicMock()
-
-    mock_db = MagicMock(spec=Session)
-
-    def scalar_side_effect(stmt):
-        if hasattr(stmt, "columns_clause") and hasattr(stmt, "whereclause"):
-            from sqlalchemy import inspect
-            entities = [c for c in stmt.columns_clause]
-            if any(getattr(e, "class_", None) == Room for e in entities):
-                return room
-            if any(getattr(e, "class_", None) == Player for e in entities):
-                return None
-        try:
-            from sqlalchemy.sql.selectable import Select
-            if isinstance(stmt, Select):
-                entities = stmt._raw_columns
-                if any(getattr(e, "class_", None) == Room for e in entities):
-                    return room
-                if any(getattr(e, "class_", None) == Player for e in entities):
-                    return None
-        except ImportError:
-            pass
-        return None
-
-    mock_db.scalar.side_effect = scalar_side_effect
-    mock_db.commit = MagicMock()
-    mock_db.refresh = MagicMock()
-    mock_db.expire_all = MagicMock()
-    mock_db.get = real_db.get
-
-    await start_round_timer(room.code, duration, mock_db)
-
-    mock_sleep.assert_called_once_with(duration)
+    db.commit()
 
+    get_async = room_states.get_async
+
+    async def load_and_pass_turn(room_code, db):
+        # Правильная догадка, обработанная во время загрузки состояния
+        state = await get_async(room_code, db)
+        state.get_player(player1_id).role = PlayerRole.GUESSING
+        state.get_player(player2_id).role = PlayerRole.EXPLAINING
+        state.current_round += 1
+        game_module.start_round_timer(state)
+        if not timer_running:
+            round_timers.cancel(room_code)
+        return state
+
+    with patch.object(room_states, "get_async", load_and_pass_turn):
+        await handle_round_timeout(room.code, db)
+
+    state = room_states.get(room.code, db)
+    assert state.current_round == 2
+    assert state.explainer.id == player2_id
     mock_broadcast.assert_not_called()
     mock_send_state.assert_not_called()
-    mock_create_task.assert_not_called()
 
-    if room.code in game_module.room_timers:
-        del game_module.room_timers[room.code]
-    if room.code in game_module.timer_tasks:
-        del game_module.timer_tasks[room.code]
-        
-    assert room.code not in game_module.room_timers
-    assert room.code not in game_module.timer_tasks
+    round_timers.cancel(room.code)
+
+
+@pytest.mark.asyncio
+async def test_start_round_timer_fires_timeout_handler():
+    """Тест: планировщик вызывает обработчик окончания раунда."""
+    with patch(
+        "app.api.endpoints.game.handle_round_timeout", new_callable=AsyncMock
+    ) as mock_timeout:
+        state = RoomState(
+            id=1,
+            code="TIMER1",
+            status=GameStatus.PLAYING,
+            difficulty=DifficultyEnum.basic,
+            current_round=1,
+            rounds_total=3,
+            time_per_round=0,
+        )
+        timer_start = game_module.start_round_timer(state)
+
+        assert round_timers.deadline("TIMER1") == timer_start
+        assert state.round_started_at == timer_start
+        assert state.round_deadline == timer_start
+        assert state.dirty is True
+        await asyncio.sleep(0.05)
+
+        mock_timeout.assert_awaited_once_with("TIMER1")
+        assert "TIMER1" not in round_timers
+
+
+@pytest.mark.asyncio
+async def test_recover_round_timers(setup_users_rooms):
+    """Тест восстановления таймеров идущих игр после перезапуска."""
+    db = setup_users_rooms["db"]
+    room = setup_users_rooms["room"]
+
+    now = time.time()
+    room.status = GameStatus.PLAYING
+    room.current_round = 1
+    room.round_started_at = now - 10
+    room.round_deadline = now + 50
+
+    expired_room = Room(
+        code="EXPIRD",
+        status=GameStatus.PLAYING,
+        current_round=1,
+        round_started_at=now - 100,
+        round_deadline=now - 40,
+    )
+    waiting_room = Room(code="WAITNG", round_deadline=now - 40)
+    db.add_all([expired_room, waiting_room])
+    db.commit()
+
+    with patch(
+        "app.api.endpoints.game.handle_round_timeout", new_callable=AsyncMock
+    ) as mock_timeout:
+        recovered = game_module.recover_round_timers(db)
+
+        assert recovered == 2
+        assert round_timers.deadline(room.code) == now + 50
+        assert "WAITNG" not in round_timers
+
+        # Просроченный раунд завершается сразу после запуска
+        await asyncio.sleep(0.05)
+        mock_timeout.assert_awaited_once_with("EXPIRD")
+
+    round_timers.cancel(room.code)
+
+
+@pytest.mark.asyncio
+async def test_recover_round_timers_without_deadline(setup_users_rooms):
+    """Тест: игра без сохраненного дедлайна получает новый раунд."""
+    db = setup_users_rooms["db"]
+    room = setup_users_rooms["room"]
+    players = setup_users_rooms["players"]
+
+    room.status = GameStatus.PLAYING
+    room.current_round = 1
+    players[0].role = PlayerRole.EXPLAINING
+    players[1].role = PlayerRole.GUESSING
+    db.commit()
+
+    recovered = game_module.recover_round_timers(db)
+
+    assert recovered == 1
+    db.refresh(room)
+    assert room.round_deadline == room.round_started_at + room.time_per_round
+    assert round_timers.deadline(room.code) == room.round_deadline
+
+    round_timers.cancel(room.code)
 
 
 @pytest.mark.asyncio
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.get_next_word")
 @patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.time.time")
-@patch("app.api.endpoints.game.asyncio.create_task")
-@patch("app.api.endpoints.game.start_round_timer", new_callable=AsyncMock)
 async def test_end_turn_success(
-    mock_start_timer,
-    mock_create_task,
     mock_time,
     mock_send_state,
-    mock_get_next_word,
     mock_broadcast,
     client,
     setup_users_rooms,
@@ -821,22 +867,19 @@ async def test_end_turn_success(
 
     start_time = 1000.0
     mock_time.return_value = start_time
-    mock_next_word_data = {
+    next_word_data = {
         "id": word.id + 1,
         "word": "NextWordEndTurn",
         "associations": [],
     }
     next_word_db = WordWithAssociations(
-        id=mock_next_word_data["id"],
-        word=mock_next_word_data["word"],
+        id=next_word_data["id"],
+        word=next_word_data["word"],
         category="TestCat3",
         difficulty=DifficultyEnum.basic,
     )
     db.add(next_word_db)
     db.commit()
-    mock_get_next_word.return_value = mock_next_word_data
-    mock_timer_task = MagicMock()
-    mock_create_task.return_value = mock_timer_task
 
     response = client.post(f"/api/game/{room_code}/end-turn", headers=headers)
 
@@ -848,13 +891,13 @@ async def test_end_turn_success(
     player1_after = db.get(Player, player1_id)
     player2_after = db.get(Player, player2_id)
     assert room_after.current_round == 2
-    assert room_after.current_word_id == mock_next_word_data["id"]
+    assert room_after.current_word_id == next_word_data["id"]
     assert player1_after.role == PlayerRole.GUESSING
     assert player2_after.role == PlayerRole.EXPLAINING
 
-    assert room_code in game_module.room_timers
-    assert game_module.room_timers[room_code]["start_time"] == start_time
-    mock_create_task.assert_called_once()
+    assert round_timers.deadline(room_code) == start_time + 60
+    assert room_after.round_deadline == start_time + 60
+    assert room_after.deck_seed is not None
 
     mock_send_state.assert_called_once()
     mock_broadcast.assert_called_once()
@@ -863,19 +906,57 @@ async def test_end_turn_success(
     assert broadcast_call_args[1]["type"] == "turn_changed"
     assert broadcast_call_args[1]["current_player"] == str(player2_id)
 
-    if room_code in game_module.room_timers:
-        del game_module.room_timers[room_code]
-    if room_code in game_module.timer_tasks:
-        del game_module.timer_tasks[room_code]
+    round_timers.cancel(room_code)
+
+
+@patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
+def test_end_turn_loads_catalog_in_threadpool(
+    mock_send_state, client, setup_users_rooms
+):
+    """Тест: каталог слов после сброса загружается вне цикла событий."""
+    db = setup_users_rooms["db"]
+    room = setup_users_rooms["room"]
+    players = setup_users_rooms["players"]
+    room.status = GameStatus.PLAYING
+    room.current_round = 1
+    players[0].role = PlayerRole.EXPLAINING
+    players[1].role = PlayerRole.GUESSING
+    db.add(
+        WordWithAssociations(
+            word="CatalogWord", category="TestCat", difficulty=DifficultyEnum.basic
+        )
+    )
+    db.commit()
+    room_code = room.code
+    headers = {"Authorization": f"Bearer {setup_users_rooms['tokens'][0]}"}
+
+    threads = {}
+    load = word_catalog._load
+
+    def record_load(db):
+        threads["load"] = threading.get_ident()
+        return load(db)
+
+    async def record_broadcast(*args):
+        threads["loop"] = threading.get_ident()
+
+    word_catalog.invalidate()
+    with patch.object(word_catalog, "_load", record_load), patch(
+        "app.api.endpoints.game.manager.broadcast", side_effect=record_broadcast
+    ):
+        response = client.post(f"/api/game/{room_code}/end-turn", headers=headers)
+
+    assert response.status_code == 200
+    assert set(threads) == {"load", "loop"}
+    assert threads["load"] != threads["loop"]
+    assert room_states.get(room_code, db).current_word is not None
+
+    round_timers.cancel(room_code)
 
 
 @pytest.mark.asyncio
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.asyncio.create_task")
-@patch("app.api.endpoints.game.start_round_timer", new_callable=AsyncMock)
-async def test_end_turn_game_finish(
-    mock_start_timer, mock_create_task, mock_broadcast, client, setup_users_rooms
-):
+async def test_end_turn_game_finish(mock_broadcast, client, setup_users_rooms):
     """Тест завершения хода, приводящего к завершению игры."""
     db = setup_users_rooms["db"]
     room_code = setup_users_rooms["room"].code
@@ -897,11 +978,6 @@ async def test_end_turn_game_finish(
     player2_setup.score_total = 15
     db.commit()
 
-    if room_code in game_module.room_timers:
-        del game_module.room_timers[room_code]
-    if room_code in game_module.timer_tasks:
-        del game_module.timer_tasks[room_code]
-
     broadcast_data = {}
     async def mock_broadcast_side_effect(room_code, data):
         broadcast_data.update(data)
@@ -925,8 +1001,7 @@ async def test_end_turn_game_finish(
     assert player1_after.score_total == 15
     assert player2_after.score_total == 20
 
-    assert room_code not in game_module.room_timers
-    assert room_code not in game_module.timer_tasks
+    assert room_code not in round_timers
 
     mock_broadcast.assert_called_once()
     broadcast_call_args = mock_broadcast.call_args[0]
@@ -937,8 +1012,6 @@ async def test_end_turn_game_finish(
     assert broadcast_data["message"] == "Игра завершена!"
     
     assert broadcast_data["winner"] == player2_id
-    
-    mock_create_task.assert_not_called()
 
 
 def test_end_turn_not_explainer(client, setup_users_rooms):
@@ -1095,6 +1168,48 @@ async def test_leave_game_explainer_success(
     mock_send_state.assert_called_once_with(room_code, db)
 
 
+@pytest.mark.asyncio
+@patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
+@patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
+async def test_leave_game_guesser_game_continues(
+    mock_send_state, mock_broadcast, client, setup_users_rooms
+):
+    """Тест выхода угадывающего игрока, когда игра продолжается: состояние рассылается сразу."""
+    db = setup_users_rooms["db"]
+    room_code = setup_users_rooms["room"].code
+    player1_id = setup_users_rooms["players"][0].id
+    player2_id = setup_users_rooms["players"][1].id
+    token_guesser = setup_users_rooms["tokens"][1]
+    headers = {"Authorization": f"Bearer {token_guesser}"}
+
+    user3 = User(
+        name="GameUser3",
+        email="gu3@example.com",
+        hashed_password=get_password_hash("pass3"),
+    )
+    db.add(user3)
+    db.commit()
+    player3 = Player(
+        user_id=user3.id, room_id=setup_users_rooms["room"].id, role=PlayerRole.GUESSING
+    )
+    db.add(player3)
+
+    room_setup = db.scalar(select(Room).where(Room.code == room_code))
+    room_setup.status = GameStatus.PLAYING
+    db.get(Player, player1_id).role = PlayerRole.EXPLAINING
+    db.get(Player, player2_id).role = PlayerRole.GUESSING
+    db.commit()
+
+    response = client.post(f"/api/game/{room_code}/leave", headers=headers)
+
+    assert response.status_code == 200
+    assert db.get(Player, player2_id) is None
+    assert db.get(Player, player1_id).role == PlayerRole.EXPLAINING
+    assert db.scalar(select(Room).where(Room.code == room_code)).status == GameStatus.PLAYING
+
+    mock_send_state.assert_called_once_with(room_code, db)
+
+
 @pytest.mark.asyncio
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
@@ -1215,15 +1330,9 @@ def test_leave_game_player_not_in_room(
 @pytest.mark.asyncio
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.get_next_word")
-@patch("app.api.endpoints.game.start_round_timer", new_callable=AsyncMock)
-@patch("app.api.endpoints.game.asyncio.create_task", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.time.time")
 async def test_submit_guess_correct_next_round(
     mock_time,
-    mock_create_task,
-    mock_start_timer,
-    mock_get_next_word,
     mock_send_state,
     mock_broadcast,
     client,
@@ -1254,22 +1363,19 @@ async def test_submit_guess_correct_next_round(
 
     start_time = 1000.0
     mock_time.return_value = start_time
-    mock_next_word_data = {
+    next_word_data = {
         "id": word_id + 1,
         "word": "NextGuessWord",
         "associations": [],
     }
     next_word_db = WordWithAssociations(
-        id=mock_next_word_data["id"],
-        word=mock_next_word_data["word"],
+        id=next_word_data["id"],
+        word=next_word_data["word"],
         category="TestCatGuess",
         difficulty=DifficultyEnum.basic,
     )
     db.add(next_word_db)
     db.commit()
-    mock_get_next_word.return_value = mock_next_word_data
-    mock_timer_task = MagicMock()
-    mock_create_task.return_value = mock_timer_task
 
     guess_payload = {"guess": f" {word_text.upper()} "}
 
@@ -1287,16 +1393,14 @@ async def test_submit_guess_correct_next_round(
     player2_after = db.get(Player, player2_id)
 
     assert room_after.current_round == 2
-    assert room_after.current_word_id == mock_next_word_data["id"]
+    assert room_after.current_word_id == next_word_data["id"]
     assert player1_after.role == PlayerRole.GUESSING
     assert player2_after.role == PlayerRole.EXPLAINING
     assert player1_after.score == 5
     assert player2_after.score == 10
     assert player2_after.correct_answers == 1
 
-    assert room_code in game_module.room_timers
-    assert game_module.room_timers[room_code]["start_time"] == start_time
-    mock_create_task.assert_called_once()
+    assert round_timers.deadline(room_code) == start_time + 60
 
     mock_send_state.assert_called_once_with(room_code, db)
     mock_broadcast.assert_called_once()
@@ -1308,6 +1412,59 @@ async def test_submit_guess_correct_next_round(
     assert broadcast_data["word"] == word_text
 
 
+@patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
+@patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
+def test_submit_guess_room_evicted_during_guess(
+    mock_send_state, mock_broadcast, client, setup_users_rooms
+):
+    """Тест: состояние комнаты сброшено, пока догадка ждала слово."""
+    db = setup_users_rooms["db"]
+    room = setup_users_rooms["room"]
+    room_code = room.code
+    player1_id, player2_id = [p.id for p in setup_users_rooms["players"]]
+    headers = {"Authorization": f"Bearer {setup_users_rooms['tokens'][1]}"}
+
+    room.status = GameStatus.PLAYING
+    room.current_round = 1
+    db.get(Player, player1_id).role = PlayerRole.EXPLAINING
+    db.get(Player, player2_id).role = PlayerRole.GUESSING
+    db.commit()
+
+    original_get_current_word_data = game_module.get_current_word_data
+    evicted_states = []
+
+    async def evict_during_word_lookup(state, session):
+        # Другой запрос меняет состав игроков, пока загружается слово
+        if not evicted_states:
+            evicted_states.append(state)
+            room_states.evict(state.code, session)
+        return await original_get_current_word_data(state, session)
+
+    with patch(
+        "app.api.endpoints.game.get_current_word_data",
+        side_effect=evict_during_word_lookup,
+    ):
+        response = client.post(
+            f"/api/game/{room_code}/guess",
+            headers=headers,
+            json={"guess": setup_users_rooms["word"].word},
+        )
+
+    assert response.status_code == 200
+    assert response.json()["correct"] is True
+
+    # Очки начислены в текущем состоянии, а не в сброшенном объекте
+    state = room_states.get(room_code, db)
+    assert state is not evicted_states[0]
+    assert state.get_player(player2_id).score == 10
+    assert evicted_states[0].get_player(player2_id).score == 0
+
+    db.expire_all()
+    assert db.scalar(select(Room).where(Room.code == room_code)).current_round == 2
+    assert db.get(Player, player2_id).score == 10
+    assert db.get(Player, player1_id).score == 5
+
+
 @pytest.mark.asyncio
 @patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
 @patch("app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock)
@@ -1367,8 +1524,7 @@ async def test_submit_guess_correct_last_round_finish(
     assert player1_after.score_total == 20
     assert player2_after.score_total == 25
 
-    assert room_code not in game_module.room_timers
-    assert room_code not in game_module.timer_tasks
+    assert room_code not in round_timers
 
     mock_send_state.assert_not_called()
     mock_broadcast.assert_called_once()
@@ -1510,10 +1666,7 @@ async def test_send_game_state_update_word_not_found(
     )
 
     start_time = time.time()
-    game_module.room_timers[room.code] = {
-        "start_time": start_time,
-        "duration": room.time_per_round,
-    }
+    round_timers.schedule(room.code, start_time + room.time_per_round, AsyncMock())
 
     await send_game_state_update(room.code, db)
 
@@ -1526,8 +1679,7 @@ async def test_send_game_state_update_word_not_found(
 
     mock_send_personal.assert_not_called()
 
-    if room.code in game_module.room_timers:
-        del game_module.room_timers[room.code]
+    round_timers.cancel(room.code)
 
 
 @pytest.mark.asyncio
@@ -1537,7 +1689,7 @@ async def test_send_game_state_update_word_not_found(
 async def test_send_game_state_update_timer_missing(
     mock_time, mock_send_personal, mock_broadcast, setup_users_rooms
 ):
-    """Тест отправки состояния, когда таймер отсутствует в room_timers при статусе PLAYING."""
+    """Тест отправки состояния, когда таймер раунда не запущен при статусе PLAYING."""
     db = setup_users_rooms["db"]
     room = setup_users_rooms["room"]
     players = setup_users_rooms["players"]
@@ -1550,8 +1702,7 @@ async def test_send_game_state_update_timer_missing(
     players[1].role = PlayerRole.GUESSING
     db.commit()
 
-    if room.code in game_module.room_timers:
-        del game_module.room_timers[room.code]
+    round_timers.cancel(room.code)
 
     current_time = 1000.0
     mock_time.return_value = current_time
@@ -1573,5 +1724,64 @@ async def test_send_game_state_update_timer_missing(
     assert personal_data["game_state"]["timeLeft"] == room.time_per_round
     assert personal_data["game_state"]["currentWord"] == word.word
 
-    if room.code in game_module.room_timers:
-        del game_module.room_timers[room.code]
\ No newline at end of file
+    assert round_timers.deadline(room.code) == current_time + room.time_per_round
+    round_timers.cancel(room.code)
+
+def _start_explaining(setup_users_rooms):
+    """Переводит комнату в игру, первый игрок объясняет."""
+    db = setup_users_rooms["db"]
+    room = setup_users_rooms["room"]
+    players = setup_users_rooms["players"]
+
+    room.status = GameStatus.PLAYING
+    room.current_round = 1
+    players[0].role = PlayerRole.EXPLAINING
+    players[1].role = PlayerRole.GUESSING
+    db.commit()
+    return room.code
+
+
+@patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
+def test_send_chat_message_explainer_allowed(
+    mock_broadcast, client, setup_users_rooms
+):
+    """Тест отправки разрешенного сообщения объясняющим."""
+    room_code = _start_explaining(setup_users_rooms)
+    headers = {"Authorization": f"Bearer {setup_users_rooms['tokens'][0]}"}
+
+    response = client.post(
+        f"/api/game/{room_code}/chat",
+        headers=headers,
+        json={"message": "Это слово для проверки"},
+    )
+
+    assert response.status_code == 200
+    mock_broadcast.assert_called_once()
+    assert mock_broadcast.call_args[0][1]["is_explaining"] is True
+
+
+@patch("app.api.endpoints.game.manager.broadcast", new_callable=AsyncMock)
+def test_send_chat_message_explainer_forbidden(
+    mock_broadcast, client, setup_users_rooms
+):
+    """Тест: объясняющий не может назвать слово или ассоциацию."""
+    room_code = _start_explaining(setup_users_rooms)
+    headers = {"Authorization": f"Bearer {setup_users_rooms['tokens'][0]}"}
+
+    response = client.post(
+        f"/api/game/{room_code}/chat",
+        headers=headers,
+        json={"message": "Это testword"},
+    )
+    assert response.status_code == 400
+    assert "загаданное слово" in response.json()["detail"]
+
+    response = client.post(
+        f"/api/game/{room_code}/chat",
+        headers=headers,
+        json={"message": "Подсказка: t1"},
+    )
+    assert response.status_code == 400
+    assert response.json()["detail"] == "Запрещено использовать слова: t1"
+
+    mock_broadcast.assert_not_called()
@@ -8,7 +8,9 @@ from app.models.room import Room, GameStatus
 from app.models.player import Player, PlayerRole
 from app.models.word import WordWithAssociations, DifficultyEnum
 from app.core.security import get_password_hash, create_access_token
+from app.api.endpoints import game as game_module
 import asyncio
+import threading
 
 client = TestClient(app)
 
@@ -69,7 +71,7 @@ def test_start_game_isolated(test_db: Session, start_game_setup):
     ) as mock_broadcast, patch(
         "app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock
     ) as mock_send_state, patch(
-        "app.api.endpoints.game.start_round_timer", new_callable=AsyncMock
+        "app.api.endpoints.game.start_round_timer", new_callable=MagicMock
     ) as mock_timer:
 
         headers = {"Authorization": f"Bearer {start_game_setup['token']}"}
@@ -86,7 +88,9 @@ def test_start_game_isolated(test_db: Session, start_game_setup):
 
         assert room.status == GameStatus.PLAYING
         assert room.current_round == 1
-        assert room.current_word_id is not None
+        assert room.current_word_id == start_game_setup["word"].id
+        assert room.deck_seed is not None
+        assert room.deck_position == 1
 
         players = test_db.query(Player).filter(Player.room_id == room.id).all()
 
@@ -99,3 +103,41 @@ def test_start_game_isolated(test_db: Session, start_game_setup):
         mock_send_state.assert_called()
         mock_broadcast.assert_called()
         mock_timer.assert_called_once()
+
+
+def test_start_game_database_work_in_threadpool(test_db: Session, start_game_setup):
+    """Тест: запросы к базе данных при старте игры выполняются вне цикла событий."""
+    threads = {}
+
+    def record_thread(name, func):
+        def wrapper(*args):
+            threads[name] = threading.get_ident()
+            return func(*args)
+
+        return wrapper
+
+    async def record_broadcast(*args):
+        threads["loop"] = threading.get_ident()
+
+    with patch(
+        "app.api.endpoints.game.start_periodic_game_state_updates",
+        new_callable=AsyncMock,
+    ), patch(
+        "app.api.endpoints.game.manager.broadcast", side_effect=record_broadcast
+    ), patch(
+        "app.api.endpoints.game.send_game_state_update", new_callable=AsyncMock
+    ), patch(
+        "app.api.endpoints.game.check_game_start",
+        record_thread("check", game_module.check_game_start),
+    ), patch(
+        "app.api.endpoints.game.prepare_new_game",
+        record_thread("prepare", game_module.prepare_new_game),
+    ):
+        headers = {"Authorization": f"Bearer {start_game_setup['token']}"}
+        room_code = start_game_setup["room"].code
+        response = client.post(f"/api/game/{room_code}/start", headers=headers)
+
+    assert response.status_code == 200
+    assert set(threads) == {"check", "prepare", "loop"}
+    assert threads["check"] != threads["loop"]
+    assert threads["prepare"] != threads["loop"]
@@ -0,0 +1,24 @@
+from unittest.mock import PropertyMock, patch
+from app.core.nlp_executor import NlpExecutor
+
+
+def test_health_ready(client):
+    """Тест: сервис готов, когда модель анализа чата загружена."""
+    with patch.object(NlpExecutor, "ready", new_callable=PropertyMock) as ready:
+        ready.return_value = True
+        response = client.get("/health")
+
+    assert response.status_code == 200
+    assert response.json()["status"] == "ok"
+    assert response.json()["nlp"] == "ready"
+
+
+def test_health_model_loading(client):
+    """Тест: пока модель загружается, сервис отвечает 503."""
+    with patch.object(NlpExecutor, "ready", new_callable=PropertyMock) as ready:
+        ready.return_value = False
+        response = client.get("/health")
+
+    assert response.status_code == 503
+    assert response.json()["status"] == "starting"
+    assert response.json()["nlp"] == "loading"
@@ -6,12 +6,32 @@ from app.models.user import User
 from app.models.room import Room, GameStatus
 from app.core.security import get_password_hash, create_access_token
 import uuid
+from contextlib import contextmanager
+from sqlalchemy import event
+from sqlalchemy.orm import sessionmaker
 from unittest.mock import AsyncMock, patch
 from app.models.player import Player, PlayerRole
+from app.core.room_state import room_states
 
 client = TestClient(app)
 
 
+@contextmanager
+def count_queries(db: Session):
+    """Считает SQL-запросы, выполненные через движок сессии."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+
+
 @pytest.fixture
 def auth_user(test_db: Session):
     """Создает тестового пользователя и возвращает его JWT токен."""
@@ -399,3 +419,138 @@ def test_lobby_chat_success(test_db, auth_user, client):
         )
     assert res.status_code == 200
     assert res.json()["success"] is True
+
+
+@pytest.fixture
+def crowded_rooms(test_db: Session):
+    """Две комнаты по четыре игрока для проверки числа запросов."""
+    rooms = [Room(code=f"CROWD{i}", max_players=4) for i in range(2)]
+    test_db.add_all(rooms)
+    test_db.commit()
+
+    for room in rooms:
+        for i in range(4):
+            user = User(
+                name=f"{room.code} user {i}",
+                email=f"{room.code.lower()}_{i}@example.com",
+                hashed_password="hashed",
+            )
+            test_db.add(user)
+            test_db.commit()
+            test_db.add(Player(user_id=user.id, room_id=room.id, score_total=i))
+    test_db.commit()
+    test_db.expire_all()
+    return rooms
+
+
+def test_get_room_single_query(test_db, crowded_rooms, client):
+    """Тест: комната с игроками загружается одним запросом."""
+    with count_queries(test_db) as statements:
+        res = client.get("/api/rooms/CROWD0")
+
+    assert res.status_code == 200
+    assert len(statements) == 1
+
+    d = res.json()
+    assert d["player_count"] == 4
+    assert d["is_full"] is True
+    assert [p["name"] for p in d["players"]] == [f"CROWD0 user {i}" for i in range(4)]
+    assert [p["score_total"] for p in d["players"]] == [0, 1, 2, 3]
+
+
+def test_get_active_rooms_single_query(test_db, crowded_rooms, client):
+    """Тест: список активных комнат не загружает игроков по одному."""
+    with count_queries(test_db) as statements:
+        res = client.get("/api/rooms/active")
+
+    assert res.status_code == 200
+    assert len(statements) == 1
+
+    data = {r["code"]: r for r in res.json()}
+    assert data["CROWD1"]["player_count"] == 4
+    assert data["CROWD1"]["players"][0]["name"] == "CROWD1 user 0"
+
+
+@contextmanager
+def load_state_after_evict(test_db: Session, room_code: str):
+    """
+    Загружает состояние комнаты из другой сессии сразу после первого сброса,
+    как игровой запрос, пришедший до фиксации изменений состава.
+    """
+    evict = room_states.evict_from_thread
+    other_db = sessionmaker(bind=test_db.get_bind())()
+    calls = []
+
+    def evict_and_load(code, db=None):
+        evict(code, db)
+        if not calls:
+            room_states.get(room_code, other_db)
+        calls.append(code)
+
+    try:
+        with patch.object(room_states, "evict_from_thread", evict_and_load):
+            yield
+    finally:
+        other_db.close()
+
+
+def test_join_room_drops_state_loaded_before_commit(test_db, auth_user, client):
+    """Тест: состояние со старым составом не остается в памяти после входа."""
+    headers = {"Authorization": f"Bearer {auth_user['token']}"}
+    room = Room(code="RACE1", max_players=6)
+    test_db.add(room)
+    test_db.commit()
+    user_id = auth_user["user"].id
+
+    with load_state_after_evict(test_db, "RACE1"):
+        with patch("app.api.endpoints.rooms.manager.broadcast", new_callable=AsyncMock):
+            res = client.post(f"/api/rooms/join/RACE1/{user_id}", headers=headers)
+
+    assert res.status_code == 200
+    state = room_states.get("RACE1", test_db)
+    assert [p.user_id for p in state.players] == [user_id]
+
+
+def test_leave_room_drops_state_loaded_before_commit(test_db, auth_user, client):
+    """Тест: вышедший игрок не остается в состоянии комнаты в памяти."""
+    other = User(name="Stayer", email="stayer@example.com", hashed_password="x")
+    room = Room(code="RACE2", max_players=6)
+    test_db.add_all([other, room])
+    test_db.commit()
+    user_id = auth_user["user"].id
+    test_db.add_all(
+        [
+            Player(user_id=user_id, room_id=room.id, role=PlayerRole.WAITING),
+            Player(user_id=other.id, room_id=room.id, role=PlayerRole.WAITING),
+        ]
+    )
+    test_db.commit()
+    other_id = other.id
+    headers = {"Authorization": f"Bearer {auth_user['token']}"}
+
+    with load_state_after_evict(test_db, "RACE2"):
+        with patch("app.api.endpoints.rooms.manager.broadcast", new_callable=AsyncMock):
+            res = client.post("/api/rooms/RACE2/leave", headers=headers)
+
+    assert res.status_code == 200
+    state = room_states.get("RACE2", test_db)
+    assert [p.user_id for p in state.players] == [other_id]
+
+
+def test_delete_room_drops_state_loaded_before_commit(test_db, auth_user, client):
+    """Тест: состояние удаленной комнаты не остается в памяти."""
+    room = Room(code="RACE3", max_players=6)
+    test_db.add(room)
+    test_db.commit()
+    test_db.add(
+        Player(user_id=auth_user["user"].id, room_id=room.id, role=PlayerRole.WAITING)
+    )
+    test_db.commit()
+    headers = {"Authorization": f"Bearer {auth_user['token']}"}
+
+    with load_state_after_evict(test_db, "RACE3"):
+        with patch("app.api.endpoints.rooms.manager.broadcast", new_callable=AsyncMock):
+            res = client.delete("/api/rooms/RACE3", headers=headers)
+
+    assert res.status_code == 200
+    assert room_states.get("RACE3", test_db) is None
@@ -1,10 +1,17 @@
 import pytest
+import jwt
+import asyncio
+import time
 from fastapi.testclient import TestClient
 from sqlalchemy.orm import Session
 from unittest.mock import patch
 from app.main import app
 from app.models.user import User
-from app.core.security import get_password_hash, create_access_token
+from app.core.config import settings
+from app.core.security import get_password_hash, create_access_token, ALGORITHM
+from app.core.password_hasher import password_hasher
+from app.core.identity_cache import identity_cache
+from app.core.token_revocation import DatabaseRevocationStore
 
 client = TestClient(app)
 
@@ -47,6 +54,25 @@ def test_register_existing_user(test_db: Session):
     assert "уже существует" in response.json()["detail"]
 
 
+def test_register_user_hasher_overloaded(test_db: Session):
+    """Тест: при переполненном пуле хеширования регистрация получает 503."""
+    user_data = {
+        "name": "Overloaded User",
+        "email": "overloaded@example.com",
+        "password": "strongpassword123",
+    }
+
+    with patch.object(password_hasher, "workers", 0), patch.object(
+        password_hasher, "max_pending", 0
+    ):
+        response = client.post("/api/users/register", json=user_data)
+
+    assert response.status_code == 503
+    assert "перегружен" in response.json()["detail"]
+    assert response.headers["Retry-After"] == "1"
+    assert test_db.query(User).filter(User.email == user_data["email"]).first() is None
+
+
 def test_login_success(test_db: Session):
     """Тест успешной авторизации пользователя."""
     password = "correctpassword123"
@@ -155,6 +181,70 @@ def test_update_profile(test_db: Session):
     assert login_response.status_code == 200
 
 
+def test_login_token_contains_user_id(test_db: Session):
+    """Тест: токен входа содержит ID пользователя."""
+    user = User(
+        name="Uid User",
+        email="uid@example.com",
+        hashed_password=get_password_hash("uidpass123"),
+    )
+    test_db.add(user)
+    test_db.commit()
+    test_db.refresh(user)
+
+    response = client.post(
+        "/api/users/login", json={"email": user.email, "password": "uidpass123"}
+    )
+    token = response.json()["access_token"]
+
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["uid"] == user.id
+
+
+def test_profile_served_from_identity_cache(test_db: Session):
+    """Тест: пользователь берется из кэша, пока его не сбросит изменение профиля."""
+    user = User(
+        name="Cached User",
+        email="cached@example.com",
+        hashed_password=get_password_hash("cachedpass123"),
+    )
+    test_db.add(user)
+    test_db.commit()
+    test_db.refresh(user)
+    token = create_access_token(data={"sub": user.email, "uid": user.id})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+    with patch("app.core.security.get_user_by_id") as get_user:
+        response = client.get("/api/users/me", headers=headers)
+    get_user.assert_not_called()
+    assert response.json()["name"] == "Cached User"
+
+    response = client.put("/api/users/me", json={"name": "Renamed"}, headers=headers)
+    assert response.status_code == 200
+    assert identity_cache.get(token) is None
+    assert client.get("/api/users/me", headers=headers).json()["name"] == "Renamed"
+
+
+def test_logout_invalidates_cached_user(test_db: Session):
+    """Тест: после выхода токен не принимается, даже если он был в кэше."""
+    user = User(
+        name="Logout User",
+        email="logoutcache@example.com",
+        hashed_password=get_password_hash("logoutpass123"),
+    )
+    test_db.add(user)
+    test_db.commit()
+    token = create_access_token(data={"sub": user.email})
+    headers = {"Authorization": f"Bearer {token}"}
+
+    assert client.get("/api/users/me", headers=headers).status_code == 200
+    assert client.post("/api/users/logout", headers=headers).status_code == 200
+
+    assert identity_cache.get(token) is None
+    assert client.get("/api/users/me", headers=headers).status_code == 401
+
+
 def test_logout_success(monkeypatch):
     token = "dummy.token.value"
     monkeypatch.setenv("TESTING", "True")
@@ -178,6 +268,25 @@ def test_logout_failure(monkeypatch):
         assert "Ошибка при выходе" in response.json()["detail"]
 
 
+def test_logout_runs_in_threadpool():
+    """Тест: отзыв токена выполняется в пуле потоков, а не в цикле событий."""
+    loops = []
+
+    def record_loop(token):
+        try:
+            loops.append(asyncio.get_running_loop())
+        except RuntimeError:
+            loops.append(None)
+
+    with patch("app.api.endpoints.users.invalidate_token", side_effect=record_loop):
+        response = client.post(
+            "/api/users/logout", headers={"Authorization": "Bearer dummy.token"}
+        )
+
+    assert response.status_code == 200
+    assert loops == [None]
+
+
 def test_update_profile_email_conflict(test_db):
     from app.models.user import User
 
@@ -197,6 +306,33 @@ def test_update_profile_email_conflict(test_db):
     assert "Email уже используется" in response.json()["detail"]
 
 
+def test_token_revoked_by_other_worker_rejected_from_cache(test_db: Session):
+    """Тест: токен, отозванный в другом процессе, не принимается из кэша."""
+    user = User(
+        name="Worker User",
+        email="worker@example.com",
+        hashed_password=get_password_hash("workerpass123"),
+    )
+    test_db.add(user)
+    test_db.commit()
+    token = create_access_token(data={"sub": user.email})
+    headers = {"Authorization": f"Bearer {token}"}
+    token_id = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])["jti"]
+    store = DatabaseRevocationStore(purge_interval=300)
+    other_worker = DatabaseRevocationStore(purge_interval=300)
+
+    with patch("app.core.security.revoked_tokens", store):
+        assert client.get("/api/users/me", headers=headers).status_code == 200
+        assert identity_cache.get(token) is not None
+
+        other_worker.revoke(token_id, time.time() + 60, test_db)
+        response = client.get("/api/users/me", headers=headers)
+
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Токен недействителен"
+    assert identity_cache.get(token) is None
+
+
 def test_update_profile_invalid_current_password(test_db):
     user = User(
         name="U3", email="u3@example.com", hashed_password=get_password_hash("orig")
@@ -162,3 +162,21 @@ def test_get_word_by_category_not_found():
     res = client.get("/api/words/NoCategory")
     assert res.status_code == 404
     assert "Категория" in res.json()["detail"]
+
+
+def test_add_word_invalidates_catalog(clear_words):
+    res = client.get("/api/words/random-word", params={"difficulty": "medium"})
+    assert res.status_code == 404
+
+    json_data = {
+        "word": "Omega",
+        "category": "CatO",
+        "difficulty": "medium",
+        "associations": ["o1"],
+    }
+    res = client.post("/api/words/", json=json_data)
+    assert res.status_code == 200
+
+    res = client.get("/api/words/random-word", params={"difficulty": "medium"})
+    assert res.status_code == 200
+    assert res.json()["word"] == "Omega"
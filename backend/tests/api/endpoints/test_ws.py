@@ -2,7 +2,15 @@ import pytest
 import json
 from datetime import datetime
 import asyncio
+from unittest.mock import patch
+from fastapi import WebSocketDisconnect
 from app.api.endpoints.ws import manager, ConnectionManager
+from app.core.security import create_access_token
+from app.core.timers import round_timers
+from app.models.user import User
+from app.models.room import Room, GameStatus
+from app.models.player import Player, PlayerRole
+from app.models.word import WordWithAssociations, DifficultyEnum
 
 
 class DummyWebSocket:
@@ -11,7 +19,7 @@ class DummyWebSocket:
         self.headers = {}
         self.closed = False
 
-    async def accept(self):
+    async def accept(self, subprotocol=None):
         pass
 
     async def send_text(self, message: str):
@@ -24,8 +32,12 @@ class DummyWebSocket:
 @pytest.fixture(autouse=True)
 def clear_connections():
     manager.active_connections.clear()
+    manager.outboxes.clear()
+    manager.user_connections.clear()
     yield
     manager.active_connections.clear()
+    manager.outboxes.clear()
+    manager.user_connections.clear()
 
 
 @pytest.mark.asyncio
@@ -70,10 +82,12 @@ async def test_broadcast_and_exclusions():
     await manager.connect(ws1, "roomB", user_id=1)
     await manager.connect(ws2, "roomB", user_id=2)
     await manager.broadcast("roomB", {"type": "msg_all"})
+    await manager.flush("roomB")
     assert len(ws1.sent) == 1 and len(ws2.sent) == 1
     ws1.sent.clear()
     ws2.sent.clear()
     await manager.broadcast("roomB", {"type": "msg_excl"}, exclude_user_id=2)
+    await manager.flush("roomB")
     assert len(ws1.sent) == 1 and len(ws2.sent) == 0
 
 
@@ -84,5 +98,368 @@ async def test_send_personal_message():
     await manager.connect(ws1, "roomZ", user_id=5)
     await manager.connect(ws2, "roomZ", user_id=6)
     await manager.send_personal_message("5", {"hello": "user5"})
+    await manager.flush("roomZ")
     assert any("hello" in s for s in ws1.sent)
     assert not ws2.sent
+
+
+class FailingWebSocket(DummyWebSocket):
+    async def send_text(self, message: str):
+        raise RuntimeError("connection lost")
+
+
+class SlowWebSocket(DummyWebSocket):
+    async def send_text(self, message: str):
+        await asyncio.sleep(10)
+        self.sent.append(message)
+
+
+class GatedWebSocket(DummyWebSocket):
+    """Клиент, который не читает сообщения, пока не открыт шлюз"""
+
+    def __init__(self):
+        super().__init__()
+        self.gate = asyncio.Event()
+
+    async def send_text(self, message: str):
+        await self.gate.wait()
+        self.sent.append(message)
+
+
+@pytest.mark.asyncio
+async def test_broadcast_serializes_once():
+    sockets = [DummyWebSocket() for _ in range(3)]
+    for i, ws in enumerate(sockets):
+        await manager.connect(ws, "roomS", user_id=i + 1)
+
+    with patch(
+        "app.api.endpoints.ws.json.dumps", wraps=json.dumps
+    ) as mock_dumps:
+        report = await manager.broadcast(
+            "roomS", {"type": "msg", "at": datetime(2024, 1, 1)}
+        )
+    await manager.flush("roomS")
+
+    mock_dumps.assert_called_once()
+    assert report.queued == [1, 2, 3]
+    assert all(ws.sent == sockets[0].sent for ws in sockets)
+    assert json.loads(sockets[0].sent[0])["at"] == "2024-01-01T00:00:00"
+
+
+@pytest.mark.asyncio
+async def test_broadcast_does_not_wait_for_slow_client(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "WS_SEND_TIMEOUT", 0.05)
+    slow, fast = SlowWebSocket(), DummyWebSocket()
+    await manager.connect(slow, "roomT", user_id=1)
+    await manager.connect(fast, "roomT", user_id=2)
+
+    start = asyncio.get_running_loop().time()
+    report = await manager.broadcast("roomT", {"type": "msg"})
+    elapsed = asyncio.get_running_loop().time() - start
+
+    assert elapsed < 0.05
+    assert report.queued == [1, 2]
+
+    await manager.flush("roomT")
+    await asyncio.sleep(0)
+    assert fast.sent
+    # Клиент, не успевший принять сообщение, отключается
+    assert 1 not in manager.active_connections["roomT"]
+    assert slow not in manager.outboxes
+    assert slow.closed
+
+
+@pytest.mark.asyncio
+async def test_failed_send_evicts_client():
+    ok, broken = DummyWebSocket(), FailingWebSocket()
+    await manager.connect(ok, "roomD", user_id=1)
+    await manager.connect(broken, "roomD", user_id=2)
+
+    await manager.broadcast("roomD", {"type": "msg"})
+    await manager.flush("roomD")
+    await asyncio.sleep(0)
+
+    assert 2 not in manager.active_connections["roomD"]
+    assert 1 in manager.active_connections["roomD"]
+    assert broken.closed
+
+
+@pytest.mark.asyncio
+async def test_messages_keep_order():
+    ws = DummyWebSocket()
+    await manager.connect(ws, "roomO", user_id=1)
+
+    for i in range(5):
+        await manager.broadcast("roomO", {"type": "chat_message", "n": i})
+    await manager.flush("roomO")
+
+    assert [json.loads(m)["n"] for m in ws.sent] == [0, 1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_game_state_updates_are_coalesced():
+    ws = GatedWebSocket()
+    await manager.connect(ws, "roomC", user_id=1)
+
+    await manager.broadcast("roomC", {"type": "chat_message", "n": 0})
+    await asyncio.sleep(0)  # писатель ждет клиента на первом сообщении
+    for i in range(1, 4):
+        await manager.broadcast("roomC", {"type": "game_state_update", "n": i})
+    await manager.broadcast("roomC", {"type": "chat_message", "n": 4})
+
+    ws.gate.set()
+    await manager.flush("roomC")
+
+    received = [(json.loads(m)["type"], json.loads(m)["n"]) for m in ws.sent]
+    assert received == [
+        ("chat_message", 0),
+        ("game_state_update", 3),
+        ("chat_message", 4),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_droppable_messages_dropped_over_soft_limit(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "WS_QUEUE_SOFT_LIMIT", 2)
+    ws = GatedWebSocket()
+    await manager.connect(ws, "roomL", user_id=1)
+
+    await manager.broadcast("roomL", {"type": "chat_message", "n": 0})
+    await asyncio.sleep(0)
+    await manager.broadcast("roomL", {"type": "chat_message", "n": 1})
+    await manager.broadcast("roomL", {"type": "chat_message", "n": 2})
+    report = await manager.broadcast("roomL", {"type": "wrong_guess", "n": 3})
+
+    assert report.dropped == [1]
+    ws.gate.set()
+    await manager.flush("roomL")
+    assert [json.loads(m)["n"] for m in ws.sent] == [0, 1, 2]
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_evicted_at_high_water(monkeypatch):
+    from app.core.config import settings
+
+    monkeypatch.setattr(settings, "WS_QUEUE_HIGH_WATER", 3)
+    slow, fast = GatedWebSocket(), DummyWebSocket()
+    await manager.connect(slow, "roomH", user_id=1)
+    await manager.connect(fast, "roomH", user_id=2)
+
+    report = None
+    for i in range(5):
+        report = await manager.broadcast("roomH", {"type": "chat_message", "n": i})
+        await asyncio.sleep(0)
+
+    assert 1 not in manager.active_connections["roomH"]
+    assert report.queued == [2]
+    await manager.flush("roomH")
+    await asyncio.sleep(0)
+    assert slow.closed
+    assert len(fast.sent) == 5
+
+
+@pytest.mark.asyncio
+async def test_disconnect_keeps_newer_connection():
+    old, new = DummyWebSocket(), DummyWebSocket()
+    await manager.connect(old, "roomN", user_id=7)
+    await manager.connect(new, "roomN", user_id=7)
+
+    manager.disconnect("roomN", 7, old)
+
+    assert manager.active_connections["roomN"][7] is new
+    assert old not in manager.outboxes
+    assert new in manager.outboxes
+
+
+@pytest.mark.asyncio
+async def test_user_index_maintained():
+    ws1, ws2, ws3 = DummyWebSocket(), DummyWebSocket(), DummyWebSocket()
+    await manager.connect(ws1, "room1", user_id=9)
+    await manager.connect(ws2, "room2", user_id=9)
+    assert manager.user_connections[9] == {("room1", ws1), ("room2", ws2)}
+
+    # Переподключение в той же комнате заменяет старую запись
+    await manager.connect(ws3, "room1", user_id=9)
+    assert manager.user_connections[9] == {("room1", ws3), ("room2", ws2)}
+
+    manager.disconnect("room1", 9, ws3)
+    manager.disconnect("room2", 9, ws2)
+    assert 9 not in manager.user_connections
+
+
+@pytest.mark.asyncio
+async def test_send_personal_message_room_scoped():
+    in_room, elsewhere, other_user = DummyWebSocket(), DummyWebSocket(), DummyWebSocket()
+    await manager.connect(in_room, "roomP", user_id=5)
+    await manager.connect(elsewhere, "roomQ", user_id=5)
+    await manager.connect(other_user, "roomP", user_id=6)
+
+    await manager.send_personal_message("5", {"type": "secret"}, room_code="roomP")
+    await manager.flush()
+    assert len(in_room.sent) == 1
+    assert not elsewhere.sent and not other_user.sent
+
+    await manager.send_personal_message("5", {"type": "everywhere"})
+    await manager.flush()
+    assert len(in_room.sent) == 2 and len(elsewhere.sent) == 1
+    assert not other_user.sent
+
+
+@pytest.mark.asyncio
+async def test_evicted_client_removed_from_user_index():
+    broken = FailingWebSocket()
+    await manager.connect(broken, "roomE", user_id=3)
+
+    await manager.send_personal_message("3", {"type": "msg"}, room_code="roomE")
+    await manager.flush()
+
+    assert 3 not in manager.user_connections
+
+
+def create_ws_room(db, status=GameStatus.WAITING):
+    """Создает комнату с объясняющим и угадывающим игроками."""
+    host = User(name="Host", email="wshost@example.com", hashed_password="x")
+    guest = User(name="Guest", email="wsguest@example.com", hashed_password="x")
+    outsider = User(name="Outsider", email="wsout@example.com", hashed_password="x")
+    word = WordWithAssociations(
+        word="Кошка",
+        category="Животные",
+        associations=["мяу", "хвост"],
+        is_active=True,
+        difficulty=DifficultyEnum.basic,
+    )
+    db.add_all([host, guest, outsider, word])
+    db.commit()
+
+    room = Room(code="wsroom", status=status, current_round=1, current_word_id=word.id)
+    db.add(room)
+    db.commit()
+    db.add_all(
+        [
+            Player(user_id=host.id, room_id=room.id, role=PlayerRole.EXPLAINING),
+            Player(user_id=guest.id, room_id=room.id, role=PlayerRole.GUESSING),
+        ]
+    )
+    db.commit()
+    return host, guest, outsider
+
+
+def ws_params(user, token=None):
+    """URL подключения и подпротоколы с токеном пользователя."""
+    token = token or create_access_token(data={"sub": user.email, "uid": user.id})
+    return {"url": f"/api/ws/wsroom/{user.id}", "subprotocols": ["bearer", token]}
+
+
+def test_websocket_handshake_sends_room_state(client, test_db):
+    """Тест: после проверки токена клиент получает состояние комнаты."""
+    _, guest, _ = create_ws_room(test_db)
+
+    with client.websocket_connect(**ws_params(guest)) as websocket:
+        message = websocket.receive_json()
+        subprotocol = websocket.accepted_subprotocol
+
+    assert subprotocol == "bearer"
+
+    assert message["type"] == "room_update"
+    assert message["room"]["code"] == "wsroom"
+    assert [p["name"] for p in message["room"]["players"]] == ["Host", "Guest"]
+    assert message["game_state"] is None
+
+
+def test_websocket_handshake_sends_word_to_explainer(client, test_db):
+    """Тест: объясняющий получает состояние идущей игры с секретным словом."""
+    host, guest, _ = create_ws_room(test_db, GameStatus.PLAYING)
+    host_params, guest_params = ws_params(host), ws_params(guest)
+
+    with client.websocket_connect(**host_params) as websocket:
+        host_state = websocket.receive_json()["game_state"]
+    with client.websocket_connect(**guest_params) as websocket:
+        guest_state = websocket.receive_json()["game_state"]
+
+    assert host_state["currentWord"] == "Кошка"
+    assert host_state["associations"] == ["мяу", "хвост"]
+    assert guest_state["currentWord"] == ""
+    assert "associations" not in guest_state
+    round_timers.clear()
+
+
+@pytest.mark.parametrize(
+    "case", ["no_token", "invalid_token", "other_user", "outsider", "query_token"]
+)
+def test_websocket_handshake_rejected(client, test_db, case):
+    """Тест: подключение без токена, с чужим токеном или чужим игроком отклоняется."""
+    host, guest, outsider = create_ws_room(test_db)
+    guest_token = create_access_token(data={"sub": guest.email, "uid": guest.id})
+    params = {
+        "no_token": {"url": f"/api/ws/wsroom/{guest.id}"},
+        "invalid_token": ws_params(guest, token="invalid"),
+        "other_user": ws_params(
+            guest, token=create_access_token(data={"sub": host.email})
+        ),
+        "outsider": ws_params(outsider),
+        # Токен в URL больше не принимается: URL попадает в журналы
+        "query_token": {"url": f"/api/ws/wsroom/{guest.id}?token={guest_token}"},
+    }[case]
+
+    with pytest.raises(WebSocketDisconnect) as exc_info:
+        with client.websocket_connect(**params) as websocket:
+            websocket.receive_json()
+
+    assert exc_info.value.code == 1008
+
+
+def receive_ack(websocket):
+    """Читает сообщения до подтверждения команды."""
+    while True:
+        message = websocket.receive_json()
+        if message["type"] == "ack":
+            return message
+
+
+def test_websocket_guess_command(client, test_db):
+    """Тест: догадка по WebSocket проверяется и подтверждается с request_id."""
+    _, guest, _ = create_ws_room(test_db, GameStatus.PLAYING)
+
+    with client.websocket_connect(**ws_params(guest)) as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "guess", "request_id": "1", "guess": "собака"})
+        wrong = receive_ack(websocket)
+        websocket.send_json({"type": "guess", "request_id": "2", "guess": "Кошки"})
+        correct = receive_ack(websocket)
+
+    assert wrong["request_id"] == "1" and wrong["ok"] is True
+    assert wrong["result"]["correct"] is False
+    assert correct["request_id"] == "2" and correct["ok"] is True
+    assert correct["result"]["correct"] is True
+    round_timers.clear()
+
+
+def test_websocket_command_errors(client, test_db):
+    """Тест: ошибки команд возвращаются в подтверждении, соединение не закрывается."""
+    host, guest, _ = create_ws_room(test_db, GameStatus.PLAYING)
+    host_params, guest_params = ws_params(host), ws_params(guest)
+
+    with client.websocket_connect(**host_params) as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "chat", "request_id": 7, "message": "Это кошка"})
+        chat = receive_ack(websocket)
+
+    with client.websocket_connect(**guest_params) as websocket:
+        websocket.receive_json()
+        websocket.send_json({"type": "end_turn", "request_id": "a"})
+        end_turn = receive_ack(websocket)
+        websocket.send_json({"type": "guess", "request_id": "b"})
+        invalid = receive_ack(websocket)
+        websocket.send_text("not json")
+        not_json = receive_ack(websocket)
+
+    assert (chat["request_id"], chat["ok"], chat["status"]) == (7, False, 400)
+    assert chat["detail"] == "Запрещено использовать загаданное слово в сообщении"
+    assert (end_turn["request_id"], end_turn["status"]) == ("a", 403)
+    assert (invalid["request_id"], invalid["status"]) == ("b", 422)
+    assert not_json["status"] == 422
+    round_timers.clear()
@@ -6,6 +6,12 @@ from app.db.base import Base
 from app.core.config import settings
 from app.main import app
 from app.db.deps import get_db
+from app.core.room_state import room_states
+from app.core.timers import round_timers
+from app.core.word_catalog import word_catalog
+from app.core.chat_filter import chat_filters
+from app.core.identity_cache import identity_cache
+from app.core.token_revocation import revoked_tokens
 import asyncio
 import os
 
@@ -27,6 +33,14 @@ def test_db():
     # Создаем новые таблицы для каждого теста
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
+    # Сбрасываем состояние комнат, таймеры, каталог слов, кэш фильтра чата,
+    # кэш аутентификации и отозванные токены от предыдущего теста
+    room_states.clear()
+    round_timers.clear()
+    word_catalog.invalidate()
+    chat_filters.clear()
+    identity_cache.clear()
+    revoked_tokens.clear()
     try:
         db = TestingSessionLocal()
         yield db
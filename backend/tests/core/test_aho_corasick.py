@@ -0,0 +1,34 @@
+import pickle
+from app.core.aho_corasick import AhoCorasick
+
+
+def test_find_overlapping_patterns():
+    """Тест поиска пересекающихся строк и переходов по суффиксным ссылкам."""
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+
+    assert matcher.find("ushers") == {"she", "he", "hers"}
+    assert matcher.find("ahishers") == {"his", "she", "he", "hers"}
+    assert matcher.find("xyz") == set()
+
+
+def test_find_cyrillic_substrings():
+    """Тест поиска русских слов внутри других слов."""
+    matcher = AhoCorasick(["кот", "котлета", "лета"])
+
+    assert matcher.find("вкусная котлета") == {"кот", "котлета", "лета"}
+    assert matcher.find("скотина") == {"кот"}
+
+
+def test_empty_and_duplicate_patterns():
+    """Тест: пустые строки пропускаются, повторы не дублируются."""
+    matcher = AhoCorasick(["", "мяу", "мяу"])
+
+    assert matcher.find("мяу-мяу") == {"мяу"}
+    assert AhoCorasick([]).find("что угодно") == set()
+
+
+def test_pickle_roundtrip():
+    """Тест: автомат передается в рабочие процессы через pickle."""
+    matcher = pickle.loads(pickle.dumps(AhoCorasick(["усы", "хвост"])))
+
+    assert matcher.find("длинный хвост и усы") == {"усы", "хвост"}
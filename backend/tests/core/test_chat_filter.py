@@ -0,0 +1,119 @@
+import spacy
+from unittest.mock import MagicMock
+from app.core.chat_filter import (
+    ChatFilterIndex,
+    analyze_messages,
+    build_word_lemmas,
+    check_message,
+)
+from app.core.lemma_cache import LemmaCache
+
+nlp = spacy.blank("ru")
+
+WORD_DATA = {"id": 1, "word": "Кошка", "associations": ["Мяу", "усы", "хвост"]}
+
+
+def test_build_word_lemmas():
+    """Тест предвычисления форм слова и ассоциаций."""
+    lemmas = build_word_lemmas(nlp, "Кошка", ["Мяу", "усы"])
+
+    assert lemmas.word == "кошка"
+    assert lemmas.word_lemma == "кошка"
+    assert lemmas.associations == ("мяу", "усы")
+    assert lemmas.association_lemmas == {"мяу": "мяу", "усы": "усы"}
+
+
+def test_check_message_allowed():
+    """Тест: сообщение без запрещенных слов проходит проверку."""
+    lemmas = build_word_lemmas(nlp, WORD_DATA["word"], WORD_DATA["associations"])
+
+    assert check_message(nlp, lemmas, "Домашнее животное, любит молоко") is None
+
+
+def test_check_message_forbidden_word():
+    """Тест: загаданное слово запрещено в любом регистре и внутри слова."""
+    lemmas = build_word_lemmas(nlp, WORD_DATA["word"], WORD_DATA["associations"])
+
+    expected = "Запрещено использовать загаданное слово в сообщении"
+    assert check_message(nlp, lemmas, "Это КОШКА") == expected
+    assert check_message(nlp, lemmas, "кошкадом") == expected
+
+
+def test_check_message_forbidden_associations():
+    """Тест: найденные ассоциации перечисляются без повторов."""
+    lemmas = build_word_lemmas(nlp, WORD_DATA["word"], WORD_DATA["associations"])
+
+    error = check_message(nlp, lemmas, "Говорит мяу, у нее хвост и хвостик")
+
+    assert error.startswith("Запрещено использовать слова: ")
+    assert sorted(error.split(": ")[1].split(", ")) == ["мяу", "хвост"]
+
+
+def test_index_computes_lemmas_once():
+    """Тест: леммы слова вычисляются один раз и пересчитываются при изменении."""
+    index = ChatFilterIndex()
+    counting_nlp = MagicMock(wraps=nlp)
+    counting_nlp.pipe = MagicMock(wraps=nlp.pipe)
+
+    first = index.get(counting_nlp, WORD_DATA)
+    assert index.get(counting_nlp, WORD_DATA) is first
+    assert counting_nlp.call_count == 1
+    assert counting_nlp.pipe.call_count == 1
+
+    changed = dict(WORD_DATA, associations=["мурлыкать"])
+    second = index.get(counting_nlp, changed)
+    assert second.associations == ("мурлыкать",)
+    assert index.get(counting_nlp, changed) is second
+    assert len(index) == 1
+
+    index.clear()
+    assert len(index) == 0
+
+
+def test_check_message_substring_matches():
+    """Тест: ассоциации находятся и внутри слов, порядок ошибок стабилен."""
+    lemmas = build_word_lemmas(nlp, WORD_DATA["word"], WORD_DATA["associations"])
+
+    assert check_message(nlp, lemmas, "хвостатый зверь, усы") == (
+        "Запрещено использовать слова: усы, хвост"
+    )
+
+
+def test_lemma_cache_skips_known_messages():
+    """
+    Тест: конвейер разбирает целиком только сообщения, которых нет в кэше,
+    и каждое повторное сообщение пакета один раз.
+    """
+    cache = LemmaCache(maxsize=100)
+    counting_nlp = MagicMock(wraps=nlp)
+    counting_nlp.pipe = MagicMock(wraps=nlp.pipe)
+
+    first = analyze_messages(counting_nlp, ["кот и пёс"], cache)
+    assert list(counting_nlp.pipe.call_args[0][0]) == ["кот и пёс"]
+
+    second = analyze_messages(counting_nlp, ["кот и пёс", "и дом", "и дом"], cache)
+    assert list(counting_nlp.pipe.call_args[0][0]) == ["и дом"]
+
+    assert first == [[("кот", "кот", False), ("и", "и", True), ("пёс", "пёс", False)]]
+    assert second[0] == first[0]
+    assert second[1] == second[2] == [("и", "и", True), ("дом", "дом", False)]
+    assert (cache.hits, cache.misses) == (1, 2)
+    counting_nlp.assert_not_called()
+
+
+def test_check_message_same_verdicts_with_cache():
+    """Тест: кэш лемм не меняет результат проверки."""
+    lemmas = build_word_lemmas(nlp, WORD_DATA["word"], WORD_DATA["associations"])
+    cache = LemmaCache(maxsize=100)
+    messages = [
+        "Домашнее животное, любит молоко",
+        "Это КОШКА",
+        "Говорит мяу, у нее хвост",
+        "Говорит мяу, у нее хвост",
+    ]
+
+    for message in messages:
+        assert check_message(nlp, lemmas, message, cache) == check_message(
+            nlp, lemmas, message
+        )
+    assert cache.hits > 0
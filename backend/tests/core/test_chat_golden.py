@@ -0,0 +1,69 @@
+import pytest
+from benchmarks.chat_moderation import (
+    GOLDEN_PROFILE,
+    MODEL_GOLDEN_FILE,
+    MODEL_GOLDEN_PROFILE,
+    compare_golden,
+    load_golden,
+    model_installed,
+    run_baseline,
+    run_config,
+)
+
+requires_model = pytest.mark.skipif(
+    not model_installed(), reason="модель ru_core_news_sm не установлена"
+)
+
+
+@pytest.fixture(scope="module")
+def baseline_verdicts():
+    """Вердикты эталонной проверки с моделью (один прогон на модуль)"""
+    result = run_baseline(MODEL_GOLDEN_PROFILE)
+    assert not result["blank"]
+    return result["verdicts"]
+
+
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_chat_verdicts_match_golden(use_cache):
+    """
+    Тест: вердикты фильтра чата по всем словам words.json совпадают
+    с эталонными (benchmarks/chat_verdicts.json).
+    """
+    result = run_config(GOLDEN_PROFILE, use_cache)
+
+    assert compare_golden(result["verdicts"], load_golden()) == []
+
+
+@requires_model
+@pytest.mark.parametrize("profile", ["lemma", "full"])
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_chat_verdicts_match_baseline(profile, use_cache, baseline_verdicts):
+    """
+    Тест: вердикты фильтра с моделью ru_core_news_sm, с кэшем лемм и без
+    него, совпадают с вердиктами исходной проверки.
+    """
+    result = run_config(profile, use_cache)
+
+    assert not result["blank"]
+    assert compare_golden(result["verdicts"], baseline_verdicts) == []
+
+
+@requires_model
+@pytest.mark.parametrize("profile", ["lemma", "full"])
+@pytest.mark.parametrize("use_cache", [False, True])
+def test_chat_verdicts_match_model_golden(profile, use_cache):
+    """
+    Тест: вердикты фильтра с моделью ru_core_news_sm совпадают с эталонными
+    (benchmarks/chat_verdicts_model.json).
+    """
+    golden = load_golden(blank=False)
+    if golden is None:
+        pytest.skip(
+            f"Эталон модели {MODEL_GOLDEN_FILE.name} не записан: "
+            "python -m benchmarks.chat_moderation --update-golden"
+        )
+
+    result = run_config(profile, use_cache)
+
+    assert not result["blank"]
+    assert compare_golden(result["verdicts"], golden) == []
@@ -0,0 +1,55 @@
+from app.core.guess_matcher import accepted_forms, is_correct_guess, normalize_guess
+
+
+def test_normalize_guess():
+    """Тест нормализации догадки."""
+    assert normalize_guess("  Самолёт! ") == "самолет"
+    assert normalize_guess("«Рок-н-ролл»") == "рок-н-ролл"
+    assert normalize_guess("хот   дог") == "хот дог"
+
+
+def test_yo_folding():
+    """Тест: «ё» и «е» не различаются."""
+    assert is_correct_guess("Самолёт", "самолет")
+    assert is_correct_guess("актер", "АКТЁР")
+
+
+def test_inflected_forms_accepted():
+    """Тест: засчитываются падежные формы слова."""
+    assert is_correct_guess("кошка", "кошку")
+    assert is_correct_guess("кошка", "кошки")
+    assert is_correct_guess("самолёт", "самолеты")
+    assert is_correct_guess("лошадь", "лошади")
+    assert is_correct_guess("здание", "здания")
+    assert is_correct_guess("музей", "музеи")
+    assert is_correct_guess("окно", "окна")
+
+
+def test_other_words_rejected():
+    """Тест: другие слова и составные слова по частям не засчитываются."""
+    assert not is_correct_guess("кошка", "собака")
+    assert not is_correct_guess("кошка", "кош")
+    assert not is_correct_guess("хот-дог", "хот")
+    assert accepted_forms("хот-дог") == frozenset({"хот-дог"})
+    assert accepted_forms("такси") == frozenset({"такси"})
+
+
+def test_forms_built_once_per_word():
+    """Тест: множество форм строится один раз на слово."""
+    assert accepted_forms("тигрёнок") is accepted_forms("тигрёнок")
+
+
+def test_typo_tolerance():
+    """Тест: одна опечатка засчитывается только в режиме допуска опечаток."""
+    for guess in ("самолот", "самолетт", "смаолет", "амолет", "самолеьы"):
+        assert is_correct_guess("самолёт", guess, typo_tolerance=True)
+        assert not is_correct_guess("самолёт", guess)
+
+    assert not is_correct_guess("самолёт", "сомолот", typo_tolerance=True)
+    assert not is_correct_guess("самолёт", "вертолет", typo_tolerance=True)
+
+
+def test_typo_tolerance_min_length():
+    """Тест: в коротких словах опечатки не допускаются."""
+    assert not is_correct_guess("кот", "кит", typo_tolerance=True)
+    assert is_correct_guess("кот", "кит", typo_tolerance=True, typo_min_length=3)
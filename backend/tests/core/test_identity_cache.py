@@ -0,0 +1,79 @@
+import time
+from unittest.mock import patch
+from app.core.identity_cache import IdentityCache
+
+USER = {"id": 1, "email": "user@example.com", "name": "Игрок"}
+
+
+def test_get_and_put():
+    """Тест подсчета попаданий и промахов."""
+    cache = IdentityCache(maxsize=10, ttl=60)
+
+    assert cache.get("token") is None
+    cache.put("token", 1, USER, time.time() + 3600)
+
+    assert cache.get("token") == USER
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_lookup_returns_token_id():
+    """Тест: вместе с данными возвращается ID токена."""
+    cache = IdentityCache(maxsize=10, ttl=60)
+    cache.put("token", 1, USER, time.time() + 3600, token_id="jti-1")
+
+    assert cache.lookup("token") == (USER, "jti-1")
+    assert cache.lookup("missing") is None
+
+
+def test_entry_expires_after_ttl():
+    """Тест: запись устаревает через ttl секунд."""
+    cache = IdentityCache(maxsize=10, ttl=60)
+    cache.put("token", 1, USER, time.time() + 3600)
+
+    later = time.monotonic() + 61
+    with patch("app.core.identity_cache.time.monotonic", return_value=later):
+        assert cache.get("token") is None
+    assert len(cache) == 0
+
+
+def test_entry_does_not_outlive_token():
+    """Тест: запись не переживает срок действия токена."""
+    cache = IdentityCache(maxsize=10, ttl=60)
+    cache.put("expired", 1, USER, time.time() - 1)
+    cache.put("expiring", 1, USER, time.time() + 5)
+
+    assert cache.get("expired") is None
+    later = time.monotonic() + 6
+    with patch("app.core.identity_cache.time.monotonic", return_value=later):
+        assert cache.get("expiring") is None
+
+
+def test_evicts_least_recently_used():
+    """Тест: при переполнении вытесняется давно не использованный токен."""
+    cache = IdentityCache(maxsize=2, ttl=60)
+    expires_at = time.time() + 3600
+    cache.put("a", 1, USER, expires_at)
+    cache.put("b", 2, USER, expires_at)
+    cache.get("a")
+    cache.put("c", 3, USER, expires_at)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == USER
+    assert cache.get("c") == USER
+
+
+def test_invalidate():
+    """Тест сброса записей токена и всех токенов пользователя."""
+    cache = IdentityCache(maxsize=10, ttl=60)
+    expires_at = time.time() + 3600
+    cache.put("phone", 1, USER, expires_at)
+    cache.put("laptop", 1, USER, expires_at)
+    cache.put("other", 2, USER, expires_at)
+
+    cache.invalidate_token("phone")
+    assert cache.get("phone") is None
+    assert cache.get("laptop") == USER
+
+    cache.invalidate_user(1)
+    assert cache.get("laptop") is None
+    assert cache.get("other") == USER
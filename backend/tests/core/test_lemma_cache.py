@@ -0,0 +1,47 @@
+from app.core.lemma_cache import LemmaCache
+
+CAT = (("кот", "кот", False),)
+AND = (("и", "и", True),)
+HOUSE = (("дом", "дом", False),)
+
+
+def test_hits_and_misses():
+    """Тест подсчета попаданий и промахов."""
+    cache = LemmaCache(maxsize=10)
+    tokens = [("кошки", "кошка", False), ("спят", "спать", False)]
+
+    assert cache.get("кошки спят") is None
+    cache.put("кошки спят", tokens)
+    assert cache.get("кошки спят") == tuple(tokens)
+    assert cache.get("кошки спят") == tuple(tokens)
+
+    assert (cache.hits, cache.misses) == (2, 1)
+    assert cache.hit_rate == 2 / 3
+
+
+def test_evicts_least_recently_used():
+    """Тест: при переполнении вытесняется давно не использованное сообщение."""
+    cache = LemmaCache(maxsize=2)
+    cache.put("и", AND)
+    cache.put("кот", CAT)
+    cache.get("и")
+    cache.put("дом", HOUSE)
+
+    assert len(cache) == 2
+    assert cache.get("кот") is None
+    assert cache.get("и") == AND
+    assert cache.get("дом") == HOUSE
+
+
+def test_clear_and_disabled_cache():
+    """Тест очистки и кэша нулевого размера."""
+    cache = LemmaCache(maxsize=0)
+    cache.put("кот", CAT)
+    assert len(cache) == 0
+
+    cache = LemmaCache(maxsize=5)
+    cache.put("кот", CAT)
+    cache.get("кот")
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.hit_rate == 0.0
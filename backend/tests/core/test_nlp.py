@@ -0,0 +1,48 @@
+import pytest
+from unittest.mock import patch
+from app.core.nlp import NLP_MODEL, NlpModel, load_nlp
+
+
+def test_load_blank_profile():
+    """Тест: профиль blank не загружает модель."""
+    with patch("app.core.nlp.spacy.load") as mock_load:
+        nlp = load_nlp("blank")
+
+    mock_load.assert_not_called()
+    assert nlp.lang == "ru"
+    assert nlp.pipe_names == []
+
+
+def test_load_lemma_profile_excludes_components():
+    """Тест: профиль lemma не загружает parser, senter и ner."""
+    with patch("app.core.nlp.spacy.load") as mock_load:
+        load_nlp("lemma")
+
+    mock_load.assert_called_once_with(NLP_MODEL, exclude=("parser", "senter", "ner"))
+
+
+def test_missing_model_falls_back_to_blank():
+    """Тест: без установленной модели используется пустой конвейер."""
+    with patch("app.core.nlp.spacy.load", side_effect=OSError):
+        nlp = load_nlp("full")
+
+    assert nlp.pipe_names == []
+
+
+def test_unknown_profile():
+    """Тест: неизвестный профиль вызывает ошибку."""
+    with pytest.raises(ValueError):
+        load_nlp("tiny")
+
+
+def test_nlp_model_loads_on_first_use():
+    """Тест: модель загружается при первом обращении и только один раз."""
+    model = NlpModel("blank")
+    assert model.ready is False
+
+    with patch("app.core.nlp.load_nlp", wraps=load_nlp) as mock_load:
+        nlp = model.get()
+        assert model.get() is nlp
+
+    mock_load.assert_called_once_with("blank")
+    assert model.ready is True
@@ -0,0 +1,122 @@
+import asyncio
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+from app.core.chat_filter import chat_filters
+from app.core.nlp_executor import NlpExecutor
+
+WORD_DATA = {"id": 1, "word": "Кошка", "associations": ["мяу", "хвост"]}
+
+MESSAGES = [
+    "Домашнее животное, любит молоко",
+    "Это кошка",
+    "Говорит мяу",
+    "Пушистый хвост",
+]
+
+EXPECTED = [
+    None,
+    "Запрещено использовать загаданное слово в сообщении",
+    "Запрещено использовать слова: мяу",
+    "Запрещено использовать слова: хвост",
+]
+
+
+@pytest.fixture(autouse=True)
+def clear_chat_filters():
+    chat_filters.clear()
+    yield
+    chat_filters.clear()
+
+
+@pytest.mark.asyncio
+async def test_check_inline():
+    """Тест проверки сообщений в пуле потоков (workers = 0)."""
+    executor = NlpExecutor(workers=0, timeout=5, batch_size=8, batch_window=0.001)
+
+    for message, expected in zip(MESSAGES, EXPECTED):
+        assert await executor.check(WORD_DATA, message) == expected
+
+    assert executor.checks == len(MESSAGES)
+    assert executor.fallbacks == 0
+    stats = executor.stats()
+    assert stats["checks"] == len(MESSAGES)
+    assert stats["lemma_cache_hits"] + stats["lemma_cache_misses"] > 0
+
+
+@pytest.mark.asyncio
+async def test_check_in_worker_process():
+    """Тест пакетной проверки сообщений в рабочем процессе."""
+    executor = NlpExecutor(workers=1, timeout=60, batch_size=8, batch_window=0.01)
+    executor.start()
+    try:
+        results = await asyncio.gather(
+            *(executor.check(WORD_DATA, message) for message in MESSAGES)
+        )
+    finally:
+        executor.shutdown()
+
+    assert results == EXPECTED
+    assert executor.fallbacks == 0
+    assert executor.stats()["lemma_cache_misses"] > 0
+    assert chat_filters.lookup(WORD_DATA) is not None
+
+
+@pytest.mark.asyncio
+async def test_timeout_falls_back_to_surface_check():
+    """Тест: при превышении времени анализа применяется упрощенная проверка."""
+    executor = NlpExecutor(workers=1, timeout=0.01, batch_size=8, batch_window=0.001)
+
+    async def slow_analyze(word_data, message):
+        await asyncio.sleep(1)
+
+    with patch.object(executor, "_analyze", side_effect=slow_analyze):
+        assert await executor.check(WORD_DATA, "Пушистый хвост") == (
+            "Запрещено использовать слова: хвост"
+        )
+        assert await executor.check(WORD_DATA, "Любит молоко") is None
+
+    assert executor.fallbacks == 2
+
+
+@pytest.mark.asyncio
+async def test_broken_pool_is_reset():
+    """Тест: аварийно завершившийся пул пересоздается при следующей проверке."""
+    executor = NlpExecutor(workers=1, timeout=1, batch_size=8, batch_window=0.001)
+    broken = executor._get_pool()
+
+    with patch.object(executor, "_analyze", side_effect=BrokenProcessPool()):
+        assert await executor.check(WORD_DATA, "Это КОШКА") == (
+            "Запрещено использовать загаданное слово в сообщении"
+        )
+
+    assert executor._pool is None
+    assert executor.fallbacks == 1
+    broken.shutdown()
+
+
+def test_ready_inline():
+    """Тест готовности при анализе в текущем процессе."""
+    executor = NlpExecutor(workers=0, timeout=1, batch_size=8, batch_window=0.001)
+
+    with patch("app.core.nlp_executor.nlp_model") as mock_model:
+        mock_model.ready = False
+        assert executor.ready is False
+        mock_model.ready = True
+        assert executor.ready is True
+
+
+def test_ready_after_worker_warmup():
+    """Тест: пул готов, когда модель загружена во всех процессах."""
+    executor = NlpExecutor(workers=1, timeout=1, batch_size=8, batch_window=0.001)
+    assert executor.ready is False
+
+    executor.start()
+    try:
+        for future in executor._warmup:
+            future.result(timeout=60)
+        assert executor.ready is True
+    finally:
+        executor.shutdown()
+
+    assert executor.ready is False
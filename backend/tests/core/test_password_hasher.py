@@ -0,0 +1,65 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from app.core.password_hasher import PasswordHasher, OVERLOADED_MESSAGE
+
+
+@pytest.mark.asyncio
+async def test_hash_and_verify():
+    """Тест хеширования и проверки пароля в пуле."""
+    hasher = PasswordHasher(workers=1, max_pending=4, retry_after=1)
+
+    hashed = await hasher.hash("secret")
+
+    assert await hasher.verify("secret", hashed) is True
+    assert await hasher.verify("wrong", hashed) is False
+    assert hasher.verify_sync("secret", hashed) is True
+    assert hasher.stats()["completed"] == 4
+    assert hasher.stats()["in_flight"] == 0
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_rejects_when_queue_is_full():
+    """Тест: при заполненной очереди операция сразу отклоняется с 503."""
+    hasher = PasswordHasher(workers=1, max_pending=1, retry_after=3)
+    release = threading.Event()
+    running = hasher._submit(release.wait)
+    queued = hasher._submit(release.wait)
+
+    assert hasher.queue_depth == 1
+    with pytest.raises(HTTPException) as exc_info:
+        await hasher.hash("secret")
+
+    assert exc_info.value.status_code == 503
+    assert exc_info.value.detail == OVERLOADED_MESSAGE
+    assert exc_info.value.headers == {"Retry-After": "3"}
+    assert hasher.stats()["rejected"] == 1
+
+    release.set()
+    await asyncio.wrap_future(running)
+    await asyncio.wrap_future(queued)
+    assert hasher.stats()["in_flight"] == 0
+    assert await hasher.hash("secret")
+    hasher.shutdown()
+
+
+@pytest.mark.asyncio
+async def test_hashing_does_not_block_event_loop():
+    """Тест: пока хешируется пароль, цикл событий обрабатывает другие задачи."""
+    hasher = PasswordHasher(workers=1, max_pending=4, retry_after=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0)
+
+    task = asyncio.create_task(ticker())
+    await hasher.hash("secret")
+    task.cancel()
+
+    assert ticks > 1
+    hasher.shutdown()
@@ -0,0 +1,325 @@
+import threading
+import anyio
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi import BackgroundTasks
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.room_state import RoomStateStore
+from app.models.user import User
+from app.models.room import Room, GameStatus
+from app.models.player import Player, PlayerRole
+from app.core.security import get_password_hash
+
+
+@pytest.fixture
+def playing_room(test_db: Session):
+    """Комната с идущей игрой и двумя игроками."""
+    user1 = User(
+        name="StateUser1",
+        email="state1@example.com",
+        hashed_password=get_password_hash("pass1"),
+    )
+    user2 = User(
+        name="StateUser2",
+        email="state2@example.com",
+        hashed_password=get_password_hash("pass2"),
+    )
+    test_db.add_all([user1, user2])
+    test_db.commit()
+
+    room = Room(
+        code="STATE1",
+        status=GameStatus.PLAYING,
+        rounds_total=3,
+        current_round=1,
+        time_per_round=60,
+    )
+    test_db.add(room)
+    test_db.commit()
+
+    player1 = Player(
+        user_id=user1.id, room_id=room.id, role=PlayerRole.EXPLAINING, score_total=4
+    )
+    player2 = Player(user_id=user2.id, room_id=room.id, role=PlayerRole.GUESSING)
+    test_db.add_all([player1, player2])
+    test_db.commit()
+
+    return {"room": room, "players": [player1, player2], "users": [user1, user2]}
+
+
+def test_get_loads_state_once(test_db: Session, playing_room):
+    """Тест загрузки состояния при первом обращении и повторного использования."""
+    store = RoomStateStore()
+    players = playing_room["players"]
+
+    state = store.get("STATE1", test_db)
+
+    assert state.status == GameStatus.PLAYING
+    assert state.current_round == 1
+    assert [p.id for p in state.players] == [players[0].id, players[1].id]
+    assert state.players[0].name == "StateUser1"
+    assert state.explainer.id == players[0].id
+    assert state.next_player(state.explainer).id == players[1].id
+
+    db = MagicMock(spec=Session)
+    assert store.get("STATE1", db) is state
+    db.scalar.assert_not_called()
+
+
+def test_get_room_not_found(test_db: Session):
+    """Тест обращения к несуществующей комнате."""
+    store = RoomStateStore()
+    assert store.get("NOROOM", test_db) is None
+
+
+def test_finish_game(test_db: Session, playing_room):
+    """Тест завершения игры в памяти."""
+    store = RoomStateStore()
+    state = store.get("STATE1", test_db)
+    state.players[0].score = 3
+    state.players[1].score = 5
+
+    winner_id = state.finish_game()
+
+    assert winner_id == state.players[0].id
+    assert state.status == GameStatus.WAITING
+    assert state.current_round == 0
+    assert [p.score_total for p in state.players] == [7, 5]
+    assert all(p.score == 0 for p in state.players)
+    assert all(p.role == PlayerRole.WAITING for p in state.players)
+    assert state.dirty is True
+
+
+def test_schedule_flush_writes_snapshot(test_db: Session, playing_room):
+    """Тест отложенной записи: в базу попадает снимок на момент планирования."""
+    store = RoomStateStore()
+    player2_id = playing_room["players"][1].id
+    state = store.get("STATE1", test_db)
+    state.current_round = 2
+    state.get_player(player2_id).score = 10
+    state.dirty = True
+
+    background_tasks = BackgroundTasks()
+    store.schedule_flush(state, background_tasks, test_db)
+    assert state.dirty is False
+    assert len(background_tasks.tasks) == 1
+
+    # Изменения после планирования относятся уже к следующей записи
+    state.get_player(player2_id).score = 20
+
+    task = background_tasks.tasks[0]
+    task.func(*task.args, **task.kwargs)
+
+    test_db.expire_all()
+    assert test_db.get(Room, playing_room["room"].id).current_round == 2
+    assert test_db.get(Player, player2_id).score == 10
+
+
+def test_schedule_flush_clean_state(test_db: Session, playing_room):
+    """Тест: без изменений запись не планируется."""
+    store = RoomStateStore()
+    state = store.get("STATE1", test_db)
+
+    background_tasks = BackgroundTasks()
+    store.schedule_flush(state, background_tasks, test_db)
+
+    assert background_tasks.tasks == []
+
+
+def test_evict_flushes_and_drops(test_db: Session, playing_room):
+    """Тест сброса состояния: изменения записываются, состояние удаляется."""
+    store = RoomStateStore()
+    player2_id = playing_room["players"][1].id
+    state = store.get("STATE1", test_db)
+    state.get_player(player2_id).wrong_answers = 3
+    state.dirty = True
+
+    store.evict("STATE1", test_db)
+
+    test_db.expire_all()
+    assert test_db.get(Player, player2_id).wrong_answers == 3
+    assert store.get("STATE1", test_db) is not state
+
+
+def test_flush_evicted_state(test_db: Session, playing_room):
+    """Тест: изменения состояния, сброшенного из хранилища, тоже записываются."""
+    store = RoomStateStore()
+    player2_id = playing_room["players"][1].id
+    state = store.get("STATE1", test_db)
+
+    store.evict("STATE1", test_db)
+    assert store.is_current(state) is False
+
+    state.get_player(player2_id).score = 15
+    state.dirty = True
+    store.flush(state, test_db)
+
+    test_db.expire_all()
+    assert test_db.get(Player, player2_id).score == 15
+
+    reloaded = store.get("STATE1", test_db)
+    assert store.is_current(reloaded) is True
+    assert reloaded.get_player(player2_id).score == 15
+
+
+def load_in_thread(store: RoomStateStore, test_db: Session, room_code: str):
+    """Загружает состояние комнаты в отдельном потоке и своей сессии."""
+    loaded = []
+    other_db = sessionmaker(bind=test_db.get_bind())()
+
+    def load():
+        try:
+            loaded.append(store.get(room_code, other_db))
+        finally:
+            other_db.close()
+
+    thread = threading.Thread(target=load)
+    thread.start()
+    return thread, loaded
+
+
+def test_get_waits_for_evicted_snapshot(test_db: Session, playing_room):
+    """Тест: сброшенная комната загружается только после записи ее снимка."""
+    store = RoomStateStore()
+    player2_id = playing_room["players"][1].id
+    state = store.get("STATE1", test_db)
+    state.current_round = 2
+    state.get_player(player2_id).score = 9
+    state.dirty = True
+
+    # Как evict_async: состояние удалено, снимок еще пишется в пуле потоков
+    detached = store._detach("STATE1")
+    thread, loaded = load_in_thread(store, test_db, "STATE1")
+    thread.join(timeout=0.2)
+    assert thread.is_alive()
+
+    store.persist(*detached, test_db)
+    thread.join(timeout=5)
+
+    assert loaded[0] is not state
+    assert loaded[0].current_round == 2
+    assert loaded[0].get_player(player2_id).score == 9
+
+
+def test_get_waits_for_scheduled_flush(test_db: Session, playing_room):
+    """Тест: снимок из отложенной записи не перезаписывается устаревшими строками."""
+    store = RoomStateStore()
+    state = store.get("STATE1", test_db)
+    state.current_round = 3
+    state.dirty = True
+
+    background_tasks = BackgroundTasks()
+    store.schedule_flush(state, background_tasks, test_db)
+    store.evict("STATE1", test_db)
+    thread, loaded = load_in_thread(store, test_db, "STATE1")
+    thread.join(timeout=0.2)
+    assert thread.is_alive()
+
+    task = background_tasks.tasks[0]
+    task.func(*task.args, **task.kwargs)
+    thread.join(timeout=5)
+
+    assert loaded[0].current_round == 3
+
+
+def test_get_stops_waiting_for_lost_snapshot(test_db: Session, playing_room):
+    """Тест: снимок, запись которого не началась, ждем ограниченное время."""
+    store = RoomStateStore()
+    state = store.get("STATE1", test_db)
+    state.dirty = True
+    store._detach("STATE1")
+
+    with patch("app.core.room_state.settings.ROOM_STATE_PERSIST_WAIT", 0.01):
+        reloaded = store.get("STATE1", test_db)
+
+    assert reloaded is not state
+    assert store.is_current(reloaded)
+
+
+def test_flush_after_player_removed(test_db: Session, playing_room):
+    """Тест: запись снимка не прерывается, если игрок уже удален из комнаты."""
+    store = RoomStateStore()
+    player1, player2 = playing_room["players"]
+    player1_id, player2_id = player1.id, player2.id
+    state = store.get("STATE1", test_db)
+    state.get_player(player1_id).score = 8
+    state.get_player(player2_id).score = 6
+    state.dirty = True
+
+    test_db.delete(player2)
+    test_db.commit()
+    store.flush(state, test_db)
+
+    assert state.dirty is False
+    test_db.expire_all()
+    assert test_db.get(Player, player1_id).score == 8
+    assert test_db.get(Player, player2_id) is None
+
+
+def test_persist_failure_keeps_state_dirty(test_db: Session, playing_room):
+    """Тест: при ошибке записи изменения будут записаны повторно."""
+    store = RoomStateStore()
+    state = store.get("STATE1", test_db)
+    state.dirty = True
+
+    db = MagicMock(spec=Session)
+    db.execute.side_effect = Exception("db is down")
+    store.flush(state, db)
+
+    db.rollback.assert_called_once()
+    assert state.dirty is True
+
+
+def test_rename_user(test_db: Session, playing_room):
+    """Тест обновления имени игрока в загруженных комнатах."""
+    store = RoomStateStore()
+    user1 = playing_room["users"][0]
+    state = store.get("STATE1", test_db)
+
+    store.rename_user(user1.id, "Renamed")
+
+    assert state.get_player_by_user(user1.id).name == "Renamed"
+
+
+@pytest.mark.asyncio
+async def test_get_async_and_flush_async(test_db: Session, playing_room):
+    """Тест асинхронных вариантов загрузки и записи состояния."""
+    store = RoomStateStore()
+    player2_id = playing_room["players"][1].id
+
+    state = await store.get_async("STATE1", test_db)
+    assert state is store.get("STATE1", test_db)
+    assert await store.get_async("NOROOM", test_db) is None
+
+    state.get_player(player2_id).score = 7
+    state.dirty = True
+    await store.flush_async(state, test_db)
+
+    assert state.dirty is False
+    test_db.expire_all()
+    assert test_db.get(Player, player2_id).score == 7
+
+
+@pytest.mark.asyncio
+async def test_evict_from_thread(test_db: Session, playing_room):
+    """Тест сброса из пула потоков: состояние снимается в цикле событий."""
+    store = RoomStateStore()
+    player2_id = playing_room["players"][1].id
+    state = store.get("STATE1", test_db)
+    state.get_player(player2_id).score = 4
+    state.dirty = True
+
+    detach_threads = []
+    original_detach = store._detach
+
+    def record_detach(room_code):
+        detach_threads.append(threading.get_ident())
+        return original_detach(room_code)
+
+    store._detach = record_detach
+    await anyio.to_thread.run_sync(store.evict_from_thread, "STATE1", test_db)
+
+    assert detach_threads == [threading.get_ident()]
+    assert store.is_current(state) is False
+    test_db.expire_all()
+    assert test_db.get(Player, player2_id).score == 4
@@ -1,8 +1,11 @@
 import pytest
 import jwt
-from datetime import timedelta
+from datetime import datetime, timedelta
 from app.core.security import (
     create_access_token,
+    decode_access_token,
+    invalidate_token,
+    is_token_revoked,
     verify_password,
     get_password_hash,
     ALGORITHM,
@@ -54,3 +57,37 @@ def test_create_access_token_with_expiry():
     payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[ALGORITHM])
     assert payload["sub"] == data["sub"]
     assert "exp" in payload
+
+
+def test_create_access_token_has_token_id():
+    """Тест: у каждого токена свой ID (jti)."""
+    data = {"sub": "test@example.com"}
+    first = decode_access_token(create_access_token(data))
+    second = decode_access_token(create_access_token(data))
+
+    assert first.token_id and second.token_id
+    assert first.token_id != second.token_id
+
+
+def test_invalidate_token():
+    """Тест: отозванный токен считается отозванным до истечения срока."""
+    token = create_access_token({"sub": "test@example.com"})
+    token_data = decode_access_token(token)
+    assert not is_token_revoked(token_data)
+
+    invalidate_token(token)
+
+    assert is_token_revoked(token_data)
+
+
+def test_legacy_token_without_jti():
+    """Тест: токен без jti отзывается по хешу самого токена."""
+    token = jwt.encode(
+        {"sub": "test@example.com", "exp": datetime.now() + timedelta(minutes=5)},
+        settings.SECRET_KEY,
+        algorithm=ALGORITHM,
+    )
+
+    invalidate_token(token)
+
+    assert is_token_revoked(decode_access_token(token))
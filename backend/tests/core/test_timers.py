@@ -0,0 +1,97 @@
+import asyncio
+import time
+import pytest
+from unittest.mock import AsyncMock
+from app.core.timers import DeadlineScheduler
+
+
+@pytest.fixture
+def scheduler():
+    scheduler = DeadlineScheduler()
+    yield scheduler
+    scheduler.clear()
+
+
+@pytest.mark.asyncio
+async def test_fires_in_deadline_order(scheduler):
+    """Тест срабатывания дедлайнов в порядке их наступления."""
+    fired = []
+
+    async def callback(key):
+        fired.append(key)
+
+    now = time.time()
+    scheduler.schedule("LATE", now + 0.04, callback)
+    scheduler.schedule("EARLY", now + 0.01, callback)
+    scheduler.schedule("NOW", now, callback)
+
+    await asyncio.sleep(0.1)
+
+    assert fired == ["NOW", "EARLY", "LATE"]
+    assert len(scheduler) == 0
+
+
+@pytest.mark.asyncio
+async def test_reschedule_replaces_deadline(scheduler):
+    """Тест: повторное планирование заменяет предыдущий дедлайн."""
+    first = AsyncMock()
+    second = AsyncMock()
+    now = time.time()
+
+    scheduler.schedule("ROOM1", now + 0.01, first)
+    scheduler.schedule("ROOM1", now + 0.03, second)
+    assert scheduler.deadline("ROOM1") == now + 0.03
+    assert len(scheduler) == 1
+
+    await asyncio.sleep(0.08)
+
+    first.assert_not_called()
+    second.assert_awaited_once_with("ROOM1")
+
+
+@pytest.mark.asyncio
+async def test_cancel(scheduler):
+    """Тест отмены дедлайна."""
+    callback = AsyncMock()
+
+    scheduler.schedule("ROOM1", time.time() + 0.01, callback)
+    assert "ROOM1" in scheduler
+
+    assert scheduler.cancel("ROOM1") is True
+    assert scheduler.cancel("ROOM1") is False
+    assert scheduler.deadline("ROOM1") is None
+
+    await asyncio.sleep(0.05)
+    callback.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_callback_error_does_not_stop_scheduler(scheduler):
+    """Тест: ошибка в обработчике не останавливает остальные дедлайны."""
+    failing = AsyncMock(side_effect=Exception("boom"))
+    callback = AsyncMock()
+    now = time.time()
+
+    scheduler.schedule("BROKEN", now, failing)
+    scheduler.schedule("ROOM1", now + 0.02, callback)
+
+    await asyncio.sleep(0.06)
+
+    failing.assert_awaited_once_with("BROKEN")
+    callback.assert_awaited_once_with("ROOM1")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_entries_are_compacted(scheduler):
+    """Тест: отмененные записи не копятся в куче бесконечно."""
+    callback = AsyncMock()
+    deadline = time.time() + 60
+
+    for i in range(200):
+        scheduler.schedule(f"ROOM{i}", deadline, callback)
+    for i in range(199):
+        scheduler.cancel(f"ROOM{i}")
+
+    assert len(scheduler) == 1
+    assert len(scheduler._heap) < 200
+    assert scheduler.deadline("ROOM199") == deadline
@@ -0,0 +1,92 @@
+import time
+from unittest.mock import patch
+from app.core.token_revocation import MemoryRevocationStore, DatabaseRevocationStore
+from app.models.revoked_token import RevokedToken
+
+
+def test_memory_store_revoke():
+    """Тест отзыва токена в хранилище в памяти."""
+    store = MemoryRevocationStore()
+    store.revoke("jti-1", time.time() + 60)
+
+    assert store.is_revoked("jti-1")
+    assert not store.is_revoked("jti-2")
+
+
+def test_memory_store_drops_expired_tokens():
+    """Тест: записи истекших токенов удаляются из хранилища в памяти."""
+    store = MemoryRevocationStore()
+    now = time.time()
+    store.revoke("expired", now - 1)
+    store.revoke("expiring", now + 0.05)
+    store.revoke("active", now + 60)
+    # Повторный отзыв продлевает запись, старый срок в куче не удаляет ее
+    store.revoke("renewed", now + 0.05)
+    store.revoke("renewed", now + 60)
+
+    assert not store.is_revoked("expired")
+    assert len(store) == 3
+
+    time.sleep(0.1)
+    assert not store.is_revoked("expiring")
+    assert store.purge() == 1
+    assert len(store) == 2
+    assert store.is_revoked("active")
+    assert store.is_revoked("renewed")
+
+
+def test_database_store(test_db):
+    """Тест хранилища отозванных токенов в PostgreSQL."""
+    store = DatabaseRevocationStore(purge_interval=300)
+    now = time.time()
+    store.revoke("jti-1", now + 60, test_db)
+    store.revoke("jti-1", now + 60, test_db)
+    store.revoke("expired", now - 1, test_db)
+
+    assert store.is_revoked("jti-1", test_db)
+    assert not store.is_revoked("jti-2", test_db)
+    assert not store.is_revoked("expired", test_db)
+    assert test_db.query(RevokedToken).count() == 1
+
+
+def test_database_store_purges_expired_tokens(test_db):
+    """Тест: истекшие записи удаляются одним запросом."""
+    store = DatabaseRevocationStore(purge_interval=300)
+    now = time.time()
+    test_db.add_all(
+        [
+            RevokedToken(jti="old-1", expires_at=now - 10),
+            RevokedToken(jti="old-2", expires_at=now - 5),
+            RevokedToken(jti="active", expires_at=now + 60),
+        ]
+    )
+    test_db.commit()
+
+    assert not store.is_revoked("old-1", test_db)
+    assert store.purge(test_db) == 2
+    assert [token.jti for token in test_db.query(RevokedToken)] == ["active"]
+
+
+def test_database_store_remembers_unrevoked_tokens(test_db):
+    """Тест: результат "не отозван" запоминается на check_ttl секунд."""
+    store = DatabaseRevocationStore(purge_interval=300, check_ttl=2)
+    other_worker = DatabaseRevocationStore(purge_interval=300)
+
+    assert not store.is_revoked("jti-1", test_db)
+    other_worker.revoke("jti-1", time.time() + 60, test_db)
+    with patch.object(store, "_execute") as execute:
+        assert not store.is_revoked("jti-1", test_db)
+    execute.assert_not_called()
+
+    later = time.monotonic() + 3
+    with patch("app.core.token_revocation.time.monotonic", return_value=later):
+        assert store.is_revoked("jti-1", test_db)
+
+
+def test_database_store_forgets_token_on_revoke(test_db):
+    """Тест: отзыв в том же процессе действует сразу."""
+    store = DatabaseRevocationStore(purge_interval=300, check_ttl=60)
+
+    assert not store.is_revoked("jti-1", test_db)
+    store.revoke("jti-1", time.time() + 60, test_db)
+    assert store.is_revoked("jti-1", test_db)
@@ -0,0 +1,175 @@
+import pytest
+from unittest.mock import MagicMock
+from sqlalchemy.orm import Session
+from app.core.word_catalog import WordCatalog, WordDeck
+from app.models.word import WordWithAssociations, DifficultyEnum
+
+
+@pytest.fixture
+def catalog_words(test_db: Session):
+    """Слова разной сложности и категорий, одно из них неактивно."""
+    words = [
+        WordWithAssociations(
+            word="Кот",
+            category="Животные",
+            associations=["мяу", "усы"],
+            difficulty=DifficultyEnum.basic,
+        ),
+        WordWithAssociations(
+            word="Пес",
+            category="Животные",
+            associations=["гав"],
+            difficulty=DifficultyEnum.basic,
+        ),
+        WordWithAssociations(
+            word="Дом",
+            category="Здания",
+            associations=["крыша"],
+            difficulty=DifficultyEnum.basic,
+        ),
+        WordWithAssociations(
+            word="Ипотека",
+            category="Финансы",
+            associations=["банк"],
+            difficulty=DifficultyEnum.hard,
+        ),
+        WordWithAssociations(
+            word="Архив",
+            category="Здания",
+            associations=["пыль"],
+            difficulty=DifficultyEnum.basic,
+            is_active=False,
+        ),
+    ]
+    test_db.add_all(words)
+    test_db.commit()
+    return words
+
+
+def test_load_once(test_db: Session, catalog_words):
+    """Тест: каталог загружается один раз и не обращается к базе повторно."""
+    catalog = WordCatalog()
+
+    basic_ids = catalog.word_ids(test_db, DifficultyEnum.basic)
+    assert basic_ids == tuple(w.id for w in catalog_words[:3])
+
+    db = MagicMock(spec=Session)
+    entry = catalog.get(db, catalog_words[3].id)
+    assert entry.word == "Ипотека"
+    assert entry.to_dict()["associations"] == ["банк"]
+    db.execute.assert_not_called()
+
+
+def test_inactive_words_excluded(test_db: Session, catalog_words):
+    """Тест: неактивные слова в каталог не попадают."""
+    catalog = WordCatalog()
+
+    assert catalog.get(test_db, catalog_words[4].id) is None
+
+
+def test_random_word_with_exclusion(test_db: Session, catalog_words):
+    """Тест случайного выбора с исключением слов."""
+    catalog = WordCatalog()
+    cat_id, dog_id, house_id = (w.id for w in catalog_words[:3])
+
+    for _ in range(20):
+        word = catalog.random_word(test_db, DifficultyEnum.basic, exclude={cat_id})
+        assert word.id in (dog_id, house_id)
+
+    word = catalog.random_word(
+        test_db, DifficultyEnum.basic, exclude={cat_id, dog_id}
+    )
+    assert word.id == house_id
+
+    assert (
+        catalog.random_word(
+            test_db, DifficultyEnum.basic, exclude={cat_id, dog_id, house_id}
+        )
+        is None
+    )
+    assert catalog.random_word(test_db, DifficultyEnum.medium) is None
+
+
+def test_random_word_in_category(test_db: Session, catalog_words):
+    """Тест выбора слова по категории."""
+    catalog = WordCatalog()
+
+    assert catalog.random_word_in_category(test_db, "Финансы").word == "Ипотека"
+    assert catalog.random_word_in_category(test_db, "Нет такой") is None
+
+
+def test_invalidate(test_db: Session, catalog_words):
+    """Тест: после сброса каталог видит новые слова."""
+    catalog = WordCatalog()
+    assert catalog.word_ids(test_db, DifficultyEnum.medium) == ()
+
+    word = WordWithAssociations(
+        word="Мост",
+        category="Здания",
+        associations=["река"],
+        difficulty=DifficultyEnum.medium,
+    )
+    test_db.add(word)
+    test_db.commit()
+    assert catalog.word_ids(test_db, DifficultyEnum.medium) == ()
+
+    catalog.invalidate()
+    assert catalog.word_ids(test_db, DifficultyEnum.medium) == (word.id,)
+
+
+def test_deck_draws_without_repeats():
+    """Тест: колода выдает все слова без повторов и перетасовывается в конце."""
+    word_ids = tuple(range(1, 11))
+    deck = WordDeck(seed=42)
+
+    first_pass = [deck.draw(word_ids) for _ in range(10)]
+    assert sorted(first_pass) == list(word_ids)
+    assert deck.position == 10
+
+    assert deck.draw(word_ids) in word_ids
+    assert deck.position == 1
+
+
+def test_deck_restore_continues_order():
+    """Тест: колода, восстановленная по seed и позиции, продолжает тот же порядок."""
+    word_ids = tuple(range(1, 21))
+    deck = WordDeck(seed=7)
+    drawn = [deck.draw(word_ids) for _ in range(5)]
+
+    restored = WordDeck.restore(deck.seed, deck.position)
+    rest = [restored.draw(word_ids) for _ in range(15)]
+
+    assert sorted(drawn + rest) == list(word_ids)
+
+
+def test_deck_word_added_mid_deck():
+    """Тест: новое слово в каталоге не перетасовывает уже выданную часть колоды."""
+    word_ids = tuple(range(1, 11))
+    deck = WordDeck(seed=3)
+    drawn = [deck.draw(word_ids) for _ in range(5)]
+
+    # Каталог сброшен после добавления слова: новый кортеж ID
+    new_word_ids = word_ids + (11,)
+    rest = []
+    while deck.position < len(new_word_ids):
+        rest.append(deck.draw(new_word_ids))
+
+    assert not set(drawn) & set(rest)
+    assert set(drawn + rest) >= set(word_ids)
+    assert len(drawn + rest) == len(set(drawn + rest))
+
+    # Колода, восстановленная по seed и позиции, продолжает тот же порядок
+    deck = WordDeck(seed=3)
+    drawn = [deck.draw(word_ids) for _ in range(5)]
+    deck.draw(new_word_ids)
+    restored = WordDeck.restore(deck.seed, deck.position)
+    assert restored.draw(new_word_ids) == deck.draw(new_word_ids)
+
+
+def test_deck_exclude_and_empty():
+    """Тест исключения текущего слова и пустого набора слов."""
+    deck = WordDeck(seed=1)
+
+    assert deck.draw(()) is None
+    assert deck.draw((5,), exclude=5) is None
+    assert deck.draw((5, 6), exclude=5) == 6
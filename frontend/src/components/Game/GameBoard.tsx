@@ -27,8 +27,18 @@ interface GameState {
   currentPlayer?: string;
   rounds_total: number;
   time_per_round?: number;
+  timer_start?: number | null;
 }
 
+// Ошибка команды WebSocket (поля как в ответе HTTP-эндпоинта)
+interface CommandError {
+  status?: number;
+  detail: string;
+}
+
+// Время ожидания подтверждения команды WebSocket
+const COMMAND_TIMEOUT_MS = 10000;
+
 const GameBoard: React.FC = () => {
   const [gameState, setGameState] = useState<GameState | null>(null);
   const [loading, setLoading] = useState<boolean>(true);
@@ -51,6 +61,11 @@ const GameBoard: React.FC = () => {
   const isComponentMounted = useRef(true);
   const connectionTimeoutRef = useRef<NodeJS.Timeout | null>(null);
   const reconnectTimeoutRef = useRef<NodeJS.Timeout | null>(null);
+  // Команды, отправленные по WebSocket и ожидающие подтверждения (ack)
+  const commandCounter = useRef(0);
+  const pendingCommands = useRef(
+    new Map<string, { resolve: (result: any) => void; reject: (error: CommandError) => void }>()
+  );
 
   const gameWords = [
     'Табу', 'Слово', 'Ассоциация', 'Описание', 'Загадка', 
@@ -156,7 +171,7 @@ const GameBoard: React.FC = () => {
         setTimeLeft(data.timeLeft);
         const roundTime = data.time_per_round || timePerRound;
         setTimePerRound(roundTime);
-        const startTime = Date.now() / 1000 - (roundTime - data.timeLeft);
+        const startTime = data.timer_start ?? Date.now() / 1000 - (roundTime - data.timeLeft);
         setTimerStartTime(startTime);
         if (isDev()) {
           console.log(`Timer initialized: timeLeft=${data.timeLeft}, roundTime=${roundTime}, startTime=${startTime}`);
@@ -235,8 +250,11 @@ const GameBoard: React.FC = () => {
     }
 
     try {
+      // Токен передается подпротоколом (заголовок Sec-WebSocket-Protocol),
+      // а не в URL: URL подключения попадает в журналы сервера и прокси
+      const token = localStorage.getItem('token') || '';
       const wsUrl = `${wsBaseUrl}/api/ws/${roomCode}/${user.id}`;
-      const ws = new WebSocket(wsUrl);
+      const ws = new WebSocket(wsUrl, token ? ['bearer', token] : []);
 
       ws.onopen = () => {
         if (isDev()) {
@@ -252,12 +270,26 @@ const GameBoard: React.FC = () => {
           // Проверяем, смонтирован ли еще компонент
           if (!isComponentMounted.current) return;
 
-          if (data.type === 'chat_message') {
+          if (data.type === 'ack') {
+            const pending = pendingCommands.current.get(data.request_id);
+            if (pending) {
+              pendingCommands.current.delete(data.request_id);
+              if (data.ok) {
+                pending.resolve(data.result);
+              } else {
+                pending.reject({ status: data.status, detail: data.detail });
+              }
+            }
+          } else if (data.type === 'chat_message') {
             if (isDev()) {
               console.log('Получено сообщение чата:', data);
             }
             setChatMessages(prev => [...prev, data]);
-          } else if (data.type === 'game_state_update') {
+          } else if (
+            data.type === 'game_state_update' ||
+            (data.type === 'room_update' && data.game_state)
+          ) {
+            // Начальное состояние подключения приходит вместе с room_update
             if (isDev()) {
               console.log('Получено обновление состояния игры:', data.game_state);
             }
@@ -300,8 +332,9 @@ const GameBoard: React.FC = () => {
               setTimeLeft(data.game_state.timeLeft);
               setTimePerRound(data.game_state.time_per_round);
               
-              // Рассчитываем время начала раунда
-              const startTime = Date.now() / 1000 - (data.game_state.time_per_round - data.game_state.timeLeft);
+              // Берем время начала раунда с сервера, иначе рассчитываем его
+              const startTime = data.game_state.timer_start
+                ?? Date.now() / 1000 - (data.game_state.time_per_round - data.game_state.timeLeft);
               setTimerStartTime(startTime);
             }
           } else if (data.type === 'turn_changed') {
@@ -505,19 +538,46 @@ const GameBoard: React.FC = () => {
     };
   }, [timerStartTime, timePerRound, gameState?.status, initialLoadComplete]);
 
+  // Отправляет команду по WebSocket; null - соединение не открыто,
+  // тогда вызывающий код отправляет HTTP-запрос
+  const sendCommand = (type: string, payload: Record<string, unknown> = {}): Promise<any> | null => {
+    const ws = wsRef.current;
+    if (!ws || ws.readyState !== WebSocket.OPEN) return null;
+
+    commandCounter.current += 1;
+    const requestId = String(commandCounter.current);
+    return new Promise((resolve, reject) => {
+      pendingCommands.current.set(requestId, { resolve, reject });
+      setTimeout(() => {
+        if (pendingCommands.current.delete(requestId)) {
+          reject({ detail: 'Сервер не ответил на команду' });
+        }
+      }, COMMAND_TIMEOUT_MS);
+      ws.send(JSON.stringify({ type, request_id: requestId, ...payload }));
+    });
+  };
+
   const handleSendChatMessage = async (message: string) => {
     try {
-      await axios.post(`${apiBaseUrl}/api/game/${roomCode}/chat`, { message });
-    } catch (error) {
-      if (axios.isAxiosError(error) && error.response) {
-        if (error.response.status === 400) {
+      const command = sendCommand('chat', { message });
+      if (command) {
+        await command;
+      } else {
+        await axios.post(`${apiBaseUrl}/api/game/${roomCode}/chat`, { message });
+      }
+    } catch (error: any) {
+      const response = axios.isAxiosError(error)
+        ? error.response && { status: error.response.status, detail: error.response.data.detail }
+        : error?.status && error;
+      if (response) {
+        if (response.status === 400) {
           toast.error('Сообщение не отправлено', {
-            description: error.response.data.detail || 'Вы использовали запрещенные слова в сообщении',
+            description: response.detail || 'Вы использовали запрещенные слова в сообщении',
             duration: 4000,
           });
         } else {
           toast.error('Ошибка при отправке сообщения', {
-            description: error.response.data.detail || 'Попробуйте еще раз',
+            description: response.detail || 'Попробуйте еще раз',
             duration: 4000,
           });
         }
@@ -554,7 +614,8 @@ const GameBoard: React.FC = () => {
 
     try {
       setLoading(true);
-      const result = await gameApi.submitGuess(roomCode, guess);
+      const command = sendCommand('guess', { guess });
+      const result = command ? await command : await gameApi.submitGuess(roomCode, guess);
 
       setGuess('');
 
@@ -113,8 +113,11 @@ const Room: React.FC = () => {
         return;
       }
 
+      // Токен передается подпротоколом (заголовок Sec-WebSocket-Protocol),
+      // а не в URL: URL подключения попадает в журналы сервера и прокси
+      const token = localStorage.getItem('token') || '';
       const wsUrl = `${wsBaseUrl}/api/ws/${roomId}/${user.id}`;
-      const ws = new WebSocket(wsUrl);
+      const ws = new WebSocket(wsUrl, token ? ['bearer', token] : []);
 
       ws.onopen = () => {
         if (isDev()) {